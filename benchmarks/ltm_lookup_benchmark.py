@@ -0,0 +1,98 @@
+"""
+Benchmark long-term memory lookups at different table sizes.
+
+Populates a temporary LTMSQLiteStorage database with N rows spread over a
+pool of task descriptions and reports the latency of ``load()``.
+
+Usage:
+    python benchmarks/ltm_lookup_benchmark.py
+    python benchmarks/ltm_lookup_benchmark.py --rows 10000 100000 --lookups 500
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from typing import List
+
+# Add the src directory to the Python path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from pmoai.memory.storage.ltm_sqlite_storage import (  # noqa: E402
+    LTMSQLiteStorage,
+    task_description_hash,
+)
+
+DISTINCT_TASKS = 5000
+BATCH_SIZE = 50000
+
+
+def populate(storage: LTMSQLiteStorage, rows: int) -> List[str]:
+    """Bulk load synthetic rows directly through the storage's pool."""
+    descriptions = [
+        f"Prepare status report for workstream {i} covering schedule, budget and risks"
+        for i in range(DISTINCT_TASKS)
+    ]
+    metadata = json.dumps({"quality": 8, "suggestions": ["Add milestones"]})
+    inserted = 0
+    with storage._pool.transaction() as conn:
+        while inserted < rows:
+            count = min(BATCH_SIZE, rows - inserted)
+            batch = []
+            for i in range(inserted, inserted + count):
+                description = descriptions[i % DISTINCT_TASKS]
+                batch.append(
+                    (
+                        description,
+                        task_description_hash(description),
+                        metadata,
+                        f"2024-01-01T00:00:{i:09d}",
+                        random.random() * 10,
+                    )
+                )
+            conn.executemany(
+                """
+                INSERT INTO long_term_memories (task_description, task_hash, metadata, datetime, score)
+                VALUES (?, ?, ?, ?, ?)
+                """,
+                batch,
+            )
+            inserted += count
+    return descriptions
+
+
+def run(rows: int, lookups: int) -> None:
+    with tempfile.TemporaryDirectory() as temp_dir:
+        storage = LTMSQLiteStorage(db_path=os.path.join(temp_dir, "ltm.db"))
+        descriptions = populate(storage, rows)
+
+        timings = []
+        for _ in range(lookups):
+            description = random.choice(descriptions)
+            start = time.perf_counter()
+            storage.load(description, 3)
+            timings.append(time.perf_counter() - start)
+
+        storage._pool.close()
+
+    timings.sort()
+    p50 = timings[len(timings) // 2] * 1e6
+    p95 = timings[int(len(timings) * 0.95)] * 1e6
+    print(f"{rows:>10,} rows | p50 {p50:8.1f} us | p95 {p95:8.1f} us")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--lookups", type=int, default=1000)
+    args = parser.parse_args()
+
+    for rows in args.rows:
+        run(rows, args.lookups)
+
+
+if __name__ == "__main__":
+    main()
@@ -144,3 +144,64 @@ class Crew(CrewAICrew):
         self.project_phase = project_phase
         self.organization = organization
         self.portfolio = portfolio
+
+    def kickoff(self, *args: Any, **kwargs: Any) -> Any:
+        """Run the crew and flush buffered long-term memory writes afterwards.
+
+        Arguments are passed through to CrewAI's kickoff.
+
+        Returns:
+            The crew output.
+        """
+        try:
+            return super().kickoff(*args, **kwargs)
+        finally:
+            self._flush_memories()
+
+    async def kickoff_async(self, *args: Any, **kwargs: Any) -> Any:
+        """Run the crew asynchronously and flush buffered memory writes afterwards."""
+        try:
+            return await super().kickoff_async(*args, **kwargs)
+        finally:
+            self._flush_memories()
+
+    def kickoff_for_each(self, *args: Any, **kwargs: Any) -> Any:
+        """Run the crew for each input and flush buffered memory writes afterwards."""
+        try:
+            return super().kickoff_for_each(*args, **kwargs)
+        finally:
+            self._flush_memories()
+
+    async def kickoff_for_each_async(self, *args: Any, **kwargs: Any) -> Any:
+        """Run the crew for each input asynchronously and flush buffered memory writes afterwards."""
+        try:
+            return await super().kickoff_for_each_async(*args, **kwargs)
+        finally:
+            self._flush_memories()
+
+    # Native async kickoffs only exist in newer CrewAI releases
+    if hasattr(CrewAICrew, "akickoff"):
+
+        async def akickoff(self, *args: Any, **kwargs: Any) -> Any:
+            """Run the crew natively async and flush buffered memory writes afterwards."""
+            try:
+                return await super().akickoff(*args, **kwargs)
+            finally:
+                self._flush_memories()
+
+    if hasattr(CrewAICrew, "akickoff_for_each"):
+
+        async def akickoff_for_each(self, *args: Any, **kwargs: Any) -> Any:
+            """Run the crew natively async for each input and flush buffered memory writes afterwards."""
+            try:
+                return await super().akickoff_for_each(*args, **kwargs)
+            finally:
+                self._flush_memories()
+
+    def _flush_memories(self) -> None:
+        """Flush memories that buffer their writes, such as LongTermMemory."""
+        for attr in ("long_term_memory", "_long_term_memory"):
+            memory = getattr(self, attr, None)
+            flush = getattr(memory, "flush", None)
+            if callable(flush):
+                flush()
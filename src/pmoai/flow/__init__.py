@@ -1,14 +1,21 @@
 """Flow module for PMOAI."""
 
 from pmoai.flow.config import FlowConfig
-from pmoai.flow.flow import Flow, and_, listen, or_, router, start
+from pmoai.flow.flow import Flow, FlowRunResult, and_, listen, or_, router, start
 from pmoai.flow.flow_trackable import FlowTrackable
 from pmoai.flow.flow_visualizer import FlowVisualizer
-from pmoai.flow.persistence import FlowPersistence, SQLiteFlowPersistence, persist
+from pmoai.flow.persistence import (
+    AsyncSQLiteFlowPersistence,
+    FlowPersistence,
+    SQLiteFlowPersistence,
+    persist,
+)
 
 __all__ = [
+    "AsyncSQLiteFlowPersistence",
     "Flow",
     "FlowConfig",
+    "FlowRunResult",
     "FlowTrackable",
     "FlowVisualizer",
     "FlowPersistence",
@@ -3,15 +3,21 @@ Flow module for orchestrating crews.
 """
 
 import asyncio
+import concurrent.futures
+import copy
 import functools
 import inspect
 import logging
+import time
 import uuid
 from typing import (
     Any,
+    AsyncIterator,
     Callable,
     Dict,
     Generic,
+    Iterable,
+    Iterator,
     List,
     Optional,
     Set,
@@ -24,13 +30,15 @@ from typing import (
     get_origin,
 )
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 
 from pmoai.crew import Crew
 from pmoai.crews.crew_output import CrewOutput
 from pmoai.flow.config import FlowConfig
+from pmoai.flow.flow_graph import FlowExecution, FlowGraph
 from pmoai.flow.flow_trackable import FlowTrackable
 from pmoai.flow.flow_visualizer import FlowVisualizer
+from pmoai.flow.persistence.base import FlowPersistence
 from pmoai.utilities.printer import Printer
 
 logger = logging.getLogger(__name__)
@@ -39,6 +47,24 @@ T = TypeVar("T", bound=Optional[BaseModel])
 FlowMethod = Callable[..., Any]
 
 
+class FlowRunResult(BaseModel):
+    """Outcome of one flow instance in a batch started by ``Flow.kickoff_many``."""
+
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    index: int = Field(description="Position of the inputs in the batch")
+    inputs: Optional[Dict[str, Any]] = Field(default=None, description="Inputs of the run")
+    state: Any = Field(default=None, description="Final state of the flow instance")
+    result: Any = Field(default=None, description="Result of the flow, if it succeeded")
+    error: Optional[BaseException] = Field(default=None, description="Exception raised by the flow, if any")
+    duration: float = Field(default=0.0, description="Wall-clock seconds the run took")
+
+    @property
+    def succeeded(self) -> bool:
+        """Whether the flow instance completed without raising."""
+        return self.error is None
+
+
 class Flow(FlowTrackable, Generic[T]):
     """Flow for orchestrating crews.
 
@@ -103,6 +129,8 @@ class Flow(FlowTrackable, Generic[T]):
         description: Optional[str] = None,
         verbose: bool = False,
         state: Optional[T] = None,
+        max_concurrency: Optional[int] = None,
+        persistence: Optional[FlowPersistence] = None,
     ):
         """Initialize the flow.
 
@@ -112,6 +140,9 @@ class Flow(FlowTrackable, Generic[T]):
             description: Optional description for the flow.
             verbose: Whether to print verbose output.
             state: Optional initial state for the flow.
+            max_concurrency: Optional maximum number of flow methods running
+                at the same time.
+            persistence: Optional persistence backend for the flow state.
         """
         super().__init__()
 
@@ -119,6 +150,9 @@ class Flow(FlowTrackable, Generic[T]):
         self.name = name or self.__class__.__name__
         self.description = description or f"{self.name} Flow"
         self.verbose = verbose
+        self.max_concurrency = max_concurrency
+        self.persistence = persistence
+        self.method_timings: Dict[str, List[float]] = {}
 
         # Initialize state if not provided
         if state is None:
@@ -160,28 +194,232 @@ class Flow(FlowTrackable, Generic[T]):
 
         return None
 
-    def kickoff(self) -> Any:
-        """Kickoff the flow.
+    def _apply_inputs(self, inputs: Optional[Dict[str, Any]]) -> None:
+        """Copy kickoff inputs onto the state.
+
+        Args:
+            inputs: Optional values for state fields.
+        """
+        if not inputs:
+            return
+        if isinstance(self.state, dict):
+            self.state.update(inputs)
+            return
+        for key, value in inputs.items():
+            setattr(self.state, key, value)
+
+    async def kickoff_async(self, inputs: Optional[Dict[str, Any]] = None) -> Any:
+        """Kickoff the flow on the running event loop.
+
+        All start methods run first, then every listener is dispatched as soon
+        as the methods it listens to complete. Listeners that do not depend on
+        each other run concurrently: coroutine methods on the event loop and
+        regular methods in a thread pool, so methods running at the same time
+        must not update the same state fields without coordination. A router's
+        return value fires the listeners listening to that label, and a method
+        marked with ``and_`` runs once all of its triggers have completed.
+
+        States saved to the flow's persistence during the run are written
+        before it returns, rather than left buffered until exit.
 
-        This method starts the flow by calling the first start method.
+        Args:
+            inputs: Optional values for state fields, set before starting.
 
         Returns:
-            The result of the flow.
+            The result of the last method to complete.
+
+        Raises:
+            ValueError: If the flow has no start methods.
         """
-        # Find the start methods
-        start_methods = self.get_start_methods()
-        if not start_methods:
-            raise ValueError("No start methods found in the flow")
+        completed = False
+        try:
+            result = await self._execute(inputs)
+            completed = True
+            return result
+        finally:
+            await self._flush_persistence(raise_errors=completed)
 
-        # Call the first start method
-        start_method_name = next(iter(start_methods))
-        start_method = getattr(self, start_method_name)
+    async def _execute(self, inputs: Optional[Dict[str, Any]]) -> Any:
+        """Run the method graph of the flow once."""
+        self._apply_inputs(inputs)
+        graph = FlowGraph.compile(self)
 
         if self.verbose:
-            self._printer.print(f"Starting flow with method: {start_method_name}", color="green")
+            self._printer.print(
+                f"Starting flow with methods: {', '.join(graph.start_methods)}",
+                color="green",
+            )
+
+        execution = FlowExecution(self, graph, max_concurrency=self.max_concurrency)
+        try:
+            return await execution.run()
+        finally:
+            self.method_timings = execution.method_timings
 
-        # Call the start method
-        return start_method()
+    async def _flush_persistence(self, raise_errors: bool = True) -> None:
+        """Write the states buffered by the flow's persistence.
+
+        Args:
+            raise_errors: Whether a failed write is raised, or only logged so
+                that it does not hide an error already being raised.
+        """
+        if self.persistence is None:
+            return
+        try:
+            await self.persistence.aflush()
+        except Exception as e:
+            if raise_errors:
+                raise
+            logger.warning(f"Failed to write the states of flow {self.name}: {e}")
+
+    def kickoff(self, inputs: Optional[Dict[str, Any]] = None) -> Any:
+        """Kickoff the flow.
+
+        This method runs the flow to completion on a new event loop. See
+        :meth:`kickoff_async` for how methods are dispatched.
+
+        Args:
+            inputs: Optional values for state fields, set before starting.
+
+        Returns:
+            The result of the last method to complete.
+        """
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return asyncio.run(self.kickoff_async(inputs))
+
+        # Called from inside an event loop, so run on a separate one
+        with concurrent.futures.ThreadPoolExecutor(max_workers=1) as pool:
+            return pool.submit(asyncio.run, self.kickoff_async(inputs)).result()
+
+    def _spawn(self) -> "Flow[T]":
+        """Create a flow instance for a batch run.
+
+        The instance is a shallow copy, so crews, embedders, persistence and
+        any other attributes are shared with this flow. It gets a deep copy of
+        this flow's state with a new ``id``.
+
+        Returns:
+            The new flow instance.
+        """
+        flow = copy.copy(self)
+        if isinstance(self.state, BaseModel):
+            update = {"id": str(uuid.uuid4())} if "id" in type(self.state).model_fields else {}
+            flow.state = cast(T, self.state.model_copy(update=update, deep=True))
+        else:
+            state = copy.deepcopy(self.state)
+            if isinstance(state, dict) and "id" in state:
+                state["id"] = str(uuid.uuid4())
+            flow.state = state
+        flow.method_timings = {}
+        return flow
+
+    async def _kickoff_one(
+        self, index: int, inputs: Optional[Dict[str, Any]]
+    ) -> FlowRunResult:
+        """Run one flow instance of a batch, capturing any failure."""
+        flow = self._spawn()
+        started = time.perf_counter()
+        try:
+            # Buffered states are written once for the whole batch
+            result = await flow._execute(inputs)
+            error = None
+        except Exception as e:
+            logger.warning(f"Flow run {index} of {self.name} failed: {e}")
+            result, error = None, e
+        return FlowRunResult(
+            index=index,
+            inputs=inputs,
+            state=flow.state,
+            result=result,
+            error=error,
+            duration=time.perf_counter() - started,
+        )
+
+    async def kickoff_many_async(
+        self,
+        inputs: Iterable[Optional[Dict[str, Any]]],
+        max_concurrency: int = 4,
+    ) -> AsyncIterator[FlowRunResult]:
+        """Run a flow instance per inputs, yielding results as they complete.
+
+        Instances are copies of this flow that share its crews, embedders
+        and persistence, each with its own copy of the state. At most
+        ``max_concurrency`` instances run at a time and ``inputs`` is consumed
+        lazily, so new instances are only started while the caller keeps
+        consuming results. A failing instance is reported in its result and
+        does not stop the others. States saved to the shared persistence are
+        written once the batch finishes.
+
+        Args:
+            inputs: State inputs of each run.
+            max_concurrency: Maximum number of flow instances running at once.
+
+        Yields:
+            A result per run, in completion order.
+        """
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be at least 1")
+
+        pending: Set["asyncio.Task[FlowRunResult]"] = set()
+        remaining = enumerate(inputs)
+
+        def fill() -> None:
+            while len(pending) < max_concurrency:
+                try:
+                    index, item = next(remaining)
+                except StopIteration:
+                    return
+                pending.add(asyncio.ensure_future(self._kickoff_one(index, item)))
+
+        completed = False
+        try:
+            fill()
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    yield task.result()
+                fill()
+            completed = True
+        finally:
+            for task in pending:
+                task.cancel()
+            if pending:
+                await asyncio.gather(*pending, return_exceptions=True)
+            await self._flush_persistence(raise_errors=completed)
+
+    def kickoff_many(
+        self,
+        inputs: Iterable[Optional[Dict[str, Any]]],
+        max_concurrency: int = 4,
+    ) -> Iterator[FlowRunResult]:
+        """Run a flow instance per inputs, yielding results as they complete.
+
+        This is the synchronous form of :meth:`kickoff_many_async`, driving
+        its own event loop. Runs only progress while the iterator is consumed.
+
+        Args:
+            inputs: State inputs of each run.
+            max_concurrency: Maximum number of flow instances running at once.
+
+        Yields:
+            A result per run, in completion order.
+        """
+        loop = asyncio.new_event_loop()
+        results = self.kickoff_many_async(inputs, max_concurrency)
+        try:
+            while True:
+                try:
+                    yield loop.run_until_complete(results.__anext__())
+                except StopAsyncIteration:
+                    return
+        finally:
+            loop.run_until_complete(results.aclose())
+            loop.run_until_complete(loop.shutdown_asyncgens())
+            loop.close()
 
     def plot(self, output_path: Optional[str] = None, open_browser: bool = True) -> str:
         """Plot the flow.
@@ -203,7 +441,7 @@ def start():
     """Decorator for marking a method as a flow start point.
 
     This decorator marks a method as a starting point for the flow. A flow can
-    have multiple start methods, but only one will be called when the flow is
+    have multiple start methods, which all run concurrently when the flow is
     kicked off.
 
     Returns:
@@ -252,7 +490,8 @@ def router():
     """Decorator for marking a method as a router.
 
     This decorator marks a method as a router, which can dynamically determine
-    which method to call next based on the input.
+    which method to call next based on the input. The label it returns fires
+    the methods listening to that label.
 
     Returns:
         A decorator function.
@@ -0,0 +1,249 @@
+"""
+Compiled method graph and execution engine for flows.
+"""
+
+import asyncio
+import functools
+import inspect
+import logging
+import threading
+import time
+from typing import Any, Dict, FrozenSet, List, Optional, Set, Tuple, Type
+
+from pmoai.flow.flow_trackable import FlowTrackable
+
+logger = logging.getLogger(__name__)
+
+
+class FlowGraph:
+    """The method graph of a flow class.
+
+    The graph is built from the decorators recorded by ``FlowTrackable`` and
+    compiled once per flow class. It maps every trigger, which is either a
+    method name or a label returned by a router, to the listeners it fires,
+    and records the full trigger set of every AND listener.
+    """
+
+    _cache: Dict[Type[Any], "FlowGraph"] = {}
+    _cache_lock = threading.Lock()
+
+    def __init__(
+        self,
+        start_methods: List[str],
+        listeners: Dict[str, List[str]],
+        and_triggers: Dict[str, FrozenSet[str]],
+        router_methods: FrozenSet[str],
+        async_methods: FrozenSet[str],
+        takes_input: FrozenSet[str],
+    ):
+        """Initialize the graph.
+
+        Args:
+            start_methods: Names of the start methods, in definition order.
+            listeners: Listener names keyed by the trigger they listen to.
+            and_triggers: Triggers every AND listener waits for.
+            router_methods: Names of the router methods.
+            async_methods: Names of the coroutine methods.
+            takes_input: Names of the methods accepting the triggering result.
+        """
+        self.start_methods = start_methods
+        self.listeners = listeners
+        self.and_triggers = and_triggers
+        self.router_methods = router_methods
+        self.async_methods = async_methods
+        self.takes_input = takes_input
+
+    @classmethod
+    def compile(cls, flow: FlowTrackable) -> "FlowGraph":
+        """Get the compiled graph of a flow's class.
+
+        Args:
+            flow: The flow to compile the graph of.
+
+        Returns:
+            The graph, shared by every instance of the class.
+        """
+        flow_class = type(flow)
+        graph = cls._cache.get(flow_class)
+        if graph is not None:
+            return graph
+
+        methods = flow.get_tracked_methods()
+        listeners: Dict[str, List[str]] = {}
+        and_triggers: Dict[str, FrozenSet[str]] = {}
+        condition_types = flow.get_condition_types()
+        for name, triggers in flow.get_trigger_methods().items():
+            for trigger in dict.fromkeys(triggers):
+                listeners.setdefault(trigger, []).append(name)
+            if condition_types.get(name) == "AND":
+                and_triggers[name] = frozenset(triggers)
+
+        takes_input = set()
+        for name, method in methods.items():
+            try:
+                parameters = inspect.signature(method).parameters.values()
+            except (TypeError, ValueError):
+                continue
+            if any(
+                p.kind in (p.POSITIONAL_ONLY, p.POSITIONAL_OR_KEYWORD, p.VAR_POSITIONAL)
+                for p in parameters
+            ):
+                takes_input.add(name)
+
+        # Keep start methods in the order they are defined on the class
+        order = {name: i for i, name in enumerate(_definition_order(flow_class))}
+        start_methods = sorted(
+            flow.get_start_methods(), key=lambda name: order.get(name, len(order))
+        )
+
+        graph = cls(
+            start_methods=start_methods,
+            listeners=listeners,
+            and_triggers=and_triggers,
+            router_methods=frozenset(flow.get_router_methods()),
+            async_methods=frozenset(
+                name
+                for name, method in methods.items()
+                if asyncio.iscoroutinefunction(method)
+            ),
+            takes_input=frozenset(takes_input),
+        )
+        with cls._cache_lock:
+            return cls._cache.setdefault(flow_class, graph)
+
+    def triggers_of(self, method_name: str, result: Any) -> List[str]:
+        """Get the triggers fired by a completed method.
+
+        Args:
+            method_name: The method that completed.
+            result: Its result.
+
+        Returns:
+            The method name, followed by the route label for routers.
+        """
+        triggers = [method_name]
+        if method_name in self.router_methods and isinstance(result, str):
+            triggers.append(result)
+        return triggers
+
+
+def _definition_order(flow_class: Type[Any]) -> List[str]:
+    """Get the attribute names of a class and its bases in definition order."""
+    names: Dict[str, None] = {}
+    for klass in reversed(flow_class.__mro__):
+        names.update(dict.fromkeys(vars(klass)))
+    return list(names)
+
+
+class FlowExecution:
+    """A single run of a flow's method graph.
+
+    Methods are dispatched as soon as their trigger completes, so listeners
+    that do not depend on each other run concurrently. Coroutine methods run
+    on the event loop and regular methods in a thread pool. An AND listener
+    fires once every one of its triggers has completed since it last fired.
+    """
+
+    def __init__(
+        self,
+        flow: Any,
+        graph: FlowGraph,
+        max_concurrency: Optional[int] = None,
+        executor: Any = None,
+    ):
+        """Initialize the execution.
+
+        Args:
+            flow: The flow whose methods are executed.
+            graph: The compiled graph of the flow.
+            max_concurrency: Maximum number of methods running at once.
+            executor: Executor running synchronous methods. Defaults to the
+                event loop's default executor.
+        """
+        self.flow = flow
+        self.graph = graph
+        self.executor = executor
+        self.method_timings: Dict[str, List[float]] = {}
+        self.completed: List[str] = []
+
+        self._semaphore = asyncio.Semaphore(max_concurrency) if max_concurrency else None
+        self._arrived: Dict[str, Set[str]] = {}
+        self._tasks: Set["asyncio.Task[Tuple[str, Any]]"] = set()
+        self._last_result: Any = None
+
+    async def _call(self, method_name: str, argument: Tuple[Any, ...]) -> Tuple[str, Any]:
+        """Run a single method and record how long it took."""
+        method = getattr(self.flow, method_name)
+        if method_name not in self.graph.takes_input:
+            argument = ()
+
+        if self._semaphore is not None:
+            await self._semaphore.acquire()
+        try:
+            if self.flow.verbose:
+                self.flow._printer.print(f"Running flow method: {method_name}", color="cyan")
+            started = time.perf_counter()
+            if method_name in self.graph.async_methods:
+                result = await method(*argument)
+            else:
+                loop = asyncio.get_running_loop()
+                result = await loop.run_in_executor(
+                    self.executor, functools.partial(method, *argument)
+                )
+            self.method_timings.setdefault(method_name, []).append(
+                time.perf_counter() - started
+            )
+        finally:
+            if self._semaphore is not None:
+                self._semaphore.release()
+        return method_name, result
+
+    def _schedule(self, method_name: str, argument: Tuple[Any, ...] = ()) -> None:
+        self._tasks.add(asyncio.ensure_future(self._call(method_name, argument)))
+
+    def _dispatch(self, method_name: str, result: Any) -> None:
+        """Schedule the listeners fired by a completed method."""
+        for trigger in self.graph.triggers_of(method_name, result):
+            for listener in self.graph.listeners.get(trigger, ()):
+                required = self.graph.and_triggers.get(listener)
+                if required is not None:
+                    arrived = self._arrived.setdefault(listener, set())
+                    arrived.add(trigger)
+                    if not required <= arrived:
+                        continue
+                    arrived.clear()
+                self._schedule(listener, (result,))
+
+    async def run(self) -> Any:
+        """Run the flow from its start methods until no method is pending.
+
+        Returns:
+            The result of the last method to complete.
+
+        Raises:
+            ValueError: If the flow has no start methods.
+        """
+        if not self.graph.start_methods:
+            raise ValueError("No start methods found in the flow")
+
+        for method_name in self.graph.start_methods:
+            self._schedule(method_name)
+
+        try:
+            while self._tasks:
+                done, self._tasks = await asyncio.wait(
+                    self._tasks, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    method_name, result = task.result()
+                    self.completed.append(method_name)
+                    self._last_result = result
+                    self._dispatch(method_name, result)
+        except BaseException:
+            for task in self._tasks:
+                task.cancel()
+            if self._tasks:
+                await asyncio.gather(*self._tasks, return_exceptions=True)
+            raise
+
+        return self._last_result
@@ -2,8 +2,14 @@
 Persistence module for flow state.
 """
 
+from pmoai.flow.persistence.async_sqlite import AsyncSQLiteFlowPersistence
 from pmoai.flow.persistence.base import FlowPersistence
 from pmoai.flow.persistence.decorators import persist
 from pmoai.flow.persistence.sqlite import SQLiteFlowPersistence
 
-__all__ = ["FlowPersistence", "SQLiteFlowPersistence", "persist"]
+__all__ = [
+    "AsyncSQLiteFlowPersistence",
+    "FlowPersistence",
+    "SQLiteFlowPersistence",
+    "persist",
+]
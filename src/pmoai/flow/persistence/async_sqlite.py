@@ -0,0 +1,137 @@
+"""
+SQLite flow state persistence with a background writer.
+"""
+
+import asyncio
+import queue
+import threading
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+from pydantic import BaseModel
+
+from pmoai.flow.persistence.sqlite import SQLiteFlowPersistence, _buffered_persistences
+
+
+class AsyncSQLiteFlowPersistence(SQLiteFlowPersistence):
+    """SQLite flow state persistence that writes from a background thread.
+
+    Like ``aiosqlite``, all database work happens on one dedicated thread fed
+    by a queue. Saving only converts the state to a dictionary, which captures
+    it as it is at that moment, and enqueues it, so persisted methods do not
+    wait for the disk. The writer commits whatever has accumulated in the
+    queue in one transaction. Reads wait for queued writes first, and the
+    queue is drained when the interpreter exits.
+
+    Errors raised by the writer are re-raised by the next :meth:`flush`.
+    """
+
+    def __init__(
+        self,
+        db_path: Optional[str] = None,
+        snapshot_interval: int = 1,
+        batch_size: int = 64,
+        max_cached_flows: int = 1024,
+        max_queue_size: int = 10000,
+    ):
+        """Initialize the persistence and start its writer thread.
+
+        Args:
+            db_path: Path to the SQLite database file. If not provided, uses
+                    db_storage_path() from utilities.paths.
+            snapshot_interval: Number of steps between full snapshots.
+            batch_size: Maximum number of steps written per transaction.
+            max_cached_flows: Number of flows whose latest state is kept in
+                    memory to compute deltas.
+            max_queue_size: Number of queued saves after which saving waits
+                    for the writer to catch up.
+        """
+        super().__init__(
+            db_path,
+            snapshot_interval=snapshot_interval,
+            batch_size=batch_size,
+            max_cached_flows=max_cached_flows,
+        )
+        self._queue: "queue.Queue[Optional[Tuple[str, str, Dict[str, Any]]]]" = queue.Queue(
+            maxsize=max_queue_size
+        )
+        self._errors: List[BaseException] = []
+        self._writer = threading.Thread(
+            target=self._run, name="pmoai-flow-persistence", daemon=True
+        )
+        self._writer.start()
+        _buffered_persistences.add(self)
+
+    def _run(self) -> None:
+        """Write queued states until the queue receives ``None``."""
+        while True:
+            item = self._queue.get()
+            try:
+                if item is None:
+                    self._write_pending()
+                    return
+                self._save_dict(*item)
+                if self._queue.empty():
+                    # Commit what accumulated while the queue was busy
+                    self._write_pending()
+            except BaseException as e:
+                self._errors.append(e)
+            finally:
+                self._queue.task_done()
+
+    def _raise_errors(self) -> None:
+        if self._errors:
+            errors, self._errors = self._errors, []
+            raise RuntimeError(f"Flow state persistence failed: {errors[0]}") from errors[0]
+
+    def save_state(
+        self,
+        flow_uuid: str,
+        method_name: str,
+        state_data: Union[Dict[str, Any], BaseModel],
+    ) -> None:
+        """Queue the current flow state for writing.
+
+        Args:
+            flow_uuid: Unique identifier for the flow instance
+            method_name: Name of the method that just completed
+            state_data: Current state data (either dict or Pydantic model)
+        """
+        self._raise_errors()
+        self._queue.put((flow_uuid, method_name, self._to_dict(state_data)))
+
+    async def asave_state(
+        self,
+        flow_uuid: str,
+        method_name: str,
+        state_data: Union[Dict[str, Any], BaseModel],
+    ) -> None:
+        """Queue the current flow state for writing without blocking the event loop.
+
+        Args:
+            flow_uuid: Unique identifier for the flow instance
+            method_name: Name of the method that just completed
+            state_data: Current state data (either dict or Pydantic model)
+        """
+        self._raise_errors()
+        item = (flow_uuid, method_name, self._to_dict(state_data))
+        try:
+            self._queue.put_nowait(item)
+        except queue.Full:
+            await asyncio.to_thread(self._queue.put, item)
+
+    def flush(self) -> None:
+        """Wait until every queued state is written."""
+        if self._writer.is_alive():
+            self._queue.join()
+        else:
+            self._write_pending()
+        self._raise_errors()
+
+    def close(self) -> None:
+        """Write every queued state and stop the writer thread."""
+        if self._writer.is_alive():
+            self._queue.put(None)
+            self._writer.join()
+        else:
+            self._write_pending()
+        self._raise_errors()
@@ -2,6 +2,7 @@
 Base class for flow state persistence.
 """
 
+import asyncio
 from abc import ABC, abstractmethod
 from typing import Any, Dict, Optional, Union
 
@@ -14,6 +15,11 @@ class FlowPersistence(ABC):
     This class defines the interface for flow state persistence implementations.
     Concrete implementations should inherit from this class and implement the
     save_state and load_state methods.
+
+    The ``a``-prefixed methods are the asynchronous protocol used from
+    coroutines. By default they run the blocking methods in a worker thread,
+    so the event loop is never stalled; implementations with a native
+    non-blocking path override them.
     """
 
     @abstractmethod
@@ -43,3 +49,41 @@ class FlowPersistence(ABC):
             The most recent state as a dictionary, or None if no state exists
         """
         pass
+
+    def flush(self) -> None:
+        """Write any buffered state.
+
+        Implementations that buffer writes override this; the default does
+        nothing.
+        """
+        pass
+
+    async def asave_state(
+        self,
+        flow_uuid: str,
+        method_name: str,
+        state_data: Union[Dict[str, Any], BaseModel],
+    ) -> None:
+        """Save the current flow state without blocking the event loop.
+
+        Args:
+            flow_uuid: Unique identifier for the flow instance
+            method_name: Name of the method that just completed
+            state_data: Current state data (either dict or Pydantic model)
+        """
+        await asyncio.to_thread(self.save_state, flow_uuid, method_name, state_data)
+
+    async def aload_state(self, flow_uuid: str) -> Optional[Dict[str, Any]]:
+        """Load the most recent state without blocking the event loop.
+
+        Args:
+            flow_uuid: Unique identifier for the flow instance
+
+        Returns:
+            The most recent state as a dictionary, or None if no state exists
+        """
+        return await asyncio.to_thread(self.load_state, flow_uuid)
+
+    async def aflush(self) -> None:
+        """Write any buffered state without blocking the event loop."""
+        await asyncio.to_thread(self.flush)
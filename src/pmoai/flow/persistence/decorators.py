@@ -28,6 +28,7 @@ from typing import (
     Any,
     Callable,
     Optional,
+    Tuple,
     Type,
     TypeVar,
     Union,
@@ -58,22 +59,11 @@ class PersistenceDecorator:
     _printer = Printer()  # Class-level printer instance
 
     @classmethod
-    def persist_state(cls, flow_instance: Any, method_name: str, persistence_instance: FlowPersistence, verbose: bool = False) -> None:
-        """Persist flow state with proper error handling and logging.
-
-        This method handles the persistence of flow state data, including proper
-        error handling and colored console output for status updates.
-
-        Args:
-            flow_instance: The flow instance whose state to persist
-            method_name: Name of the method that triggered persistence
-            persistence_instance: The persistence backend to use
-            verbose: Whether to log persistence operations
+    def _flow_uuid(cls, flow_instance: Any) -> Tuple[Any, str]:
+        """Get the state of a flow and its ID.
 
         Raises:
             ValueError: If flow has no state or state lacks an ID
-            RuntimeError: If state persistence fails
-            AttributeError: If flow instance lacks required state attributes
         """
         try:
             state = getattr(flow_instance, 'state', None)
@@ -88,23 +78,7 @@ class PersistenceDecorator:
 
             if not flow_uuid:
                 raise ValueError("Flow state must have an 'id' field for persistence")
-
-            # Log state saving only if verbose is True
-            if verbose:
-                cls._printer.print(LOG_MESSAGES["save_state"].format(flow_uuid), color="cyan")
-                logger.info(LOG_MESSAGES["save_state"].format(flow_uuid))
-
-            try:
-                persistence_instance.save_state(
-                    flow_uuid=flow_uuid,
-                    method_name=method_name,
-                    state_data=state,
-                )
-            except Exception as e:
-                error_msg = LOG_MESSAGES["save_error"].format(method_name, str(e))
-                cls._printer.print(error_msg, color="red")
-                logger.error(error_msg)
-                raise RuntimeError(f"State persistence failed: {str(e)}") from e
+            return state, flow_uuid
         except AttributeError:
             error_msg = LOG_MESSAGES["state_missing"]
             cls._printer.print(error_msg, color="red")
@@ -116,6 +90,73 @@ class PersistenceDecorator:
             logger.error(error_msg)
             raise ValueError(error_msg) from e
 
+    @classmethod
+    def _log_save(cls, flow_uuid: str, verbose: bool) -> None:
+        # Log state saving only if verbose is True
+        if verbose:
+            cls._printer.print(LOG_MESSAGES["save_state"].format(flow_uuid), color="cyan")
+            logger.info(LOG_MESSAGES["save_state"].format(flow_uuid))
+
+    @classmethod
+    def _save_failed(cls, method_name: str, error: Exception) -> RuntimeError:
+        error_msg = LOG_MESSAGES["save_error"].format(method_name, str(error))
+        cls._printer.print(error_msg, color="red")
+        logger.error(error_msg)
+        return RuntimeError(f"State persistence failed: {str(error)}")
+
+    @classmethod
+    def persist_state(cls, flow_instance: Any, method_name: str, persistence_instance: FlowPersistence, verbose: bool = False) -> None:
+        """Persist flow state with proper error handling and logging.
+
+        This method handles the persistence of flow state data, including proper
+        error handling and colored console output for status updates.
+
+        Args:
+            flow_instance: The flow instance whose state to persist
+            method_name: Name of the method that triggered persistence
+            persistence_instance: The persistence backend to use
+            verbose: Whether to log persistence operations
+
+        Raises:
+            ValueError: If flow has no state or state lacks an ID
+            RuntimeError: If state persistence fails
+        """
+        state, flow_uuid = cls._flow_uuid(flow_instance)
+        cls._log_save(flow_uuid, verbose)
+        try:
+            persistence_instance.save_state(
+                flow_uuid=flow_uuid,
+                method_name=method_name,
+                state_data=state,
+            )
+        except Exception as e:
+            raise cls._save_failed(method_name, e) from e
+
+    @classmethod
+    async def apersist_state(cls, flow_instance: Any, method_name: str, persistence_instance: FlowPersistence, verbose: bool = False) -> None:
+        """Persist flow state from a coroutine without blocking the event loop.
+
+        Args:
+            flow_instance: The flow instance whose state to persist
+            method_name: Name of the method that triggered persistence
+            persistence_instance: The persistence backend to use
+            verbose: Whether to log persistence operations
+
+        Raises:
+            ValueError: If flow has no state or state lacks an ID
+            RuntimeError: If state persistence fails
+        """
+        state, flow_uuid = cls._flow_uuid(flow_instance)
+        cls._log_save(flow_uuid, verbose)
+        try:
+            await persistence_instance.asave_state(
+                flow_uuid=flow_uuid,
+                method_name=method_name,
+                state_data=state,
+            )
+        except Exception as e:
+            raise cls._save_failed(method_name, e) from e
+
 
 def persist(persistence: Optional[FlowPersistence] = None, verbose: bool = False):
     """Decorator to persist flow state.
@@ -181,7 +222,7 @@ def persist(persistence: Optional[FlowPersistence] = None, verbose: bool = False
                         @functools.wraps(original_method)
                         async def method_wrapper(self: Any, *args: Any, **kwargs: Any) -> Any:
                             result = await original_method(self, *args, **kwargs)
-                            PersistenceDecorator.persist_state(self, method_name, actual_persistence, verbose)
+                            await PersistenceDecorator.apersist_state(self, method_name, actual_persistence, verbose)
                             return result
                         return method_wrapper
 
@@ -230,7 +271,7 @@ def persist(persistence: Optional[FlowPersistence] = None, verbose: bool = False
                         result = await method_coro
                     else:
                         result = method_coro
-                    PersistenceDecorator.persist_state(flow_instance, method.__name__, actual_persistence, verbose)
+                    await PersistenceDecorator.apersist_state(flow_instance, method.__name__, actual_persistence, verbose)
                     return result
 
                 for attr in ["__is_start_method__", "__trigger_methods__", "__condition_type__", "__is_router__"]:
@@ -0,0 +1,120 @@
+"""
+Minimal JSON Patch (RFC 6902) support for flow state deltas.
+
+Only the ``add``, ``remove`` and ``replace`` operations are produced and
+applied, which is all that is needed to move between two JSON documents.
+"""
+
+import copy
+from typing import Any, Dict, List
+
+JsonPatch = List[Dict[str, Any]]
+
+
+def _escape(token: str) -> str:
+    return token.replace("~", "~0").replace("/", "~1")
+
+
+def _unescape(token: str) -> str:
+    return token.replace("~1", "/").replace("~0", "~")
+
+
+def make_patch(old: Any, new: Any, path: str = "") -> JsonPatch:
+    """Compute a patch turning one JSON document into another.
+
+    Objects are compared key by key and lists element by element, so a change
+    deep inside a large state produces a single small operation.
+
+    Args:
+        old: The source document.
+        new: The target document.
+        path: JSON pointer of the documents within their parent.
+
+    Returns:
+        The list of patch operations.
+    """
+    if type(old) is not type(new):
+        return [{"op": "replace", "path": path, "value": new}]
+
+    if isinstance(old, dict):
+        patch: JsonPatch = []
+        for key in old:
+            if key not in new:
+                patch.append({"op": "remove", "path": f"{path}/{_escape(key)}"})
+        for key, value in new.items():
+            child = f"{path}/{_escape(key)}"
+            if key not in old:
+                patch.append({"op": "add", "path": child, "value": value})
+            elif old[key] != value:
+                patch.extend(make_patch(old[key], value, child))
+        return patch
+
+    if isinstance(old, list):
+        if old == new:
+            return []
+        common = min(len(old), len(new))
+        patch = []
+        for i in range(common):
+            if old[i] != new[i]:
+                patch.extend(make_patch(old[i], new[i], f"{path}/{i}"))
+        # Remove from the end so earlier indexes stay valid
+        for i in range(len(old) - 1, common - 1, -1):
+            patch.append({"op": "remove", "path": f"{path}/{i}"})
+        for i in range(common, len(new)):
+            patch.append({"op": "add", "path": f"{path}/{i}", "value": new[i]})
+        return patch
+
+    if old != new:
+        return [{"op": "replace", "path": path, "value": new}]
+    return []
+
+
+def apply_patch(document: Any, patch: JsonPatch, in_place: bool = False) -> Any:
+    """Apply a patch to a JSON document.
+
+    Args:
+        document: The document to patch.
+        patch: Operations produced by :func:`make_patch`.
+        in_place: Whether to modify ``document`` instead of a copy of it.
+
+    Returns:
+        The patched document.
+
+    Raises:
+        ValueError: If an operation is not supported.
+    """
+    if not in_place:
+        document = copy.deepcopy(document)
+    for operation in patch:
+        op, path = operation["op"], operation["path"]
+        if path == "":
+            if op == "remove":
+                document = None
+            else:
+                document = copy.deepcopy(operation["value"])
+            continue
+
+        tokens = [_unescape(token) for token in path.split("/")[1:]]
+        parent = document
+        for token in tokens[:-1]:
+            parent = parent[int(token)] if isinstance(parent, list) else parent[token]
+        last = tokens[-1]
+
+        if isinstance(parent, list):
+            index = len(parent) if last == "-" else int(last)
+            if op == "add":
+                parent.insert(index, copy.deepcopy(operation["value"]))
+            elif op == "remove":
+                del parent[index]
+            elif op == "replace":
+                parent[index] = copy.deepcopy(operation["value"])
+            else:
+                raise ValueError(f"Unsupported patch operation: {op}")
+        else:
+            if op in ("add", "replace"):
+                parent[last] = copy.deepcopy(operation["value"])
+            elif op == "remove":
+                del parent[last]
+            else:
+                raise ValueError(f"Unsupported patch operation: {op}")
+    return document
@@ -2,15 +2,50 @@
 SQLite-based implementation of flow state persistence.
 """
 
+import atexit
 import json
+import logging
 import sqlite3
-from datetime import datetime, timezone
+import threading
+import weakref
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
 from pathlib import Path
-from typing import Any, Dict, Optional, Union
+from typing import Any, Dict, List, Optional, Tuple, Union
 
 from pydantic import BaseModel
 
 from pmoai.flow.persistence.base import FlowPersistence
+from pmoai.flow.persistence.json_patch import apply_patch, make_patch
+from pmoai.utilities.sqlite_pool import get_connection_pool
+
+logger = logging.getLogger(__name__)
+
+# Persistences with buffered steps, flushed when the interpreter exits.
+_buffered_persistences: "weakref.WeakSet[SQLiteFlowPersistence]" = weakref.WeakSet()
+
+
+def _flush_buffered_persistences() -> None:
+    for persistence in list(_buffered_persistences):
+        # A failing persistence must not cost the others their buffered steps
+        try:
+            persistence.close()
+        except Exception as e:
+            logger.error(f"Failed to write buffered flow states to {persistence.db_path}: {e}")
+
+
+atexit.register(_flush_buffered_persistences)
+
+
+class _FlowHead:
+    """Latest known step of a flow, kept to compute the next delta."""
+
+    __slots__ = ("step", "state", "snapshot_step")
+
+    def __init__(self, step: int, state: Dict[str, Any], snapshot_step: int):
+        self.step = step
+        self.state = state
+        self.snapshot_step = snapshot_step
 
 
 class SQLiteFlowPersistence(FlowPersistence):
@@ -18,17 +53,36 @@ class SQLiteFlowPersistence(FlowPersistence):
 
     This class provides a simple, file-based persistence implementation using SQLite.
     It's suitable for development and testing, or for production use cases with
-    moderate performance requirements.
+    moderate performance requirements. Connections come from the shared pool
+    of the database file, so flows persisting to the same file share them.
+
+    Every saved state is a numbered step of its flow. By default each step is
+    stored as a full snapshot. With ``snapshot_interval`` above one, only every
+    n-th step is a snapshot and the steps in between store a JSON patch
+    against the previous step, so a small change to a large state stays
+    small on disk. With ``batch_size`` above one, steps are buffered and
+    written in one transaction; reads flush the buffer first.
     """
 
     db_path: str
 
-    def __init__(self, db_path: Optional[str] = None):
+    def __init__(
+        self,
+        db_path: Optional[str] = None,
+        snapshot_interval: int = 1,
+        batch_size: int = 1,
+        max_cached_flows: int = 1024,
+    ):
         """Initialize SQLite persistence.
 
         Args:
             db_path: Path to the SQLite database file. If not provided, uses
                     db_storage_path() from utilities.paths.
+            snapshot_interval: Number of steps between full snapshots. Steps
+                    in between are stored as deltas.
+            batch_size: Number of steps buffered before they are written.
+            max_cached_flows: Number of flows whose latest state is kept in
+                    memory to compute deltas without reading it back.
 
         Raises:
             ValueError: If db_path is invalid
@@ -40,13 +94,27 @@ class SQLiteFlowPersistence(FlowPersistence):
 
         if not path:
             raise ValueError("Database path must be provided")
+        if snapshot_interval < 1 or batch_size < 1:
+            raise ValueError("snapshot_interval and batch_size must be at least 1")
 
         self.db_path = path  # Now mypy knows this is str
+        self.snapshot_interval = snapshot_interval
+        self.batch_size = batch_size
+        self.max_cached_flows = max_cached_flows
+
+        self._lock = threading.RLock()
+        # Buffered rows, each with the state itself in case its delta must become a snapshot
+        self._pending: List[Tuple[str, str, str, str, int, int, Dict[str, Any]]] = []
+        self._heads: "OrderedDict[str, _FlowHead]" = OrderedDict()
+
+        self._pool = get_connection_pool(path)
         self.init_db()
+        if self.batch_size > 1:
+            _buffered_persistences.add(self)
 
     def init_db(self) -> None:
         """Create the necessary tables if they don't exist."""
-        with sqlite3.connect(self.db_path) as conn:
+        with self._pool.transaction() as conn:
             conn.execute(
                 """
             CREATE TABLE IF NOT EXISTS flow_states (
@@ -65,6 +133,102 @@ class SQLiteFlowPersistence(FlowPersistence):
             ON flow_states(flow_uuid)
             """
             )
+            self._migrate(conn)
+
+    @staticmethod
+    def _migrate(conn: sqlite3.Connection) -> None:
+        """Add step numbers and the delta flag to databases written before them."""
+        columns = {row[1] for row in conn.execute("PRAGMA table_info(flow_states)")}
+        if "step" not in columns:
+            conn.execute("ALTER TABLE flow_states ADD COLUMN step INTEGER")
+            conn.execute(
+                "ALTER TABLE flow_states ADD COLUMN is_delta INTEGER NOT NULL DEFAULT 0"
+            )
+            # Existing rows are full snapshots, numbered in insertion order
+            rows = conn.execute(
+                "SELECT id, flow_uuid FROM flow_states ORDER BY flow_uuid, id"
+            ).fetchall()
+            steps: Dict[str, int] = {}
+            updates = []
+            for row_id, flow_uuid in rows:
+                step = steps.get(flow_uuid, -1) + 1
+                steps[flow_uuid] = step
+                updates.append((step, row_id))
+            conn.executemany("UPDATE flow_states SET step = ? WHERE id = ?", updates)
+        conn.execute(
+            """
+        CREATE UNIQUE INDEX IF NOT EXISTS idx_flow_states_uuid_step
+        ON flow_states(flow_uuid, step)
+        """
+        )
+
+    @staticmethod
+    def _to_dict(state_data: Union[Dict[str, Any], BaseModel]) -> Dict[str, Any]:
+        """Convert state data to a JSON-compatible dictionary."""
+        if isinstance(state_data, BaseModel):
+            return state_data.model_dump(mode="json")
+        if isinstance(state_data, dict):
+            # Round-trip so deltas compare exactly what is stored
+            return json.loads(json.dumps(state_data))
+        raise ValueError(
+            f"state_data must be either a Pydantic BaseModel or dict, got {type(state_data)}"
+        )
+
+    def _remember(self, flow_uuid: str, head: _FlowHead) -> None:
+        self._heads[flow_uuid] = head
+        self._heads.move_to_end(flow_uuid)
+        while len(self._heads) > self.max_cached_flows:
+            self._heads.popitem(last=False)
+
+    def _head(self, flow_uuid: str) -> Optional[_FlowHead]:
+        """Get the latest step of a flow, reading it back if it is not cached."""
+        head = self._heads.get(flow_uuid)
+        if head is not None:
+            self._heads.move_to_end(flow_uuid)
+            return head
+        self._write_pending()
+        with self._pool.connection() as conn:
+            head = self._rebuild(conn, flow_uuid)
+        if head is not None:
+            self._remember(flow_uuid, head)
+        return head
+
+    @staticmethod
+    def _rebuild(
+        conn: sqlite3.Connection, flow_uuid: str, step: Optional[int] = None
+    ) -> Optional[_FlowHead]:
+        """Rebuild a step from its closest snapshot and the deltas after it."""
+        if step is None:
+            step = conn.execute(
+                "SELECT MAX(step) FROM flow_states WHERE flow_uuid = ?", (flow_uuid,)
+            ).fetchone()[0]
+            if step is None:
+                return None
+
+        snapshot = conn.execute(
+            """
+            SELECT step, state_json FROM flow_states
+            WHERE flow_uuid = ? AND step <= ? AND is_delta = 0
+            ORDER BY step DESC LIMIT 1
+            """,
+            (flow_uuid, step),
+        ).fetchone()
+        if snapshot is None:
+            return None
+
+        state = json.loads(snapshot[1])
+        last_step = snapshot[0]
+        for delta_step, delta in conn.execute(
+            """
+            SELECT step, state_json FROM flow_states
+            WHERE flow_uuid = ? AND step > ? AND step <= ?
+            ORDER BY step
+            """,
+            (flow_uuid, snapshot[0], step),
+        ):
+            state = apply_patch(state, json.loads(delta), in_place=True)
+            last_step = delta_step
+        return _FlowHead(last_step, state, snapshot[0])
 
     def save_state(
         self,
@@ -79,33 +243,134 @@ class SQLiteFlowPersistence(FlowPersistence):
             method_name: Name of the method that just completed
             state_data: Current state data (either dict or Pydantic model)
         """
-        # Convert state_data to dict, handling both Pydantic and dict cases
-        if isinstance(state_data, BaseModel):
-            state_dict = dict(state_data)  # Use dict() for better type compatibility
-        elif isinstance(state_data, dict):
-            state_dict = state_data
-        else:
-            raise ValueError(
-                f"state_data must be either a Pydantic BaseModel or dict, got {type(state_data)}"
-            )
+        self._save_dict(flow_uuid, method_name, self._to_dict(state_data))
 
-        with sqlite3.connect(self.db_path) as conn:
-            conn.execute(
-                """
-            INSERT INTO flow_states (
-                flow_uuid,
-                method_name,
-                timestamp,
-                state_json
-            ) VALUES (?, ?, ?, ?)
-            """,
+    def _save_dict(self, flow_uuid: str, method_name: str, state_dict: Dict[str, Any]) -> None:
+        """Save a state already converted with :meth:`_to_dict`."""
+        with self._lock:
+            head = self._head(flow_uuid) if self.snapshot_interval > 1 else None
+            step = head.step + 1 if head is not None else self._next_step(flow_uuid)
+
+            payload = json.dumps(state_dict)
+            is_delta = 0
+            if head is not None and step - head.snapshot_step < self.snapshot_interval:
+                delta = json.dumps(make_patch(head.state, state_dict))
+                # Fall back to a snapshot when the delta is not smaller
+                if len(delta) < len(payload):
+                    payload, is_delta = delta, 1
+
+            self._pending.append(
                 (
                     flow_uuid,
                     method_name,
                     datetime.now(timezone.utc).isoformat(),
-                    json.dumps(state_dict),
-                ),
+                    payload,
+                    step,
+                    is_delta,
+                    state_dict,
+                )
             )
+            if self.snapshot_interval > 1:
+                snapshot_step = head.snapshot_step if is_delta else step
+                self._remember(flow_uuid, _FlowHead(step, state_dict, snapshot_step))
+            else:
+                # Only the step number is needed without deltas
+                self._remember(flow_uuid, _FlowHead(step, {}, step))
+
+            if len(self._pending) >= self.batch_size:
+                self._write_pending()
+
+    def _next_step(self, flow_uuid: str) -> int:
+        """Guess the next step of a flow without rebuilding its state.
+
+        The number is only a hint: the step actually written is numbered
+        when the row is inserted, as another writer may have saved steps of
+        the same flow in the meantime.
+        """
+        head = self._heads.get(flow_uuid)
+        if head is not None:
+            return head.step + 1
+        self._write_pending()
+        with self._pool.connection() as conn:
+            last = conn.execute(
+                "SELECT MAX(step) FROM flow_states WHERE flow_uuid = ?", (flow_uuid,)
+            ).fetchone()[0]
+        return 0 if last is None else last + 1
+
+    def flush(self) -> None:
+        """Write all buffered steps in a single transaction."""
+        self._write_pending()
+
+    def close(self) -> None:
+        """Write all buffered steps before the persistence is discarded."""
+        self.flush()
+
+    def _write_pending(self) -> None:
+        with self._lock:
+            if not self._pending:
+                return
+            pending, self._pending = self._pending, []
+            try:
+                with self._pool.transaction() as conn:
+                    rows, heads = self._number_steps(conn, pending)
+                    conn.executemany(
+                        """
+                    INSERT INTO flow_states (
+                        flow_uuid,
+                        method_name,
+                        timestamp,
+                        state_json,
+                        step,
+                        is_delta
+                    ) VALUES (?, ?, ?, ?, ?, ?)
+                    """,
+                        rows,
+                    )
+            except BaseException:
+                self._pending = pending + self._pending
+                raise
+
+            for flow_uuid, (step, snapshot_step) in heads.items():
+                head = self._heads.get(flow_uuid)
+                if head is not None:
+                    head.step = step
+                    if snapshot_step is not None:
+                        head.snapshot_step = snapshot_step
+
+    @staticmethod
+    def _number_steps(
+        conn: sqlite3.Connection,
+        pending: List[Tuple[str, str, str, str, int, int, Dict[str, Any]]],
+    ) -> Tuple[List[Tuple[str, str, str, str, int, int]], Dict[str, Tuple[int, Optional[int]]]]:
+        """Number buffered steps after the latest stored ones.
+
+        Runs inside the write transaction, which holds the database's write
+        lock, so steps saved by other persistences sharing the file are seen
+        and never numbered twice. Steps of a flow are shifted together, and
+        if the first one was stored as a delta against a step that another
+        writer has since followed, it is written as a snapshot instead.
+
+        Returns:
+            The rows to insert, and the latest step and latest snapshot step
+            written for each flow
+        """
+        offsets: Dict[str, int] = {}
+        heads: Dict[str, Tuple[int, Optional[int]]] = {}
+        rows = []
+        for flow_uuid, method_name, timestamp, payload, step, is_delta, state in pending:
+            offset = offsets.get(flow_uuid)
+            if offset is None:
+                last = conn.execute(
+                    "SELECT MAX(step) FROM flow_states WHERE flow_uuid = ?", (flow_uuid,)
+                ).fetchone()[0]
+                offset = offsets[flow_uuid] = (0 if last is None else last + 1) - step
+                if offset and is_delta:
+                    payload, is_delta = json.dumps(state), 0
+            step += offset
+            snapshot_step = heads.get(flow_uuid, (None, None))[1]
+            heads[flow_uuid] = (step, snapshot_step if is_delta else step)
+            rows.append((flow_uuid, method_name, timestamp, payload, step, is_delta))
+        return rows, heads
 
     def load_state(self, flow_uuid: str) -> Optional[Dict[str, Any]]:
         """Load the most recent state for a given flow UUID.
@@ -116,19 +381,141 @@ class SQLiteFlowPersistence(FlowPersistence):
         Returns:
             The most recent state as a dictionary, or None if no state exists
         """
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.execute(
+        return self.load_state_at(flow_uuid)
+
+    def load_state_at(
+        self, flow_uuid: str, step: Optional[int] = None
+    ) -> Optional[Dict[str, Any]]:
+        """Rebuild the state of a flow as it was after a given step.
+
+        Args:
+            flow_uuid: Unique identifier for the flow instance
+            step: The step to rebuild, counting from 0. Defaults to the latest.
+
+        Returns:
+            The state as a dictionary, or None if the step is not stored
+        """
+        self.flush()
+        with self._pool.connection() as conn:
+            head = self._rebuild(conn, flow_uuid, step)
+        if head is None or (step is not None and head.step != step):
+            return None
+        return head.state
+
+    def list_steps(self, flow_uuid: str) -> List[Dict[str, Any]]:
+        """List the stored steps of a flow.
+
+        Args:
+            flow_uuid: Unique identifier for the flow instance
+
+        Returns:
+            The step number, method name, timestamp and whether the step is
+            stored as a delta, for every step in order
+        """
+        self.flush()
+        with self._pool.connection() as conn:
+            rows = conn.execute(
                 """
-            SELECT state_json
+            SELECT step, method_name, timestamp, is_delta
             FROM flow_states
             WHERE flow_uuid = ?
-            ORDER BY id DESC
-            LIMIT 1
+            ORDER BY step
             """,
                 (flow_uuid,),
+            ).fetchall()
+        return [
+            {"step": row[0], "method_name": row[1], "timestamp": row[2], "is_delta": bool(row[3])}
+            for row in rows
+        ]
+
+    def compact(self, flow_uuid: Optional[str] = None, keep_steps: int = 0) -> int:
+        """Drop history that is no longer needed.
+
+        For each flow, the step ``keep_steps`` before the latest one is
+        rewritten as a snapshot and every earlier step is deleted, so the
+        latest ``keep_steps`` steps can still be rebuilt.
+
+        Args:
+            flow_uuid: The flow to compact. Defaults to every flow.
+            keep_steps: Number of steps before the latest one to keep.
+
+        Returns:
+            The number of deleted rows
+        """
+        self.flush()
+        deleted = 0
+        with self._lock, self._pool.transaction() as conn:
+            if flow_uuid is None:
+                flows = [row[0] for row in conn.execute("SELECT DISTINCT flow_uuid FROM flow_states")]
+            else:
+                flows = [flow_uuid]
+
+            for uuid in flows:
+                last = conn.execute(
+                    "SELECT MAX(step) FROM flow_states WHERE flow_uuid = ?", (uuid,)
+                ).fetchone()[0]
+                if last is None:
+                    continue
+                target = max(last - keep_steps, 0)
+                base = self._rebuild(conn, uuid, target)
+                if base is None:
+                    continue
+                conn.execute(
+                    """
+                UPDATE flow_states SET state_json = ?, is_delta = 0
+                WHERE flow_uuid = ? AND step = ?
+                """,
+                    (json.dumps(base.state), uuid, target),
+                )
+                deleted += conn.execute(
+                    "DELETE FROM flow_states WHERE flow_uuid = ? AND step < ?",
+                    (uuid, target),
+                ).rowcount
+                self._heads.pop(uuid, None)
+        return deleted
+
+    def prune(self, max_age: timedelta) -> int:
+        """Delete flows that have not been updated for a while.
+
+        Args:
+            max_age: Flows whose latest step is older than this are deleted.
+
+        Returns:
+            The number of deleted flows
+        """
+        self.flush()
+        cutoff = (datetime.now(timezone.utc) - max_age).isoformat()
+        with self._lock, self._pool.transaction() as conn:
+            flows = [
+                row[0]
+                for row in conn.execute(
+                    """
+                SELECT flow_uuid FROM flow_states
+                GROUP BY flow_uuid
+                HAVING MAX(timestamp) < ?
+                """,
+                    (cutoff,),
+                )
+            ]
+            conn.executemany(
+                "DELETE FROM flow_states WHERE flow_uuid = ?", [(uuid,) for uuid in flows]
             )
-            row = cursor.fetchone()
+            for uuid in flows:
+                self._heads.pop(uuid, None)
+        return len(flows)
+
+    def delete_flow(self, flow_uuid: str) -> None:
+        """Delete every stored step of a flow.
+
+        Args:
+            flow_uuid: Unique identifier for the flow instance
+        """
+        self.flush()
+        with self._lock, self._pool.transaction() as conn:
+            conn.execute("DELETE FROM flow_states WHERE flow_uuid = ?", (flow_uuid,))
+            self._heads.pop(flow_uuid, None)
 
-        if row:
-            return json.loads(row[0])
-        return None
+    def vacuum(self) -> None:
+        """Return the space freed by compaction and pruning to the file system."""
+        with self._pool.connection() as conn:
+            conn.execute("VACUUM")
@@ -1,6 +1,7 @@
 """Embedder module for PMOAI."""
 
 from pmoai.knowledge.embedder.base_embedder import BaseEmbedder
+from pmoai.knowledge.embedder.embedding_cache import CachedEmbeddingFunction, EmbeddingCache
 from pmoai.knowledge.embedder.fastembed import FastEmbed
 
-__all__ = ["BaseEmbedder", "FastEmbed"]
+__all__ = ["BaseEmbedder", "CachedEmbeddingFunction", "EmbeddingCache", "FastEmbed"]
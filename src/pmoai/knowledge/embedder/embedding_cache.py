@@ -0,0 +1,321 @@
+import hashlib
+import json
+import os
+import re
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from pmoai.utilities.paths import cache_storage_path
+from pmoai.utilities.sqlite_pool import get_connection_pool
+
+
+def text_hash(text: str) -> bytes:
+    """
+    Content hash used as the cache key of a text
+
+    Args:
+        text: Text to hash
+
+    Returns:
+        16-byte blake2b digest
+    """
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=16).digest()
+
+
+class EmbeddingCache:
+    """
+    Content-addressed cache of embeddings keyed by (model name, text hash)
+
+    Vectors live in one append-only float32 file per model and dimension that
+    is read through ``np.memmap``; a SQLite index maps each key to its row.
+    An in-process LRU sits in front so repeated texts never touch the disk.
+    """
+
+    _default: Optional["EmbeddingCache"] = None
+    _default_lock = threading.Lock()
+
+    def __init__(
+        self,
+        cache_dir: Optional[Union[str, Path]] = None,
+        max_memory_entries: int = 10000,
+    ):
+        """
+        Initialize the embedding cache
+
+        Args:
+            cache_dir: Directory holding the vector files and index
+            max_memory_entries: Number of vectors kept in the in-process LRU
+        """
+        self.cache_dir = Path(cache_dir or Path(cache_storage_path()) / "embeddings")
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.max_memory_entries = max_memory_entries
+
+        self._lru: "OrderedDict[Tuple[str, bytes], np.ndarray]" = OrderedDict()
+        self._lock = threading.RLock()
+        self._maps: Dict[Tuple[str, int], np.memmap] = {}
+        self._pool = get_connection_pool(str(self.cache_dir / "index.db"))
+        with self._pool.transaction() as conn:
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS embeddings (
+                    model TEXT NOT NULL,
+                    text_hash BLOB NOT NULL,
+                    dim INTEGER NOT NULL,
+                    row INTEGER NOT NULL,
+                    PRIMARY KEY (model, text_hash)
+                ) WITHOUT ROWID
+                """
+            )
+
+    @classmethod
+    def default(cls) -> "EmbeddingCache":
+        """
+        Get the shared cache under the PMOAI cache directory
+
+        Returns:
+            The process-wide default cache
+        """
+        with cls._default_lock:
+            if cls._default is None:
+                cls._default = cls()
+            return cls._default
+
+    def _vector_file(self, model: str, dim: int) -> Path:
+        safe_model = re.sub(r"[^A-Za-z0-9_.-]", "_", model)
+        return self.cache_dir / f"{safe_model}.{dim}.f32"
+
+    def _rows(self, model: str, dim: int, rows: Sequence[int]) -> np.ndarray:
+        """Read rows from the memory-mapped vector file, remapping if it grew"""
+        key = (model, dim)
+        mapped = self._maps.get(key)
+        if mapped is None or max(rows) >= mapped.shape[0]:
+            path = self._vector_file(model, dim)
+            count = os.path.getsize(path) // (dim * 4)
+            mapped = np.memmap(path, dtype=np.float32, mode="r", shape=(count, dim))
+            self._maps[key] = mapped
+        return np.array(mapped[list(rows)])
+
+    def _remember(self, key: Tuple[str, bytes], vector: np.ndarray) -> None:
+        self._lru[key] = vector
+        self._lru.move_to_end(key)
+        while len(self._lru) > self.max_memory_entries:
+            self._lru.popitem(last=False)
+
+    @staticmethod
+    def _lookup(conn: Any, model: str, digests: List[bytes]) -> List[Tuple[bytes, int, int]]:
+        """Fetch (text_hash, dim, row) for the cached digests"""
+        rows: List[Tuple[bytes, int, int]] = []
+        # Stay well below SQLite's bound parameter limit
+        for start in range(0, len(digests), 500):
+            chunk = digests[start : start + 500]
+            rows.extend(
+                conn.execute(
+                    f"""
+                    SELECT text_hash, dim, row FROM embeddings
+                    WHERE model = ? AND text_hash IN ({", ".join("?" * len(chunk))})
+                    """,
+                    [model, *chunk],
+                )
+            )
+        return rows
+
+    def get_many(self, model: str, texts: Sequence[str]) -> List[Optional[np.ndarray]]:
+        """
+        Look up cached embeddings
+
+        Args:
+            model: Name of the embedding model
+            texts: Texts to look up
+
+        Returns:
+            One vector per text, or None where the text is not cached
+        """
+        hashes = [text_hash(text) for text in texts]
+        results: List[Optional[np.ndarray]] = [None] * len(texts)
+        pending: Dict[bytes, List[int]] = {}
+
+        with self._lock:
+            for i, digest in enumerate(hashes):
+                vector = self._lru.get((model, digest))
+                if vector is not None:
+                    self._lru.move_to_end((model, digest))
+                    results[i] = vector
+                else:
+                    pending.setdefault(digest, []).append(i)
+
+            if not pending:
+                return results
+
+            found: Dict[int, List[Tuple[int, bytes]]] = {}
+            with self._pool.connection() as conn:
+                for digest, dim, row in self._lookup(conn, model, list(pending)):
+                    found.setdefault(dim, []).append((row, digest))
+
+            for dim, entries in found.items():
+                vectors = self._rows(model, dim, [row for row, _ in entries])
+                for (_, digest), vector in zip(entries, vectors):
+                    self._remember((model, digest), vector)
+                    for i in pending[digest]:
+                        results[i] = vector
+
+        return results
+
+    def put_many(self, model: str, texts: Sequence[str], vectors: Sequence[Any]) -> None:
+        """
+        Store embeddings
+
+        Args:
+            model: Name of the embedding model
+            texts: Texts that were embedded
+            vectors: Their embeddings, all of the same dimension
+        """
+        if not texts:
+            return
+        matrix = np.asarray(vectors, dtype=np.float32)
+        if matrix.ndim != 2:
+            raise ValueError("Embeddings must all have the same dimension")
+        dim = matrix.shape[1]
+
+        unique: Dict[bytes, np.ndarray] = {}
+        for text, vector in zip(texts, matrix):
+            unique.setdefault(text_hash(text), vector)
+
+        with self._lock, self._pool.transaction() as conn:
+            # The write transaction also serialises appends across processes
+            cached = {row[0] for row in self._lookup(conn, model, list(unique))}
+            new = [digest for digest in unique if digest not in cached]
+            if new:
+                path = self._vector_file(model, dim)
+                with open(path, "ab") as handle:
+                    first_row = handle.seek(0, os.SEEK_END) // (dim * 4)
+                    handle.write(np.stack([unique[d] for d in new]).tobytes())
+                    # The rows must be durable before the index that points at them commits
+                    handle.flush()
+                    os.fsync(handle.fileno())
+                conn.executemany(
+                    "INSERT INTO embeddings (model, text_hash, dim, row) VALUES (?, ?, ?, ?)",
+                    [(model, digest, dim, first_row + i) for i, digest in enumerate(new)],
+                )
+            for digest, vector in unique.items():
+                self._remember((model, digest), vector)
+
+    def embed(
+        self,
+        model: str,
+        texts: Sequence[str],
+        embed_fn: Callable[[List[str]], Sequence[Any]],
+    ) -> List[np.ndarray]:
+        """
+        Embed texts, calling the model only for texts that are not cached
+
+        Args:
+            model: Name of the embedding model
+            texts: Texts to embed
+            embed_fn: Function embedding a list of texts
+
+        Returns:
+            One embedding per text, in input order
+        """
+        results = self.get_many(model, texts)
+        missing: Dict[str, List[int]] = {}
+        for i, vector in enumerate(results):
+            if vector is None:
+                missing.setdefault(texts[i], []).append(i)
+
+        if missing:
+            missing_texts = list(missing)
+            vectors = [np.asarray(v, dtype=np.float32) for v in embed_fn(missing_texts)]
+            self.put_many(model, missing_texts, vectors)
+            for text, vector in zip(missing_texts, vectors):
+                for i in missing[text]:
+                    results[i] = vector
+
+        return results  # type: ignore[return-value]
+
+    def clear(self) -> None:
+        """
+        Remove every cached embedding
+        """
+        with self._lock, self._pool.transaction() as conn:
+            conn.execute("DELETE FROM embeddings")
+            self._lru.clear()
+            self._maps.clear()
+            for path in self.cache_dir.glob("*.f32"):
+                path.unlink()
+
+
+class CachedEmbeddingFunction:
+    """
+    Wraps a Chroma-style embedding function with an ``EmbeddingCache``
+
+    Other attributes are forwarded to the wrapped function so it can still be
+    inspected by the vector store.
+    """
+
+    def __init__(
+        self,
+        embedding_function: Any,
+        cache: Optional[EmbeddingCache] = None,
+        model_name: Optional[str] = None,
+    ):
+        """
+        Initialize the wrapper
+
+        Args:
+            embedding_function: Callable taking a list of texts
+            cache: Cache to use, defaults to the shared cache
+            model_name: Cache namespace, defaults to one derived from the
+                function's configuration or model name
+
+        Raises:
+            ValueError: If no model_name is given and the function exposes
+                neither its configuration nor its model name
+        """
+        self._embedding_function = embedding_function
+        self._cache = cache or EmbeddingCache.default()
+        self._model_name = model_name or self._namespace(embedding_function)
+
+    @staticmethod
+    def _namespace(embedding_function: Any) -> str:
+        """
+        Derive a cache namespace that differs between differently configured embedders
+
+        Args:
+            embedding_function: The wrapped function
+
+        Returns:
+            The function's class, with the digest of its configuration when
+            it has one, or its model name otherwise
+        """
+        cls = type(embedding_function)
+        prefix = f"{cls.__module__}.{cls.__qualname__}"
+
+        get_config = getattr(embedding_function, "get_config", None)
+        if callable(get_config):
+            try:
+                config = json.dumps(get_config(), sort_keys=True, default=repr)
+            except Exception:
+                config = None
+            if config is not None:
+                return f"{prefix}:{hashlib.blake2b(config.encode(), digest_size=8).hexdigest()}"
+
+        model_name = getattr(embedding_function, "model_name", None) or getattr(
+            embedding_function, "_model_name", None
+        )
+        if isinstance(model_name, str) and model_name:
+            return f"{prefix}:{model_name}"
+
+        # The class alone would let differently configured instances share vectors
+        raise ValueError(
+            f"Cannot tell how {prefix} is configured; pass model_name to cache its embeddings"
+        )
+
+    def __call__(self, input: List[str]) -> List[np.ndarray]:
+        return self._cache.embed(self._model_name, list(input), self._embedding_function)
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._embedding_function, name)
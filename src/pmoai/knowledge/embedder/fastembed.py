@@ -4,6 +4,7 @@ from typing import List, Optional, Union
 import numpy as np
 
 from .base_embedder import BaseEmbedder
+from .embedding_cache import EmbeddingCache
 
 try:
     from fastembed_gpu import TextEmbedding  # type: ignore
@@ -27,6 +28,8 @@ class FastEmbed(BaseEmbedder):
         self,
         model_name: str = "BAAI/bge-small-en-v1.5",
         cache_dir: Optional[Union[str, Path]] = None,
+        embedding_cache: Optional[EmbeddingCache] = None,
+        cache_embeddings: bool = True,
     ):
         """
         Initialize the embedding model
@@ -34,7 +37,8 @@ class FastEmbed(BaseEmbedder):
         Args:
             model_name: Name of the model to use
             cache_dir: Directory to cache the model
-            gpu: Whether to use GPU acceleration
+            embedding_cache: Cache of computed embeddings, defaults to the shared cache
+            cache_embeddings: Whether to reuse embeddings of previously seen texts
         """
         if not FASTEMBED_AVAILABLE:
             raise ImportError(
@@ -42,10 +46,24 @@ class FastEmbed(BaseEmbedder):
                 "uv pip install fastembed or uv pip install fastembed-gpu for GPU support"
             )
 
+        self.model_name = model_name
         self.model = TextEmbedding(
             model_name=model_name,
             cache_dir=str(cache_dir) if cache_dir else None,
         )
+        self.embedding_cache = (
+            (embedding_cache or EmbeddingCache.default()) if cache_embeddings else None
+        )
+
+    def _embed(self, texts: List[str]) -> List[np.ndarray]:
+        """
+        Embed texts, reusing cached embeddings when the cache is enabled
+        """
+        if self.embedding_cache is None:
+            return list(self.model.embed(texts))
+        return self.embedding_cache.embed(
+            self.model_name, texts, lambda missing: list(self.model.embed(missing))
+        )
 
     def embed_chunks(self, chunks: List[str]) -> List[np.ndarray]:
         """
@@ -57,7 +75,7 @@ class FastEmbed(BaseEmbedder):
         Returns:
             List of embeddings
         """
-        embeddings = list(self.model.embed(chunks))
+        embeddings = self._embed(chunks)
         return embeddings
 
     def embed_texts(self, texts: List[str]) -> List[np.ndarray]:
@@ -70,7 +88,7 @@ class FastEmbed(BaseEmbedder):
         Returns:
             List of embeddings
         """
-        embeddings = list(self.model.embed(texts))
+        embeddings = self._embed(texts)
         return embeddings
 
     def embed_text(self, text: str) -> np.ndarray:
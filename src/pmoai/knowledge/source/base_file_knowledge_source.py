@@ -6,6 +6,7 @@ from typing import Any, Dict, List, Optional, Union
 from pydantic import Field
 
 from pmoai.knowledge.source.base_knowledge_source import BaseKnowledgeSource
+from pmoai.knowledge.storage.knowledge_manifest import file_content_hash
 
 
 class BaseFileKnowledgeSource(BaseKnowledgeSource):
@@ -54,12 +55,43 @@ class BaseFileKnowledgeSource(BaseKnowledgeSource):
     def add(self) -> None:
         """
         Add this knowledge source to the knowledge base.
+
+        Files whose size and modification time, or content, match the
+        ingestion manifest are skipped. Otherwise only the chunks that changed
+        since the last ingestion are replaced.
         """
         if self.storage is None:
             raise ValueError("Storage is not initialized.")
 
-        chunks = self.get_chunks()
-        self.storage.add_texts(chunks, self.metadata)
+        path = Path(self.file_path)
+        source_key = str(path.resolve())
+        stat = path.stat()
+
+        manifest = getattr(self.storage, "manifest", None)
+        entry = manifest.get(source_key) if manifest is not None else None
+        if entry is not None and entry.chunking == self.chunking:
+            if entry.mtime_ns == stat.st_mtime_ns and entry.size == stat.st_size:
+                return
+
+            content_hash = file_content_hash(path)
+            if entry.content_hash == content_hash:
+                # Touched but not modified
+                manifest.record(
+                    entry.model_copy(
+                        update={"mtime_ns": stat.st_mtime_ns, "size": stat.st_size}
+                    )
+                )
+                return
+        else:
+            content_hash = file_content_hash(path)
+
+        self._store_chunks(
+            source_key,
+            self.iter_chunks(),
+            content_hash,
+            mtime_ns=stat.st_mtime_ns,
+            size=stat.st_size,
+        )
 
     @abstractmethod
     def get_content(self) -> str:
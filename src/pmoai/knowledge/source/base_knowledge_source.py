@@ -1,8 +1,10 @@
 from abc import ABC, abstractmethod
-from typing import Any, Dict, List, Optional
+import hashlib
+from typing import Any, Dict, Iterable, Iterator, List, Optional
 
 from pydantic import BaseModel, Field, ConfigDict
 
+from pmoai.knowledge.storage.knowledge_manifest import ManifestEntry, chunk_id
 from pmoai.knowledge.storage.knowledge_storage import KnowledgeStorage
 
 
@@ -27,6 +29,9 @@ class BaseKnowledgeSource(ABC, BaseModel):
     chunk_overlap: int = Field(
         default=200, description="The overlap between chunks"
     )
+    batch_size: int = Field(
+        default=64, description="The number of chunks embedded and stored at once"
+    )
 
     @abstractmethod
     def add(self) -> None:
@@ -45,6 +50,31 @@ class BaseKnowledgeSource(ABC, BaseModel):
         """
         pass
 
+    def iter_content(self) -> Iterator[str]:
+        """
+        Iterate over the content of this knowledge source in blocks.
+
+        Sources reading large files override this to yield one page or row
+        at a time instead of building the whole content in memory.
+
+        Yields:
+            Consecutive blocks of the content.
+        """
+        yield self.get_content()
+
+    def iter_chunks(self) -> Iterator[str]:
+        """
+        Iterate over the chunks of this knowledge source.
+
+        Yields:
+            The chunks of this knowledge source.
+        """
+        from pmoai.knowledge.utils.knowledge_utils import iter_paragraphs, iter_text_chunks
+
+        return iter_text_chunks(
+            iter_paragraphs(self.iter_content()), self.chunk_size, self.chunk_overlap
+        )
+
     def get_chunks(self) -> List[str]:
         """
         Get the chunks of this knowledge source.
@@ -52,10 +82,102 @@ class BaseKnowledgeSource(ABC, BaseModel):
         Returns:
             The chunks of this knowledge source.
         """
-        from pmoai.knowledge.utils.knowledge_utils import split_text_into_chunks
+        return list(self.iter_chunks())
+
+    @property
+    def chunking(self) -> str:
+        """
+        Chunking settings of this knowledge source.
+
+        Returns:
+            The chunk size and overlap, as stored in the ingestion manifest.
+        """
+        return f"{self.chunk_size}:{self.chunk_overlap}"
+
+    def _store_chunks(
+        self,
+        source_key: str,
+        chunks: Iterable[str],
+        content_hash: str,
+        mtime_ns: Optional[int] = None,
+        size: Optional[int] = None,
+    ) -> None:
+        """
+        Store chunks under deterministic IDs, replacing only what changed.
+
+        Chunks that were stored for this source before and are still present
+        are left as they are, chunks that disappeared are deleted and new
+        chunks are embedded and added in batches of ``batch_size``, so only
+        one batch of chunk text is held in memory. The result is recorded in
+        the storage's ingestion manifest, if it has one.
+
+        Args:
+            source_key: Key identifying this knowledge source.
+            chunks: The chunks of this knowledge source.
+            content_hash: Hash of the content the chunks were made from.
+            mtime_ns: Modification time of the source file, if any.
+            size: Size of the source file in bytes, if any.
+        """
+        manifest = getattr(self.storage, "manifest", None)
+        previous = manifest.get(source_key) if manifest is not None else None
+        known = set(previous.chunk_ids) if previous is not None else set()
+
+        # Identical chunks map onto the same ID and are stored once. Only the
+        # IDs are kept for the whole source, in order.
+        seen: Dict[str, None] = {}
+        batch_ids: List[str] = []
+        batch_texts: List[str] = []
+        for chunk in chunks:
+            current_id = chunk_id(source_key, chunk)
+            if current_id in seen:
+                continue
+            seen[current_id] = None
+            if current_id in known:
+                continue
+            batch_ids.append(current_id)
+            batch_texts.append(chunk)
+            if len(batch_ids) >= self.batch_size:
+                self.storage.add_texts(batch_texts, self.metadata, ids=batch_ids)
+                batch_ids, batch_texts = [], []
+        if batch_ids:
+            self.storage.add_texts(batch_texts, self.metadata, ids=batch_ids)
+
+        stale = [i for i in known if i not in seen]
+        if stale:
+            self.storage.delete_texts(stale)
+
+        if manifest is not None:
+            manifest.record(
+                ManifestEntry(
+                    source_key=source_key,
+                    mtime_ns=mtime_ns,
+                    size=size,
+                    content_hash=content_hash,
+                    chunking=self.chunking,
+                    chunk_ids=list(seen),
+                )
+            )
+
+    def _add_content(self, source_key: Optional[str] = None) -> None:
+        """
+        Add the content of this knowledge source unless it was already ingested.
 
+        Args:
+            source_key: Key identifying this knowledge source. Sources without
+                a stable identity are keyed by their content.
+        """
         content = self.get_content()
-        chunks = split_text_into_chunks(
-            content, self.chunk_size, self.chunk_overlap
-        )
-        return chunks
+        content_hash = hashlib.blake2b(content.encode("utf-8"), digest_size=16).hexdigest()
+        if source_key is None:
+            source_key = f"content:{content_hash}"
+
+        manifest = getattr(self.storage, "manifest", None)
+        entry = manifest.get(source_key) if manifest is not None else None
+        if (
+            entry is not None
+            and entry.content_hash == content_hash
+            and entry.chunking == self.chunking
+        ):
+            return
+
+        self._store_chunks(source_key, self.iter_chunks(), content_hash)
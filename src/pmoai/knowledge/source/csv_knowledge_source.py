@@ -1,6 +1,8 @@
 import csv
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Union
+from typing import Any, Dict, Iterator, List, Optional, Union
+
+from pydantic import Field
 
 from pmoai.knowledge.source.base_file_knowledge_source import BaseFileKnowledgeSource
 
@@ -10,6 +12,10 @@ class CSVKnowledgeSource(BaseFileKnowledgeSource):
     A knowledge source that reads from a CSV file.
     """
 
+    encoding: str = Field(default="utf-8", description="The encoding of the file")
+    delimiter: str = Field(default=",", description="The delimiter used in the CSV file")
+    quotechar: str = Field(default='"', description="The quote character used in the CSV file")
+
     def __init__(
         self,
         file_path: Union[str, Path],
@@ -30,10 +36,14 @@ class CSVKnowledgeSource(BaseFileKnowledgeSource):
             metadata: Optional metadata for this knowledge source.
             **kwargs: Additional keyword arguments.
         """
-        self.encoding = encoding
-        self.delimiter = delimiter
-        self.quotechar = quotechar
-        super().__init__(file_path=file_path, metadata=metadata, **kwargs)
+        super().__init__(
+            file_path=file_path,
+            encoding=encoding,
+            delimiter=delimiter,
+            quotechar=quotechar,
+            metadata=metadata,
+            **kwargs,
+        )
 
     def get_content(self) -> str:
         """
@@ -42,20 +52,26 @@ class CSVKnowledgeSource(BaseFileKnowledgeSource):
         Returns:
             The content of this knowledge source.
         """
-        rows = []
+        return "".join(row + "\n" for row in self.iter_content())
+
+    def iter_content(self) -> Iterator[str]:
+        """
+        Iterate over the rows of this knowledge source.
+
+        Rows are read one at a time and each row is its own block, so chunks
+        group whole rows and the file is never held in memory.
+
+        Yields:
+            Each row rendered as a dictionary keyed by the header.
+        """
         with open(self.file_path, "r", encoding=self.encoding) as f:
             reader = csv.reader(f, delimiter=self.delimiter, quotechar=self.quotechar)
-            header = next(reader)
+            header = next(reader, None)
+            if header is None:
+                return
             for row in reader:
                 row_dict = {}
                 for i, cell in enumerate(row):
                     if i < len(header):
                         row_dict[header[i]] = cell
-                rows.append(row_dict)
-
-        # Convert to string
-        content = ""
-        for row in rows:
-            content += str(row) + "\n"
-
-        return content
+                yield str(row_dict)
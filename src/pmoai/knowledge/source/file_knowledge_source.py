@@ -1,6 +1,6 @@
 import os
 from pathlib import Path
-from typing import Any, Dict, Optional, Union
+from typing import Any, Dict, Iterator, Optional, Union
 
 from pmoai.knowledge.source.base_file_knowledge_source import BaseFileKnowledgeSource
 from pmoai.knowledge.source.csv_knowledge_source import CSVKnowledgeSource
@@ -76,3 +76,12 @@ class FileKnowledgeSource(BaseFileKnowledgeSource):
             The content of this knowledge source.
         """
         return self._source.get_content()
+
+    def iter_content(self) -> Iterator[str]:
+        """
+        Iterate over the content of this knowledge source in blocks.
+
+        Yields:
+            Consecutive blocks of the content.
+        """
+        return self._source.iter_content()
@@ -1,5 +1,5 @@
 from pathlib import Path
-from typing import Any, Dict, Optional, Union
+from typing import Any, Dict, Iterator, Optional, Union
 
 from pmoai.knowledge.source.base_file_knowledge_source import BaseFileKnowledgeSource
 
@@ -32,6 +32,18 @@ class PDFKnowledgeSource(BaseFileKnowledgeSource):
         Returns:
             The content of this knowledge source.
         """
+        return "".join(page + "\n\n" for page in self.iter_content())
+
+    def iter_content(self) -> Iterator[str]:
+        """
+        Iterate over the pages of this knowledge source.
+
+        Pages are extracted one at a time, so the text of the whole document
+        is never held in memory.
+
+        Yields:
+            The text of each page.
+        """
         try:
             import pypdf
         except ImportError:
@@ -43,8 +55,5 @@ class PDFKnowledgeSource(BaseFileKnowledgeSource):
         # Read PDF file
         with open(self.file_path, "rb") as f:
             pdf = pypdf.PdfReader(f)
-            content = ""
             for page in pdf.pages:
-                content += page.extract_text() + "\n\n"
-
-        return content
+                yield page.extract_text()
@@ -1,5 +1,7 @@
 from pathlib import Path
-from typing import Any, Dict, Optional, Union
+from typing import Any, Dict, Iterator, List, Optional, Union
+
+from pydantic import Field
 
 from pmoai.knowledge.source.base_file_knowledge_source import BaseFileKnowledgeSource
 
@@ -9,6 +11,8 @@ class TextFileKnowledgeSource(BaseFileKnowledgeSource):
     A knowledge source that reads from a text file.
     """
 
+    encoding: str = Field(default="utf-8", description="The encoding of the file")
+
     def __init__(
         self,
         file_path: Union[str, Path],
@@ -25,8 +29,9 @@ class TextFileKnowledgeSource(BaseFileKnowledgeSource):
             metadata: Optional metadata for this knowledge source.
             **kwargs: Additional keyword arguments.
         """
-        self.encoding = encoding
-        super().__init__(file_path=file_path, metadata=metadata, **kwargs)
+        super().__init__(
+            file_path=file_path, encoding=encoding, metadata=metadata, **kwargs
+        )
 
     def get_content(self) -> str:
         """
@@ -37,3 +42,23 @@ class TextFileKnowledgeSource(BaseFileKnowledgeSource):
         """
         with open(self.file_path, "r", encoding=self.encoding) as f:
             return f.read()
+
+    def iter_content(self) -> Iterator[str]:
+        """
+        Iterate over the paragraphs of this knowledge source.
+
+        The file is read line by line and a block is yielded at each blank
+        line, so only one paragraph is held in memory.
+
+        Yields:
+            Consecutive blocks of the content.
+        """
+        with open(self.file_path, "r", encoding=self.encoding) as f:
+            lines: List[str] = []
+            for line in f:
+                if line == "\n":
+                    yield "".join(lines)
+                    lines = []
+                else:
+                    lines.append(line)
+            yield "".join(lines)
@@ -46,8 +46,7 @@ class URLKnowledgeSource(BaseKnowledgeSource):
         if self.storage is None:
             raise ValueError("Storage is not initialized.")
 
-        chunks = self.get_chunks()
-        self.storage.add_texts(chunks, self.metadata)
+        self._add_content(self.url)
 
     def get_content(self) -> str:
         """
@@ -1,6 +1,7 @@
 """Knowledge storage module for PMOAI."""
 
 from pmoai.knowledge.storage.base_knowledge_storage import BaseKnowledgeStorage
+from pmoai.knowledge.storage.knowledge_manifest import KnowledgeManifest, ManifestEntry
 from pmoai.knowledge.storage.knowledge_storage import KnowledgeStorage
 
-__all__ = ["BaseKnowledgeStorage", "KnowledgeStorage"]
+__all__ = ["BaseKnowledgeStorage", "KnowledgeManifest", "KnowledgeStorage", "ManifestEntry"]
@@ -13,7 +13,10 @@ class BaseKnowledgeStorage(ABC):
 
     @abstractmethod
     def add_texts(
-        self, texts: List[str], metadata: Optional[Dict[str, Any]] = None
+        self,
+        texts: List[str],
+        metadata: Optional[Dict[str, Any]] = None,
+        ids: Optional[List[str]] = None,
     ) -> None:
         """
         Add texts to the knowledge storage.
@@ -21,9 +24,22 @@ class BaseKnowledgeStorage(ABC):
         Args:
             texts: List of texts to add.
             metadata: Optional metadata to associate with the texts.
+            ids: Optional IDs of the texts. Texts with an existing ID replace
+                the stored record instead of adding a duplicate.
         """
         pass
 
+    def delete_texts(self, ids: List[str]) -> None:
+        """
+        Delete texts from the knowledge storage.
+
+        Args:
+            ids: IDs of the texts to delete.
+        """
+        raise NotImplementedError(
+            f"{type(self).__name__} does not support deleting texts."
+        )
+
     @abstractmethod
     def search(
         self,
@@ -0,0 +1,177 @@
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import List, Optional, Union
+
+from pydantic import BaseModel, Field
+
+from pmoai.utilities.paths import db_storage_path
+from pmoai.utilities.sqlite_pool import get_connection_pool
+
+
+def file_content_hash(file_path: Union[str, Path], block_size: int = 1 << 20) -> str:
+    """
+    Hash the content of a file without reading it into memory at once.
+
+    Args:
+        file_path: The path to the file.
+        block_size: Number of bytes read per block.
+
+    Returns:
+        Hex blake2b digest of the file content.
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    with open(file_path, "rb") as handle:
+        for block in iter(lambda: handle.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def chunk_id(source_key: str, chunk: str) -> str:
+    """
+    Deterministic ID of a chunk of a knowledge source.
+
+    The ID depends only on the source and the chunk text, so re-ingesting an
+    unchanged chunk maps onto the same record in the vector store.
+
+    Args:
+        source_key: Key identifying the knowledge source.
+        chunk: The chunk text.
+
+    Returns:
+        The chunk ID.
+    """
+    source = hashlib.blake2b(source_key.encode("utf-8"), digest_size=8).hexdigest()
+    content = hashlib.blake2b(chunk.encode("utf-8"), digest_size=16).hexdigest()
+    return f"doc_{source}_{content}"
+
+
+class ManifestEntry(BaseModel):
+    """
+    Record of an ingested knowledge source.
+    """
+
+    source_key: str = Field(..., description="Key identifying the source")
+    mtime_ns: Optional[int] = Field(default=None, description="Modification time of the file")
+    size: Optional[int] = Field(default=None, description="Size of the file in bytes")
+    content_hash: str = Field(..., description="Hash of the ingested content")
+    chunking: str = Field(default="", description="Chunking settings the content was split with")
+    chunk_ids: List[str] = Field(default_factory=list, description="IDs of the stored chunks")
+
+
+class KnowledgeManifest:
+    """
+    Manifest of the sources ingested into a knowledge collection.
+
+    Entries are kept in SQLite next to the vector store, so a later run can
+    tell from a file's size and modification time, or failing that its
+    content hash, whether it needs to be ingested again.
+    """
+
+    def __init__(self, collection_name: str, db_path: Optional[str] = None):
+        """
+        Initialize the manifest.
+
+        Args:
+            collection_name: Name of the collection the sources are stored in.
+            db_path: Path to the manifest database.
+        """
+        self.collection_name = collection_name
+        if db_path is None:
+            os.makedirs(db_storage_path(), exist_ok=True)
+            db_path = os.path.join(db_storage_path(), "knowledge_manifest.db")
+        self.db_path = db_path
+        self._pool = get_connection_pool(db_path)
+        with self._pool.transaction() as conn:
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS knowledge_sources (
+                    collection_name TEXT NOT NULL,
+                    source_key TEXT NOT NULL,
+                    mtime_ns INTEGER,
+                    size INTEGER,
+                    content_hash TEXT NOT NULL,
+                    chunking TEXT NOT NULL,
+                    chunk_ids TEXT NOT NULL,
+                    PRIMARY KEY (collection_name, source_key)
+                ) WITHOUT ROWID
+                """
+            )
+
+    def get(self, source_key: str) -> Optional[ManifestEntry]:
+        """
+        Get the entry of an ingested source.
+
+        Args:
+            source_key: Key identifying the source.
+
+        Returns:
+            The manifest entry, or None if the source was never ingested.
+        """
+        with self._pool.connection() as conn:
+            row = conn.execute(
+                """
+                SELECT mtime_ns, size, content_hash, chunking, chunk_ids FROM knowledge_sources
+                WHERE collection_name = ? AND source_key = ?
+                """,
+                (self.collection_name, source_key),
+            ).fetchone()
+        if row is None:
+            return None
+        return ManifestEntry(
+            source_key=source_key,
+            mtime_ns=row[0],
+            size=row[1],
+            content_hash=row[2],
+            chunking=row[3],
+            chunk_ids=json.loads(row[4]),
+        )
+
+    def record(self, entry: ManifestEntry) -> None:
+        """
+        Record an ingested source, replacing any previous entry.
+
+        Args:
+            entry: The manifest entry.
+        """
+        with self._pool.transaction() as conn:
+            conn.execute(
+                """
+                INSERT OR REPLACE INTO knowledge_sources
+                (collection_name, source_key, mtime_ns, size, content_hash, chunking, chunk_ids)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+                """,
+                (
+                    self.collection_name,
+                    entry.source_key,
+                    entry.mtime_ns,
+                    entry.size,
+                    entry.content_hash,
+                    entry.chunking,
+                    json.dumps(entry.chunk_ids),
+                ),
+            )
+
+    def remove(self, source_key: str) -> None:
+        """
+        Forget an ingested source.
+
+        Args:
+            source_key: Key identifying the source.
+        """
+        with self._pool.transaction() as conn:
+            conn.execute(
+                "DELETE FROM knowledge_sources WHERE collection_name = ? AND source_key = ?",
+                (self.collection_name, source_key),
+            )
+
+    def clear(self) -> None:
+        """
+        Forget every source of the collection.
+        """
+        with self._pool.transaction() as conn:
+            conn.execute(
+                "DELETE FROM knowledge_sources WHERE collection_name = ?",
+                (self.collection_name,),
+            )
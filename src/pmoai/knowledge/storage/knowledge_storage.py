@@ -1,13 +1,15 @@
+import heapq
 import os
 import uuid
 from pathlib import Path
 from typing import Any, Dict, List, Optional, Union
 
 import numpy as np
-from pydantic import BaseModel, ConfigDict
+from pydantic import BaseModel, ConfigDict, Field
 
 from pmoai.knowledge.embedder.fastembed import FastEmbed
 from pmoai.knowledge.storage.base_knowledge_storage import BaseKnowledgeStorage
+from pmoai.knowledge.storage.knowledge_manifest import KnowledgeManifest
 from pmoai.utilities.paths import db_storage_path
 
 
@@ -20,6 +22,13 @@ class KnowledgeStorage(BaseKnowledgeStorage, BaseModel):
 
     model_config = ConfigDict(arbitrary_types_allowed=True)
 
+    collection_name: str = ""
+    embedder_config: Dict[str, Any] = Field(default_factory=dict)
+    embedder: Any = None
+    client: Any = None
+    collection: Any = None
+    manifest: Optional[KnowledgeManifest] = None
+
     def __init__(
         self,
         collection_name: Optional[str] = None,
@@ -32,11 +41,13 @@ class KnowledgeStorage(BaseKnowledgeStorage, BaseModel):
             collection_name: Name of the collection to use.
             embedder: Optional embedder configuration.
         """
+        super().__init__()
         self.collection_name = collection_name or f"knowledge_{uuid.uuid4().hex[:8]}"
         self.embedder_config = embedder or {}
         self.embedder = FastEmbed(**self.embedder_config)
         self.client = None
         self.collection = None
+        self.manifest = None
 
     def initialize_knowledge_storage(self) -> None:
         """
@@ -69,8 +80,14 @@ class KnowledgeStorage(BaseKnowledgeStorage, BaseModel):
                 embedding_function=None,  # We'll handle embeddings ourselves
             )
 
+        if self.manifest is None:
+            self.manifest = KnowledgeManifest(self.collection_name)
+
     def add_texts(
-        self, texts: List[str], metadata: Optional[Dict[str, Any]] = None
+        self,
+        texts: List[str],
+        metadata: Optional[Dict[str, Any]] = None,
+        ids: Optional[List[str]] = None,
     ) -> None:
         """
         Add texts to the knowledge storage.
@@ -78,30 +95,54 @@ class KnowledgeStorage(BaseKnowledgeStorage, BaseModel):
         Args:
             texts: List of texts to add.
             metadata: Optional metadata to associate with the texts.
+            ids: Optional IDs of the texts. Texts with an existing ID replace
+                the stored record instead of adding a duplicate.
         """
         if not texts:
             return
 
+        if ids is not None and len(ids) != len(texts):
+            raise ValueError("The number of IDs must match the number of texts.")
+
         if self.collection is None:
             self.initialize_knowledge_storage()
 
         # Generate embeddings
         embeddings = self.embedder.embed_texts(texts)
 
-        # Generate IDs
-        ids = [f"doc_{uuid.uuid4().hex}" for _ in range(len(texts))]
-
         # Prepare metadata
         metadatas = [metadata or {} for _ in range(len(texts))]
 
+        if ids is None:
+            # Generate IDs
+            ids = [f"doc_{uuid.uuid4().hex}" for _ in range(len(texts))]
+            write = self.collection.add
+        else:
+            write = self.collection.upsert
+
         # Add to collection
-        self.collection.add(
+        write(
             ids=ids,
             embeddings=[embedding.tolist() for embedding in embeddings],
             documents=texts,
             metadatas=metadatas,
         )
 
+    def delete_texts(self, ids: List[str]) -> None:
+        """
+        Delete texts from the knowledge storage.
+
+        Args:
+            ids: IDs of the texts to delete.
+        """
+        if not ids:
+            return
+
+        if self.collection is None:
+            self.initialize_knowledge_storage()
+
+        self.collection.delete(ids=ids)
+
     def search(
         self,
         query: Union[str, List[str]],
@@ -111,6 +152,9 @@ class KnowledgeStorage(BaseKnowledgeStorage, BaseModel):
         """
         Search for texts in the knowledge storage.
 
+        All queries are sent to the vector store in one call. A chunk returned
+        for several queries is reported once, with its best score.
+
         Args:
             query: Query text or list of query texts.
             limit: Maximum number of results to return.
@@ -126,38 +170,41 @@ class KnowledgeStorage(BaseKnowledgeStorage, BaseModel):
         if isinstance(query, str):
             query = [query]
 
+        if not query:
+            return []
+
         # Generate embeddings
         query_embeddings = self.embedder.embed_texts(query)
 
-        # Search
-        results = []
-        for i, embedding in enumerate(query_embeddings):
-            result = self.collection.query(
-                query_embeddings=[embedding.tolist()],
-                n_results=limit,
-                include=["documents", "metadatas", "distances"],
-            )
+        # Search all queries in one round trip to the vector store
+        result = self.collection.query(
+            query_embeddings=[embedding.tolist() for embedding in query_embeddings],
+            n_results=limit,
+            include=["documents", "metadatas", "distances"],
+        )
 
-            # Process results
-            for j in range(len(result["ids"][0])):
-                distance = result["distances"][0][j]
+        # Keep the best score of chunks returned for several queries
+        best: Dict[str, Dict[str, Any]] = {}
+        for ids, documents, metadatas, distances in zip(
+            result["ids"], result["documents"], result["metadatas"], result["distances"]
+        ):
+            for chunk_id, document, metadata, distance in zip(
+                ids, documents, metadatas, distances
+            ):
                 # Convert distance to score (1.0 - distance)
                 score = 1.0 - distance
-
-                if score >= score_threshold:
-                    results.append(
-                        {
-                            "text": result["documents"][0][j],
-                            "metadata": result["metadatas"][0][j],
-                            "score": score,
-                        }
-                    )
-
-        # Sort by score
-        results.sort(key=lambda x: x["score"], reverse=True)
-
-        # Limit results
-        return results[:limit]
+                if score < score_threshold:
+                    continue
+                seen = best.get(chunk_id)
+                if seen is None or score > seen["score"]:
+                    best[chunk_id] = {
+                        "text": document,
+                        "metadata": metadata,
+                        "score": score,
+                    }
+
+        # Top results by score
+        return heapq.nlargest(limit, best.values(), key=lambda x: x["score"])
 
     def reset(self) -> None:
         """
@@ -166,4 +213,6 @@ class KnowledgeStorage(BaseKnowledgeStorage, BaseModel):
         if self.client is not None and self.collection is not None:
             self.client.delete_collection(self.collection_name)
             self.collection = None
+            if self.manifest is not None:
+                self.manifest.clear()
             self.initialize_knowledge_storage()
@@ -1,5 +1,9 @@
 """Knowledge utilities module for PMOAI."""
 
-from pmoai.knowledge.utils.knowledge_utils import split_text_into_chunks
+from pmoai.knowledge.utils.knowledge_utils import (
+    iter_paragraphs,
+    iter_text_chunks,
+    split_text_into_chunks,
+)
 
-__all__ = ["split_text_into_chunks"]
+__all__ = ["iter_paragraphs", "iter_text_chunks", "split_text_into_chunks"]
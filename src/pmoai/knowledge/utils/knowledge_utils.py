@@ -1,56 +1,87 @@
-from typing import List
+from collections import deque
+from typing import Deque, Iterable, Iterator, List
 
 
-def split_text_into_chunks(
-    text: str, chunk_size: int = 1000, chunk_overlap: int = 200
-) -> List[str]:
+def iter_paragraphs(blocks: Iterable[str]) -> Iterator[str]:
     """
-    Split text into chunks of a specified size with overlap.
+    Split blocks of text into non-empty paragraphs.
 
     Args:
-        text: The text to split.
-        chunk_size: The size of each chunk.
-        chunk_overlap: The overlap between chunks.
+        blocks: Blocks of text, such as the pages of a document.
 
-    Returns:
-        A list of text chunks.
+    Yields:
+        The stripped paragraphs of each block, in order.
     """
-    if not text:
-        return []
+    for block in blocks:
+        for paragraph in block.split("\n\n"):
+            paragraph = paragraph.strip()
+            if paragraph:
+                yield paragraph
 
-    # Split text into paragraphs
-    paragraphs = text.split("\n\n")
-    paragraphs = [p.strip() for p in paragraphs if p.strip()]
 
-    chunks = []
-    current_chunk = []
+def iter_text_chunks(
+    paragraphs: Iterable[str], chunk_size: int = 1000, chunk_overlap: int = 200
+) -> Iterator[str]:
+    """
+    Group paragraphs into chunks of a specified size with overlap.
+
+    Only the paragraphs of the chunk being built are held in memory, so the
+    input can be a generator over a file of any size.
+
+    Args:
+        paragraphs: The paragraphs to group.
+        chunk_size: The size of each chunk.
+        chunk_overlap: The overlap between chunks.
+
+    Yields:
+        The text chunks.
+    """
+    current_chunk: Deque[str] = deque()
     current_size = 0
 
     for paragraph in paragraphs:
         # If adding this paragraph would exceed the chunk size,
-        # save the current chunk and start a new one
+        # emit the current chunk and start a new one
         paragraph_size = len(paragraph)
         if current_size + paragraph_size > chunk_size and current_chunk:
-            chunks.append("\n\n".join(current_chunk))
-            
+            yield "\n\n".join(current_chunk)
+
             # Keep some paragraphs for overlap
             overlap_size = 0
-            overlap_paragraphs = []
+            overlap_paragraphs: Deque[str] = deque()
             for p in reversed(current_chunk):
                 if overlap_size + len(p) <= chunk_overlap:
-                    overlap_paragraphs.insert(0, p)
+                    overlap_paragraphs.appendleft(p)
                     overlap_size += len(p)
                 else:
                     break
-            
+
             current_chunk = overlap_paragraphs
             current_size = overlap_size
-        
+
         current_chunk.append(paragraph)
         current_size += paragraph_size
-    
-    # Add the last chunk if it's not empty
+
+    # Emit the last chunk if it's not empty
     if current_chunk:
-        chunks.append("\n\n".join(current_chunk))
-    
-    return chunks
+        yield "\n\n".join(current_chunk)
+
+
+def split_text_into_chunks(
+    text: str, chunk_size: int = 1000, chunk_overlap: int = 200
+) -> List[str]:
+    """
+    Split text into chunks of a specified size with overlap.
+
+    Args:
+        text: The text to split.
+        chunk_size: The size of each chunk.
+        chunk_overlap: The overlap between chunks.
+
+    Returns:
+        A list of text chunks.
+    """
+    if not text:
+        return []
+
+    return list(iter_text_chunks(iter_paragraphs([text]), chunk_size, chunk_overlap))
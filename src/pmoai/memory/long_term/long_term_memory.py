@@ -14,9 +14,23 @@ class LongTermMemory(Memory):
     LongTermMemoryItem instances.
     """
 
-    def __init__(self, storage=None, path=None):
+    def __init__(self, storage=None, path=None, write_buffer_size=0, flush_interval=None):
+        """
+        Args:
+            storage: Storage to use. Defaults to an LTMSQLiteStorage.
+            path: Database path of the default storage.
+            write_buffer_size: Number of saves the default storage buffers
+                before writing them in one transaction. 0 writes every save
+                immediately.
+            flush_interval: Seconds after which the default storage writes
+                buffered saves even if the buffer is not full.
+        """
         if not storage:
-            storage = LTMSQLiteStorage(db_path=path) if path else LTMSQLiteStorage()
+            storage = LTMSQLiteStorage(
+                db_path=path,
+                write_buffer_size=write_buffer_size,
+                flush_interval=flush_interval,
+            )
         super().__init__(storage=storage)
 
     def save(self, item: LongTermMemoryItem) -> None:
@@ -32,5 +46,11 @@ class LongTermMemory(Memory):
     def search(self, task: str, latest_n: int = 3) -> List[Dict[str, Any]]:
         return self.storage.load(task, latest_n)
 
+    def flush(self) -> None:
+        """Writes any saves still held in the storage's write-behind buffer."""
+        flush = getattr(self.storage, "flush", None)
+        if callable(flush):
+            flush()
+
     def reset(self) -> None:
         self.storage.reset()
@@ -1,9 +1,10 @@
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Iterable, List, Optional, Union
 
 from crewai.memory.memory import Memory
 from pydantic import BaseModel, Field
 
 from pmoai.memory.storage.project_memory_storage import ProjectMemoryStorage
+from pmoai.memory.storage.project_memory_vector_index import ProjectMemoryVectorIndex
 
 
 class ProjectMemoryItem(BaseModel):
@@ -30,6 +31,7 @@ class ProjectMemory(Memory):
         project_name: str,
         project_code: Optional[str] = None,
         storage: Optional[ProjectMemoryStorage] = None,
+        vector_index: Optional[ProjectMemoryVectorIndex] = None,
         **kwargs: Any,
     ):
         """Initialize the project memory.
@@ -38,11 +40,14 @@ class ProjectMemory(Memory):
             project_name: The name of the project.
             project_code: The project code.
             storage: The storage to use for the memory.
+            vector_index: Optional embedding index for semantic search. Only
+                used when no storage is given.
             **kwargs: Additional arguments to pass to the parent constructor.
         """
         storage = storage or ProjectMemoryStorage(
             project_name=project_name,
             project_code=project_code,
+            vector_index=vector_index,
         )
         super().__init__(storage=storage, **kwargs)
         self.project_name = project_name
@@ -129,15 +134,115 @@ class ProjectMemory(Memory):
         )
         self.storage.save(item)
     
+    def add_many(
+        self,
+        memory_type: str,
+        contents: Iterable[str],
+        author: Optional[str] = None,
+        tags: Optional[List[str]] = None,
+        metadata: Optional[Dict[str, Any]] = None,
+    ) -> int:
+        """Add many memories of one type in a single transaction.
+        
+        Args:
+            memory_type: The type of the memories (e.g., 'decision', 'issue', 'lesson').
+            contents: The memory contents. May be a generator for large imports.
+            author: The author of the memories.
+            tags: Tags associated with every memory.
+            metadata: Additional metadata for every memory.
+            
+        Returns:
+            The number of memories added.
+        """
+        timestamp = self._get_current_timestamp()
+        items = (
+            ProjectMemoryItem(
+                project_name=self.project_name,
+                project_code=self.project_code,
+                memory_type=memory_type,
+                content=content,
+                timestamp=timestamp,
+                author=author,
+                tags=list(tags or []),
+                metadata=dict(metadata or {}),
+            )
+            for content in contents
+        )
+        return self.storage.save_many(items)
+    
+    def import_items(
+        self, items: Iterable[Union[ProjectMemoryItem, Dict[str, Any]]]
+    ) -> int:
+        """Import memory items, e.g. lessons learned from past projects.
+        
+        Dictionaries are converted to ``ProjectMemoryItem`` and default to this
+        memory's project and the current time. Items are streamed into a single
+        transaction, so a generator keeps memory use flat for very large imports.
+        
+        Args:
+            items: The items to import.
+            
+        Returns:
+            The number of items imported.
+        """
+        timestamp = self._get_current_timestamp()
+        
+        def normalized() -> Iterable[ProjectMemoryItem]:
+            for item in items:
+                if isinstance(item, dict):
+                    item = ProjectMemoryItem(
+                        **{
+                            "project_name": self.project_name,
+                            "project_code": self.project_code,
+                            "timestamp": timestamp,
+                            **item,
+                        }
+                    )
+                yield item
+        
+        return self.storage.save_many(normalized())
+    
+    def search(
+        self,
+        query: str,
+        limit: int = 3,
+        score_threshold: Optional[float] = None,
+        mode: Optional[str] = None,
+    ) -> List[ProjectMemoryItem]:
+        """Search all memories of the project.
+        
+        Args:
+            query: The search query.
+            limit: The maximum number of results to return.
+            score_threshold: The minimum score for results, on the scale of
+                the search mode. Defaults to no minimum.
+            mode: The search mode ("lexical", "semantic" or "hybrid").
+            
+        Returns:
+            A list of matching memories.
+        """
+        return self.storage.search(
+            query=query,
+            limit=limit,
+            score_threshold=score_threshold,
+            mode=mode,
+        )
+    
     def search_decisions(
-        self, query: str, limit: int = 5, score_threshold: float = 0.35
+        self,
+        query: str,
+        limit: int = 5,
+        score_threshold: Optional[float] = None,
+        mode: Optional[str] = None,
     ) -> List[ProjectMemoryItem]:
         """Search for decisions in the project memory.
         
         Args:
             query: The search query.
             limit: The maximum number of results to return.
-            score_threshold: The minimum similarity score for results.
+            score_threshold: The minimum score for results, on the scale of
+                the search mode. Defaults to no minimum.
+            mode: The search mode ("lexical", "semantic" or "hybrid").
             
         Returns:
             A list of matching decisions.
@@ -147,17 +252,24 @@ class ProjectMemory(Memory):
             memory_type="decision",
             limit=limit,
             score_threshold=score_threshold,
+            mode=mode,
         )
     
     def search_issues(
-        self, query: str, limit: int = 5, score_threshold: float = 0.35
+        self,
+        query: str,
+        limit: int = 5,
+        score_threshold: Optional[float] = None,
+        mode: Optional[str] = None,
     ) -> List[ProjectMemoryItem]:
         """Search for issues in the project memory.
         
         Args:
             query: The search query.
             limit: The maximum number of results to return.
-            score_threshold: The minimum similarity score for results.
+            score_threshold: The minimum score for results, on the scale of
+                the search mode. Defaults to no minimum.
+            mode: The search mode ("lexical", "semantic" or "hybrid").
             
         Returns:
             A list of matching issues.
@@ -167,17 +279,24 @@ class ProjectMemory(Memory):
             memory_type="issue",
             limit=limit,
             score_threshold=score_threshold,
+            mode=mode,
         )
     
     def search_lessons(
-        self, query: str, limit: int = 5, score_threshold: float = 0.35
+        self,
+        query: str,
+        limit: int = 5,
+        score_threshold: Optional[float] = None,
+        mode: Optional[str] = None,
     ) -> List[ProjectMemoryItem]:
         """Search for lessons in the project memory.
         
         Args:
             query: The search query.
             limit: The maximum number of results to return.
-            score_threshold: The minimum similarity score for results.
+            score_threshold: The minimum score for results, on the scale of
+                the search mode. Defaults to no minimum.
+            mode: The search mode ("lexical", "semantic" or "hybrid").
             
         Returns:
             A list of matching lessons.
@@ -187,6 +306,7 @@ class ProjectMemory(Memory):
             memory_type="lesson",
             limit=limit,
             score_threshold=score_threshold,
+            mode=mode,
         )
     
     def _get_current_timestamp(self) -> str:
@@ -5,6 +5,7 @@ from pmoai.memory.storage.interface import Storage
 from pmoai.memory.storage.kickoff_task_outputs_storage import KickoffTaskOutputsSQLiteStorage
 from pmoai.memory.storage.ltm_sqlite_storage import LTMSQLiteStorage
 from pmoai.memory.storage.project_memory_storage import ProjectMemoryStorage
+from pmoai.memory.storage.project_memory_vector_index import ProjectMemoryVectorIndex
 from pmoai.memory.storage.rag_storage import RAGStorage
 
 __all__ = [
@@ -12,6 +13,7 @@ __all__ = [
     "KickoffTaskOutputsSQLiteStorage",
     "LTMSQLiteStorage",
     "ProjectMemoryStorage",
+    "ProjectMemoryVectorIndex",
     "RAGStorage",
     "Storage",
 ]
@@ -7,15 +7,20 @@ from datetime import datetime
 from pathlib import Path
 from typing import Any, Dict, List, Optional
 
+from pmoai.utilities.sqlite_pool import get_connection_pool
+
 
 class KickoffTaskOutputsSQLiteStorage:
     """Storage for kickoff task outputs using SQLite."""
     
-    def __init__(self, db_path: Optional[str] = None):
+    def __init__(
+        self, db_path: Optional[str] = None, busy_timeout: Optional[float] = None
+    ):
         """Initialize the storage.
         
         Args:
             db_path: The path to the SQLite database file.
+            busy_timeout: Seconds to wait on a locked database before failing.
         """
         # Determine the database path
         if db_path is None:
@@ -26,28 +31,24 @@ class KickoffTaskOutputsSQLiteStorage:
             db_path = os.path.join(pmoai_dir, "kickoff_task_outputs.db")
         
         self.db_path = db_path
+        self._pool = get_connection_pool(self.db_path, busy_timeout=busy_timeout)
         
         # Initialize the database
         self._init_db()
     
     def _init_db(self) -> None:
         """Initialize the database schema."""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        # Create the kickoff_task_outputs table if it doesn't exist
-        cursor.execute("""
-        CREATE TABLE IF NOT EXISTS kickoff_task_outputs (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            task_id TEXT NOT NULL,
-            expected_output TEXT NOT NULL,
-            raw TEXT NOT NULL,
-            timestamp TEXT NOT NULL
-        )
-        """)
-        
-        conn.commit()
-        conn.close()
+        with self._pool.transaction() as conn:
+            # Create the kickoff_task_outputs table if it doesn't exist
+            conn.execute("""
+            CREATE TABLE IF NOT EXISTS kickoff_task_outputs (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                task_id TEXT NOT NULL,
+                expected_output TEXT NOT NULL,
+                raw TEXT NOT NULL,
+                timestamp TEXT NOT NULL
+            )
+            """)
     
     def save(self, task_outputs: List[Dict[str, Any]]) -> None:
         """Save task outputs to the storage.
@@ -55,30 +56,28 @@ class KickoffTaskOutputsSQLiteStorage:
         Args:
             task_outputs: The task outputs to save.
         """
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        # Clear existing task outputs
-        cursor.execute("DELETE FROM kickoff_task_outputs")
-        
-        # Insert new task outputs
-        for task_output in task_outputs:
-            cursor.execute(
+        timestamp = datetime.now().isoformat()
+        with self._pool.transaction() as conn:
+            # Clear existing task outputs
+            conn.execute("DELETE FROM kickoff_task_outputs")
+            
+            # Insert new task outputs
+            conn.executemany(
                 """
                 INSERT INTO kickoff_task_outputs
                 (task_id, expected_output, raw, timestamp)
                 VALUES (?, ?, ?, ?)
                 """,
-                (
-                    task_output["task_id"],
-                    task_output["expected_output"],
-                    task_output["raw"],
-                    datetime.now().isoformat(),
-                ),
+                [
+                    (
+                        task_output["task_id"],
+                        task_output["expected_output"],
+                        task_output["raw"],
+                        timestamp,
+                    )
+                    for task_output in task_outputs
+                ],
             )
-        
-        conn.commit()
-        conn.close()
     
     def load(self) -> List[Dict[str, Any]]:
         """Load task outputs from the storage.
@@ -86,37 +85,26 @@ class KickoffTaskOutputsSQLiteStorage:
         Returns:
             The task outputs.
         """
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
-        
-        # Query task outputs
-        cursor.execute(
-            """
-            SELECT task_id, expected_output, raw, timestamp
-            FROM kickoff_task_outputs
-            ORDER BY id
-            """
-        )
-        
-        rows = cursor.fetchall()
+        with self._pool.connection() as conn:
+            cursor = conn.cursor()
+            cursor.row_factory = sqlite3.Row
+            
+            # Query task outputs
+            cursor.execute(
+                """
+                SELECT task_id, expected_output, raw, timestamp
+                FROM kickoff_task_outputs
+                ORDER BY id
+                """
+            )
+            
+            rows = cursor.fetchall()
         
         # Convert rows to dictionaries
-        task_outputs = []
-        for row in rows:
-            task_outputs.append(dict(row))
-        
-        conn.close()
-        
-        return task_outputs
+        return [dict(row) for row in rows]
     
     def clear(self) -> None:
         """Clear all task outputs from the storage."""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        # Clear existing task outputs
-        cursor.execute("DELETE FROM kickoff_task_outputs")
-        
-        conn.commit()
-        conn.close()
+        with self._pool.transaction() as conn:
+            # Clear existing task outputs
+            conn.execute("DELETE FROM kickoff_task_outputs")
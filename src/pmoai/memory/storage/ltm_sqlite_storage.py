@@ -1,37 +1,109 @@
+import atexit
+import hashlib
 import json
 import sqlite3
+import threading
+import weakref
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Union
+from typing import Any, Dict, List, Optional, Tuple, Union
 
 from pmoai.utilities import Printer
 from pmoai.utilities.paths import db_storage_path
+from pmoai.utilities.sqlite_pool import get_connection_pool
+
+
+def task_description_hash(task_description: str) -> int:
+    """Return a signed 64-bit hash of a task description.
+
+    The hash is stored next to the description so lookups compare a small
+    integer through an index instead of scanning long text values.
+    """
+    digest = hashlib.blake2b(task_description.encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "big", signed=True)
+
+
+def _migrate_v1(conn: sqlite3.Connection) -> None:
+    """Add the task hash column and the lookup index."""
+    columns = {row[1] for row in conn.execute("PRAGMA table_info(long_term_memories)")}
+    if "task_hash" not in columns:
+        conn.execute("ALTER TABLE long_term_memories ADD COLUMN task_hash INTEGER")
+    conn.create_function(
+        "pmoai_task_hash", 1, task_description_hash, deterministic=True
+    )
+    conn.execute(
+        """
+        UPDATE long_term_memories
+        SET task_hash = pmoai_task_hash(task_description)
+        WHERE task_hash IS NULL AND task_description IS NOT NULL
+        """
+    )
+    # Serves both the equality filter and the ORDER BY of load() from the index.
+    conn.execute(
+        """
+        CREATE INDEX IF NOT EXISTS idx_ltm_task_hash_datetime_score
+        ON long_term_memories (task_hash, datetime DESC, score ASC)
+        """
+    )
+
+
+# Schema migrations, applied in order and tracked with PRAGMA user_version.
+_MIGRATIONS = [_migrate_v1]
+
+# Storages with a write-behind buffer, flushed when the interpreter exits.
+_buffered_storages: "weakref.WeakSet[LTMSQLiteStorage]" = weakref.WeakSet()
+
+
+def _flush_buffered_storages() -> None:
+    for storage in list(_buffered_storages):
+        storage.flush()
+
+
+atexit.register(_flush_buffered_storages)
 
 
 class LTMSQLiteStorage:
     """
     An updated SQLite storage class for LTM data storage.
+
+    When ``write_buffer_size`` is set, saves are queued in a write-behind
+    buffer and written with a single ``executemany`` transaction once the
+    buffer is full, ``flush_interval`` seconds after the first queued save,
+    on :meth:`flush`, or at interpreter exit. Unflushed rows are still
+    returned by :meth:`load`.
     """
 
     def __init__(
-        self, db_path: Optional[str] = None
+        self,
+        db_path: Optional[str] = None,
+        busy_timeout: Optional[float] = None,
+        write_buffer_size: int = 0,
+        flush_interval: Optional[float] = None,
     ) -> None:
         if db_path is None:
             # Get the parent directory of the default db path and create our db file there
             db_path = str(Path(db_storage_path()) / "long_term_memory_storage.db")
         self.db_path = db_path
+        self.write_buffer_size = write_buffer_size
+        self.flush_interval = flush_interval
         self._printer: Printer = Printer()
+        self._buffer: List[Tuple[str, int, str, str, Union[int, float]]] = []
+        self._buffer_lock = threading.RLock()
+        self._flush_timer: Optional[threading.Timer] = None
         # Ensure parent directory exists
         Path(self.db_path).parent.mkdir(parents=True, exist_ok=True)
+        self._pool = get_connection_pool(self.db_path, busy_timeout=busy_timeout)
         self._initialize_db()
+        if self.write_buffer_size > 0:
+            _buffered_storages.add(self)
 
     def _initialize_db(self):
         """
-        Initializes the SQLite database and creates LTM table
+        Initializes the SQLite database, creates LTM table and applies any
+        pending schema migrations
         """
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.cursor()
-                cursor.execute(
+            with self._pool.transaction() as conn:
+                conn.execute(
                     """
                     CREATE TABLE IF NOT EXISTS long_term_memories (
                         id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -42,11 +114,14 @@ class LTMSQLiteStorage:
                     )
                 """
                 )
-
-                conn.commit()
+                version = conn.execute("PRAGMA user_version").fetchone()[0]
+                for migration in _MIGRATIONS[version:]:
+                    migration(conn)
+                if version < len(_MIGRATIONS):
+                    conn.execute(f"PRAGMA user_version = {len(_MIGRATIONS)}")
         except sqlite3.Error as e:
             self._printer.print(
-                content=f"MEMORY ERROR: An error occurred during database initialization: {e}",
+                f"MEMORY ERROR: An error occurred during database initialization: {e}",
                 color="red",
             )
 
@@ -58,71 +133,120 @@ class LTMSQLiteStorage:
         score: Union[int, float],
     ) -> None:
         """Saves data to the LTM table with error handling."""
+        row = (
+            task_description,
+            task_description_hash(task_description),
+            json.dumps(metadata),
+            datetime,
+            score,
+        )
+        if self.write_buffer_size <= 0:
+            self._write_rows([row])
+            return
+
+        with self._buffer_lock:
+            self._buffer.append(row)
+            if len(self._buffer) >= self.write_buffer_size:
+                self.flush()
+            elif self.flush_interval is not None and self._flush_timer is None:
+                self._flush_timer = threading.Timer(self.flush_interval, self.flush)
+                self._flush_timer.daemon = True
+                self._flush_timer.start()
+
+    def flush(self) -> None:
+        """Writes all buffered saves to the LTM table in one transaction."""
+        with self._buffer_lock:
+            if self._flush_timer is not None:
+                self._flush_timer.cancel()
+                self._flush_timer = None
+            rows, self._buffer = self._buffer, []
+            if rows and not self._write_rows(rows):
+                # Keep the rows so a later flush can retry them.
+                self._buffer[:0] = rows
+
+    def _write_rows(self, rows: List[Tuple[str, int, str, str, Union[int, float]]]) -> bool:
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.cursor()
-                cursor.execute(
+            with self._pool.transaction() as conn:
+                conn.executemany(
                     """
-                INSERT INTO long_term_memories (task_description, metadata, datetime, score)
-                VALUES (?, ?, ?, ?)
+                INSERT INTO long_term_memories (task_description, task_hash, metadata, datetime, score)
+                VALUES (?, ?, ?, ?, ?)
             """,
-                    (task_description, json.dumps(metadata), datetime, score),
+                    rows,
                 )
-                conn.commit()
         except sqlite3.Error as e:
             self._printer.print(
-                content=f"MEMORY ERROR: An error occurred while saving to LTM: {e}",
+                f"MEMORY ERROR: An error occurred while saving to LTM: {e}",
                 color="red",
             )
+            return False
+        return True
 
     def load(
         self, task_description: str, latest_n: int
     ) -> Optional[List[Dict[str, Any]]]:
         """Queries the LTM table by task description with error handling."""
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.cursor()
-                cursor.execute(
-                    f"""
+            # Held across both reads so a concurrent flush cannot move rows between them
+            with self._buffer_lock, self._pool.connection() as conn:
+                cursor = conn.execute(
+                    """
                     SELECT metadata, datetime, score
                     FROM long_term_memories
-                    WHERE task_description = ?
+                    WHERE task_hash = ? AND task_description = ?
                     ORDER BY datetime DESC, score ASC
-                    LIMIT {latest_n}
+                    LIMIT ?
                 """,
-                    (task_description,),
+                    (task_description_hash(task_description), task_description, int(latest_n)),
                 )
                 rows = cursor.fetchall()
-                if rows:
-                    return [
-                        {
-                            "metadata": json.loads(row[0]),
-                            "datetime": row[1],
-                            "score": row[2],
-                        }
-                        for row in rows
-                    ]
+                pending = self._pending_rows(task_description)
+            if pending:
+                rows = sorted(rows + pending, key=lambda row: row[2])
+                rows.sort(key=lambda row: row[1], reverse=True)
+                rows = rows[:latest_n]
+            if rows:
+                return [
+                    {
+                        "metadata": json.loads(row[0]),
+                        "datetime": row[1],
+                        "score": row[2],
+                    }
+                    for row in rows
+                ]
 
         except sqlite3.Error as e:
             self._printer.print(
-                content=f"MEMORY ERROR: An error occurred while querying LTM: {e}",
+                f"MEMORY ERROR: An error occurred while querying LTM: {e}",
                 color="red",
             )
         return None
 
+    def _pending_rows(self, task_description: str) -> List[Tuple[str, str, Union[int, float]]]:
+        """Returns buffered rows for a task description that are not yet written."""
+        with self._buffer_lock:
+            return [
+                (metadata, datetime, score)
+                for description, _, metadata, datetime, score in self._buffer
+                if description == task_description
+            ]
+
     def reset(
         self,
     ) -> None:
         """Resets the LTM table with error handling."""
+        with self._buffer_lock:
+            if self._flush_timer is not None:
+                self._flush_timer.cancel()
+                self._flush_timer = None
+            self._buffer = []
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.cursor()
-                cursor.execute("DELETE FROM long_term_memories")
-                conn.commit()
+            with self._pool.transaction() as conn:
+                conn.execute("DELETE FROM long_term_memories")
 
         except sqlite3.Error as e:
             self._printer.print(
-                content=f"MEMORY ERROR: An error occurred while deleting all rows in LTM: {e}",
+                f"MEMORY ERROR: An error occurred while deleting all rows in LTM: {e}",
                 color="red",
             )
         return None
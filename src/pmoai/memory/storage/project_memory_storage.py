@@ -1,12 +1,18 @@
 import json
 import os
+import re
 import sqlite3
 from datetime import datetime
-from typing import Any, Dict, List, Optional, Union
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
 
 from crewai.memory.storage.interface import Storage
 from pydantic import BaseModel, Field
 
+from pmoai.memory.storage.project_memory_vector_index import ProjectMemoryVectorIndex
+from pmoai.utilities.sqlite_pool import get_connection_pool
+
+SEARCH_MODES = ("lexical", "semantic", "hybrid")
+
 
 class ProjectMemoryStorage(Storage):
     """Storage for project memory items.
@@ -19,6 +25,8 @@ class ProjectMemoryStorage(Storage):
         project_name: str,
         project_code: Optional[str] = None,
         db_path: Optional[str] = None,
+        busy_timeout: Optional[float] = None,
+        vector_index: Optional[ProjectMemoryVectorIndex] = None,
     ):
         """Initialize the project memory storage.
         
@@ -26,9 +34,12 @@ class ProjectMemoryStorage(Storage):
             project_name: The name of the project.
             project_code: The project code.
             db_path: The path to the SQLite database file.
+            busy_timeout: Seconds to wait on a locked database before failing.
+            vector_index: Optional embedding index enabling semantic and hybrid search.
         """
         self.project_name = project_name
         self.project_code = project_code
+        self.vector_index = vector_index
         
         # Determine the database path
         if db_path is None:
@@ -46,32 +57,98 @@ class ProjectMemoryStorage(Storage):
             db_path = os.path.join(pmoai_dir, filename)
         
         self.db_path = db_path
+        self._pool = get_connection_pool(self.db_path, busy_timeout=busy_timeout)
         
         # Initialize the database
         self._init_db()
     
     def _init_db(self) -> None:
         """Initialize the database schema."""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        # Create the project_memories table if it doesn't exist
-        cursor.execute("""
-        CREATE TABLE IF NOT EXISTS project_memories (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            project_name TEXT NOT NULL,
-            project_code TEXT,
-            memory_type TEXT NOT NULL,
-            content TEXT NOT NULL,
-            timestamp TEXT NOT NULL,
-            author TEXT,
-            tags TEXT,
-            metadata TEXT
-        )
+        with self._pool.transaction() as conn:
+            # Create the project_memories table if it doesn't exist
+            conn.execute("""
+            CREATE TABLE IF NOT EXISTS project_memories (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                project_name TEXT NOT NULL,
+                project_code TEXT,
+                memory_type TEXT NOT NULL,
+                content TEXT NOT NULL,
+                timestamp TEXT NOT NULL,
+                author TEXT,
+                tags TEXT,
+                metadata TEXT
+            )
+            """)
+            
+            # Index the columns every search filters and orders on, with and
+            # without a project code
+            conn.execute("""
+            CREATE INDEX IF NOT EXISTS idx_project_memories_scope
+            ON project_memories (project_name, project_code, memory_type, timestamp)
+            """)
+            conn.execute("""
+            CREATE INDEX IF NOT EXISTS idx_project_memories_type
+            ON project_memories (project_name, memory_type, timestamp)
+            """)
+            
+            self._fts_enabled = self._init_fts(conn)
+            
+            if self.vector_index is not None:
+                self.vector_index.init_schema(conn)
+    
+    def _init_fts(self, conn: sqlite3.Connection) -> bool:
+        """Create the FTS5 index over memory content and its sync triggers.
+        
+        Args:
+            conn: The connection holding the schema transaction.
+            
+        Returns:
+            Whether full-text search is available.
+        """
+        exists = conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'project_memories_fts'"
+        ).fetchone()
+        if exists:
+            return True
+        
+        try:
+            conn.execute("""
+            CREATE VIRTUAL TABLE project_memories_fts USING fts5(
+                content,
+                content='project_memories',
+                content_rowid='id',
+                tokenize='porter unicode61'
+            )
+            """)
+        except sqlite3.OperationalError:
+            # SQLite was built without FTS5; search falls back to LIKE
+            return False
+        
+        conn.execute("""
+        CREATE TRIGGER IF NOT EXISTS project_memories_fts_insert
+        AFTER INSERT ON project_memories BEGIN
+            INSERT INTO project_memories_fts (rowid, content) VALUES (new.id, new.content);
+        END
+        """)
+        conn.execute("""
+        CREATE TRIGGER IF NOT EXISTS project_memories_fts_delete
+        AFTER DELETE ON project_memories BEGIN
+            INSERT INTO project_memories_fts (project_memories_fts, rowid, content)
+            VALUES ('delete', old.id, old.content);
+        END
+        """)
+        conn.execute("""
+        CREATE TRIGGER IF NOT EXISTS project_memories_fts_update
+        AFTER UPDATE OF content ON project_memories BEGIN
+            INSERT INTO project_memories_fts (project_memories_fts, rowid, content)
+            VALUES ('delete', old.id, old.content);
+            INSERT INTO project_memories_fts (rowid, content) VALUES (new.id, new.content);
+        END
         """)
         
-        conn.commit()
-        conn.close()
+        # Index rows written before the FTS table existed
+        conn.execute("INSERT INTO project_memories_fts (project_memories_fts) VALUES ('rebuild')")
+        return True
     
     def save(self, item: Any, metadata: Optional[Dict[str, Any]] = None) -> None:
         """Save a memory item to the storage.
@@ -80,87 +157,220 @@ class ProjectMemoryStorage(Storage):
             item: The memory item to save.
             metadata: Additional metadata (not used, as metadata is included in the item).
         """
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        self.save_many([item])
+    
+    def save_many(self, items: Iterable[Any]) -> int:
+        """Save many memory items in a single transaction.
         
-        # Convert tags to JSON string
-        tags_json = json.dumps(item.tags)
+        Items are consumed lazily, so a generator can stream a very large
+        import without holding it in memory.
         
-        # Convert metadata to JSON string
-        metadata_json = json.dumps(item.metadata)
+        Args:
+            items: The memory items to save.
+            
+        Returns:
+            The number of items saved.
+        """
+        count = 0
         
-        # Insert the memory item
-        cursor.execute(
-            """
-            INSERT INTO project_memories
-            (project_name, project_code, memory_type, content, timestamp, author, tags, metadata)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-            """,
-            (
-                item.project_name,
-                item.project_code,
-                item.memory_type,
-                item.content,
-                item.timestamp,
-                item.author,
-                tags_json,
-                metadata_json,
-            ),
-        )
-        
-        conn.commit()
-        conn.close()
+        def rows() -> Iterable[Tuple[Any, ...]]:
+            nonlocal count
+            for item in items:
+                count += 1
+                yield (
+                    item.project_name,
+                    item.project_code,
+                    item.memory_type,
+                    item.content,
+                    item.timestamp,
+                    item.author,
+                    # Convert tags and metadata to JSON strings
+                    json.dumps(item.tags),
+                    json.dumps(item.metadata),
+                )
+        
+        # Insert the memory items
+        with self._pool.transaction() as conn:
+            conn.executemany(
+                """
+                INSERT INTO project_memories
+                (project_name, project_code, memory_type, content, timestamp, author, tags, metadata)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                rows(),
+            )
+        
+        return count
     
     def search(
         self,
         query: str,
         memory_type: Optional[str] = None,
         limit: int = 5,
-        score_threshold: float = 0.35,
+        score_threshold: Optional[float] = None,
+        mode: Optional[str] = None,
+        alpha: float = 0.7,
     ) -> List[Any]:
         """Search for memory items in the storage.
         
+        In ``lexical`` mode results are ranked with BM25 over an FTS5 index of
+        the memory content. A memory matches if it contains any of the query
+        words, and memories matching more of them, or matching rarer ones,
+        rank higher. The BM25 score ``s`` is mapped to ``s / (1 + s)`` in
+        [0, 1), which does not depend on the other results, so a weak best
+        match still falls below a threshold. Without FTS5 the query is matched
+        as a substring and every match scores 1.0. An empty query returns the
+        most recent memories.
+        
+        ``semantic`` mode ranks by cosine similarity from the vector index and
+        ``hybrid`` mode blends it with the lexical score, weighted by ``alpha``.
+        Memories added since the last search are embedded first.
+        
+        Scores are on a different scale in each mode: normalised BM25 in
+        ``lexical`` mode, cosine similarity in ``semantic`` mode and their
+        blend in ``hybrid`` mode, so a ``score_threshold`` tuned for one mode
+        does not carry over to another. No threshold is applied unless one is
+        given.
+        
         Args:
             query: The search query.
             memory_type: The type of memory to search for.
             limit: The maximum number of results to return.
-            score_threshold: The minimum similarity score for results (not used in this implementation).
+            score_threshold: The minimum score for results, on the scale of
+                the search mode. Defaults to no minimum.
+            mode: One of "lexical", "semantic" or "hybrid". Defaults to "hybrid"
+                when a vector index is configured and "lexical" otherwise.
+            alpha: Weight of the vector score in hybrid mode.
             
         Returns:
-            A list of matching memory items.
-        """
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
-        
-        # Build the SQL query
-        sql = """
-        SELECT * FROM project_memories
-        WHERE project_name = ?
+            A list of matching memory items, best match first.
+            
+        Raises:
+            ValueError: If the mode is unknown or needs a missing vector index.
         """
-        params = [self.project_name]
+        if mode is None:
+            mode = "hybrid" if self.vector_index is not None else "lexical"
+        if mode not in SEARCH_MODES:
+            raise ValueError(f"Unknown search mode {mode!r}, expected one of {SEARCH_MODES}")
+        
+        if mode == "lexical":
+            rows = [
+                row
+                for row, score in self._lexical_search(query, memory_type, limit)
+                if score_threshold is None or score >= score_threshold
+            ]
+            return self._rows_to_items(rows)
+        
+        if self.vector_index is None:
+            raise ValueError(f"Search mode {mode!r} requires a vector index")
         
+        scope_sql, scope_params = self._scope_condition()
+        self.vector_index.sync(self._pool, scope_sql, scope_params)
+        
+        lexical_scores = None
+        if mode == "hybrid":
+            # Widen the lexical candidate set so the blend has room to reorder
+            candidates = self._lexical_search(query, memory_type, max(limit * 4, 20))
+            lexical_scores = {row["id"]: score for row, score in candidates}
+        
+        matches = [
+            (memory_id, score)
+            for memory_id, score in self.vector_index.search(
+                query,
+                memory_type=memory_type,
+                limit=limit,
+                lexical_scores=lexical_scores,
+                alpha=alpha if mode == "hybrid" else 1.0,
+            )
+            if score_threshold is None or score >= score_threshold
+        ]
+        if not matches:
+            return []
+        
+        ids = [memory_id for memory_id, _ in matches]
+        with self._pool.connection() as conn:
+            cursor = conn.cursor()
+            cursor.row_factory = sqlite3.Row
+            cursor.execute(
+                f"SELECT * FROM project_memories WHERE id IN ({', '.join('?' * len(ids))})",
+                ids,
+            )
+            rows_by_id = {row["id"]: row for row in cursor.fetchall()}
+        
+        return self._rows_to_items([rows_by_id[i] for i in ids if i in rows_by_id])
+    
+    def _scope_condition(self) -> Tuple[str, List[Any]]:
+        """SQL condition on ``m`` restricting memories to this project."""
+        sql = "m.project_name = ?"
+        params: List[Any] = [self.project_name]
         if self.project_code:
-            sql += " AND project_code = ?"
+            sql += " AND m.project_code = ?"
             params.append(self.project_code)
+        return sql, params
+    
+    def _lexical_search(
+        self, query: str, memory_type: Optional[str], limit: int
+    ) -> List[Tuple[sqlite3.Row, float]]:
+        """Run a full-text search for any of the query words and score the rows.
+        
+        Args:
+            query: The search query.
+            memory_type: The type of memory to search for.
+            limit: The maximum number of rows to return.
+            
+        Returns:
+            ``(row, score)`` pairs, best match first.
+        """
+        terms = re.findall(r"\w+", query.lower())
+        use_fts = bool(terms) and self._fts_enabled
+        scope_sql, scope_params = self._scope_condition()
+        
+        params: List[Any] = []
+        if use_fts:
+            sql = f"""
+            SELECT m.*, bm25(project_memories_fts) AS rank
+            FROM project_memories_fts
+            JOIN project_memories AS m ON m.id = project_memories_fts.rowid
+            WHERE project_memories_fts MATCH ? AND {scope_sql}
+            """
+            # Quote each term so user input cannot inject FTS query syntax
+            params.append(" OR ".join(f'"{term}"' for term in terms))
+        else:
+            sql = f"SELECT m.* FROM project_memories AS m WHERE {scope_sql}"
+        params.extend(scope_params)
         
         if memory_type:
-            sql += " AND memory_type = ?"
+            sql += " AND m.memory_type = ?"
             params.append(memory_type)
         
-        # Add a simple text search condition
-        sql += " AND content LIKE ?"
-        params.append(f"%{query}%")
-        
-        # Order by timestamp (most recent first) and limit results
-        sql += " ORDER BY timestamp DESC LIMIT ?"
+        if use_fts:
+            sql += " ORDER BY rank LIMIT ?"
+        else:
+            if terms:
+                # Simple text search when FTS5 is not available
+                sql += " AND m.content LIKE ?"
+                params.append(f"%{query}%")
+            # Order by timestamp (most recent first)
+            sql += " ORDER BY m.timestamp DESC LIMIT ?"
         params.append(limit)
         
         # Execute the query
-        cursor.execute(sql, params)
-        rows = cursor.fetchall()
+        with self._pool.connection() as conn:
+            cursor = conn.cursor()
+            cursor.row_factory = sqlite3.Row
+            cursor.execute(sql, params)
+            rows = cursor.fetchall()
+        
+        if not (use_fts and rows):
+            return [(row, 1.0) for row in rows]
         
-        # Convert rows to memory items
+        # bm25() is negated, lower is better; map it to [0, 1) on its own so that
+        # scores are comparable across queries rather than relative to the best
+        scores = [max(-row["rank"], 0.0) for row in rows]
+        return [(row, score / (1.0 + score)) for row, score in zip(rows, scores)]
+    
+    def _rows_to_items(self, rows: Iterable[sqlite3.Row]) -> List[Any]:
+        """Convert rows to memory items."""
         from pmoai.memory.project_memory import ProjectMemoryItem
         
         items = []
@@ -178,5 +388,4 @@ class ProjectMemoryStorage(Storage):
                 )
             )
         
-        conn.close()
         return items
@@ -0,0 +1,290 @@
+import sqlite3
+import threading
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from pmoai.knowledge.embedder.base_embedder import BaseEmbedder
+from pmoai.utilities.sqlite_pool import SQLiteConnectionPool
+
+
+class ProjectMemoryVectorIndex:
+    """Embedding index over the memories of a ``ProjectMemoryStorage``.
+
+    Vectors are persisted as float32 blobs in a ``project_memory_vectors``
+    table next to the memories and held in memory as one L2-normalised
+    float32 matrix, so a query is a single matrix-vector product. Only
+    memories without a vector for the current model are embedded, which
+    makes indexing incremental: after the first sync, only memories with an
+    id above the last one seen are checked.
+
+    Updating a memory's content or type deletes its stored vector and
+    records the memory in a ``project_memory_changes`` log, keyed by memory
+    so it stays no larger than the memories. Each sync re-embeds the
+    memories logged since the last change it saw, replacing their rows in
+    the matrix.
+    """
+
+    def __init__(
+        self,
+        embedder: Optional[BaseEmbedder] = None,
+        model_name: Optional[str] = None,
+        batch_size: int = 256,
+    ):
+        """Initialize the vector index.
+
+        Args:
+            embedder: The embedder to use. Defaults to ``FastEmbed``.
+            model_name: Name stored with each vector; vectors from another
+                model are re-embedded. Defaults to the embedder's model name.
+            batch_size: Number of memories embedded per embedder call.
+        """
+        if embedder is None:
+            from pmoai.knowledge.embedder.fastembed import FastEmbed
+
+            embedder = FastEmbed()
+        self.embedder = embedder
+        self.model_name = model_name or getattr(
+            embedder, "model_name", type(embedder).__name__
+        )
+        self.batch_size = batch_size
+
+        self._lock = threading.Lock()
+        self._loaded = False
+        self._ids = np.empty(0, dtype=np.int64)
+        self._types = np.empty(0, dtype=object)
+        self._matrix = np.empty((0, 0), dtype=np.float32)
+        self._size = 0
+        self._positions: Dict[int, int] = {}
+        self._last_id = 0
+        self._last_change = 0
+
+    @staticmethod
+    def init_schema(conn: sqlite3.Connection) -> None:
+        """Create the vector table.
+
+        Args:
+            conn: The connection holding the schema transaction.
+        """
+        conn.execute("""
+        CREATE TABLE IF NOT EXISTS project_memory_vectors (
+            memory_id INTEGER PRIMARY KEY
+                REFERENCES project_memories (id) ON DELETE CASCADE,
+            model TEXT NOT NULL,
+            vector BLOB NOT NULL
+        )
+        """)
+        conn.execute("""
+        CREATE TABLE IF NOT EXISTS project_memory_changes (
+            memory_id INTEGER PRIMARY KEY
+                REFERENCES project_memories (id) ON DELETE CASCADE,
+            seq INTEGER NOT NULL
+        )
+        """)
+        conn.execute("""
+        CREATE INDEX IF NOT EXISTS idx_project_memory_changes_seq
+        ON project_memory_changes (seq)
+        """)
+        # Only the latest change of a memory is kept, numbered after all others
+        conn.execute("""
+        CREATE TRIGGER IF NOT EXISTS project_memory_vectors_invalidate
+        AFTER UPDATE OF content, memory_type ON project_memories BEGIN
+            DELETE FROM project_memory_vectors WHERE memory_id = new.id;
+            INSERT OR REPLACE INTO project_memory_changes (memory_id, seq)
+            VALUES (new.id, (SELECT COALESCE(MAX(seq), 0) + 1 FROM project_memory_changes));
+        END
+        """)
+
+    def _append(self, ids: List[int], types: List[str], vectors: np.ndarray) -> None:
+        """Add rows to the in-memory matrix, growing it geometrically.
+
+        Memories that already have a row are overwritten in place.
+        """
+        if not ids:
+            return
+        new = []
+        for memory_id, memory_type, vector in zip(ids, types, vectors):
+            position = self._positions.get(memory_id)
+            if position is None:
+                new.append((memory_id, memory_type, vector))
+            else:
+                self._matrix[position] = vector
+                self._types[position] = memory_type
+        if len(new) < len(ids):
+            if not new:
+                return
+            ids = [row[0] for row in new]
+            types = [row[1] for row in new]
+            vectors = np.vstack([row[2] for row in new])
+        needed = self._size + len(ids)
+        if self._matrix.shape[1] != vectors.shape[1]:
+            self._matrix = np.empty((0, vectors.shape[1]), dtype=np.float32)
+        if needed > len(self._matrix):
+            capacity = max(needed, 2 * len(self._matrix), 64)
+            matrix = np.empty((capacity, vectors.shape[1]), dtype=np.float32)
+            matrix[: self._size] = self._matrix[: self._size]
+            id_array = np.empty(capacity, dtype=np.int64)
+            id_array[: self._size] = self._ids[: self._size]
+            type_array = np.empty(capacity, dtype=object)
+            type_array[: self._size] = self._types[: self._size]
+            self._matrix, self._ids, self._types = matrix, id_array, type_array
+        self._matrix[self._size : needed] = vectors
+        self._ids[self._size : needed] = ids
+        self._types[self._size : needed] = types
+        self._positions.update(zip(ids, range(self._size, needed)))
+        self._size = needed
+
+    @staticmethod
+    def _normalise(vectors: np.ndarray) -> np.ndarray:
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return (vectors / norms).astype(np.float32, copy=False)
+
+    def _embed(self, texts: List[str]) -> np.ndarray:
+        return self._normalise(
+            np.asarray(self.embedder.embed_texts(texts), dtype=np.float32)
+        )
+
+    def sync(self, pool: SQLiteConnectionPool, scope_sql: str, scope_params: List) -> int:
+        """Load stored vectors and embed memories that do not have one yet.
+
+        Args:
+            pool: The connection pool of the memory database.
+            scope_sql: SQL condition on ``m`` restricting memories to the project.
+            scope_params: Parameters for ``scope_sql``.
+
+        Returns:
+            The number of memories that were embedded.
+        """
+        with self._lock, pool.connection() as conn:
+            newest_id = self._last_id
+            if not self._loaded:
+                # Vectors read below already reflect every change logged so far
+                self._last_change = conn.execute(
+                    "SELECT COALESCE(MAX(seq), 0) FROM project_memory_changes"
+                ).fetchone()[0]
+                rows = conn.execute(
+                    f"""
+                    SELECT v.memory_id, m.memory_type, v.vector
+                    FROM project_memory_vectors AS v
+                    JOIN project_memories AS m ON m.id = v.memory_id
+                    WHERE v.model = ? AND {scope_sql}
+                    ORDER BY v.memory_id
+                    """,
+                    [self.model_name, *scope_params],
+                ).fetchall()
+                if rows:
+                    self._append(
+                        [row[0] for row in rows],
+                        [row[1] for row in rows],
+                        np.vstack([np.frombuffer(row[2], dtype=np.float32) for row in rows]),
+                    )
+                    newest_id = max(newest_id, rows[-1][0])
+                self._loaded = True
+
+            missing = conn.execute(
+                f"""
+                SELECT m.id, m.memory_type, m.content
+                FROM project_memories AS m
+                LEFT JOIN project_memory_vectors AS v
+                    ON v.memory_id = m.id AND v.model = ?
+                WHERE v.memory_id IS NULL AND m.id > ? AND {scope_sql}
+                ORDER BY m.id
+                """,
+                [self.model_name, self._last_id, *scope_params],
+            ).fetchall()
+
+            changed = conn.execute(
+                f"""
+                SELECT c.seq, m.id, m.memory_type, m.content
+                FROM project_memory_changes AS c
+                JOIN project_memories AS m ON m.id = c.memory_id
+                WHERE c.seq > ? AND {scope_sql}
+                ORDER BY c.seq
+                """,
+                [self._last_change, *scope_params],
+            ).fetchall()
+            if changed:
+                self._last_change = changed[-1][0]
+                seen = {row[0] for row in missing}
+                missing += [row[1:] for row in changed if row[1] not in seen]
+
+            for start in range(0, len(missing), self.batch_size):
+                batch = missing[start : start + self.batch_size]
+                vectors = self._embed([row[2] for row in batch])
+                with pool.transaction() as tx:
+                    tx.executemany(
+                        """
+                        INSERT OR REPLACE INTO project_memory_vectors (memory_id, model, vector)
+                        VALUES (?, ?, ?)
+                        """,
+                        [
+                            (row[0], self.model_name, vector.tobytes())
+                            for row, vector in zip(batch, vectors)
+                        ],
+                    )
+                self._append([row[0] for row in batch], [row[1] for row in batch], vectors)
+
+            if missing:
+                newest_id = max(newest_id, max(row[0] for row in missing))
+            self._last_id = newest_id
+            return len(missing)
+
+    def search(
+        self,
+        query: str,
+        memory_type: Optional[str] = None,
+        limit: int = 5,
+        lexical_scores: Optional[Dict[int, float]] = None,
+        alpha: float = 1.0,
+    ) -> List[Tuple[int, float]]:
+        """Score memories against a query and return the top matches.
+
+        Args:
+            query: The search query.
+            memory_type: Only score memories of this type.
+            limit: The maximum number of results to return.
+            lexical_scores: Lexical scores in [0, 1] keyed by memory id, for
+                hybrid ranking.
+            alpha: Weight of the vector score; ``1 - alpha`` weights the
+                lexical score.
+
+        Returns:
+            ``(memory_id, score)`` pairs, best match first.
+        """
+        with self._lock:
+            if self._size == 0 or limit <= 0:
+                return []
+            ids = self._ids[: self._size]
+            matrix = self._matrix[: self._size]
+            if memory_type is not None:
+                mask = self._types[: self._size] == memory_type
+                ids, matrix = ids[mask], matrix[mask]
+            if len(ids) == 0:
+                return []
+
+            scores = alpha * (matrix @ self._embed([query])[0])
+            if lexical_scores and alpha < 1.0:
+                lexical = np.fromiter(
+                    (lexical_scores.get(int(i), 0.0) for i in ids),
+                    dtype=np.float32,
+                    count=len(ids),
+                )
+                scores += (1.0 - alpha) * lexical
+
+            k = min(limit, len(ids))
+            top = np.argpartition(-scores, k - 1)[:k]
+            top = top[np.argsort(-scores[top], kind="stable")]
+            return [(int(ids[i]), float(scores[i])) for i in top]
+
+    def reset(self) -> None:
+        """Drop the in-memory matrix so it is reloaded on the next sync."""
+        with self._lock:
+            self._loaded = False
+            self._ids = np.empty(0, dtype=np.int64)
+            self._types = np.empty(0, dtype=object)
+            self._matrix = np.empty((0, 0), dtype=np.float32)
+            self._size = 0
+            self._positions = {}
+            self._last_id = 0
+            self._last_change = 0
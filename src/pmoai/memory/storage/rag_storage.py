@@ -8,6 +8,7 @@ from typing import Any, Dict, List, Optional
 
 from chromadb.api import ClientAPI
 
+from pmoai.knowledge.embedder.embedding_cache import CachedEmbeddingFunction
 from pmoai.memory.storage.base_rag_storage import BaseRAGStorage
 from pmoai.utilities import EmbeddingConfigurator
 from pmoai.utilities.constants import MAX_FILE_NAME_LENGTH
@@ -56,8 +57,16 @@ class RAGStorage(BaseRAGStorage):
         self._initialize_app()
 
     def _set_embedder_config(self):
+        if isinstance(self.embedder_config, CachedEmbeddingFunction):
+            return
         configurator = EmbeddingConfigurator()
-        self.embedder_config = configurator.configure_embedder(self.embedder_config)
+        embedding_function = configurator.configure_embedder(self.embedder_config)
+        # Reuse embeddings of memory text seen in earlier runs
+        try:
+            self.embedder_config = CachedEmbeddingFunction(embedding_function)
+        except ValueError:
+            # Embedders that cannot be told apart are not cached rather than mixed up
+            self.embedder_config = embedding_function
 
     def _initialize_app(self):
         import chromadb
@@ -1,11 +1,22 @@
 from pmoai.planning.project_planner import ProjectPlanner
+from pmoai.planning.resource_leveling import ResourceLeveler, ResourceLevelingResult
 from pmoai.planning.resource_planner import ResourcePlanner
 from pmoai.planning.risk_planner import RiskPlanner
+from pmoai.planning.schedule_engine import ScheduleEngine
 from pmoai.planning.schedule_planner import SchedulePlanner
+from pmoai.planning.schedule_simulation import MonteCarloScheduleSimulator, ScheduleSimulationResult
+from pmoai.utilities.resource_utilization import ResourceUtilizationResult, UtilizationEngine
 
 __all__ = [
+    "MonteCarloScheduleSimulator",
     "ProjectPlanner",
+    "ResourceLeveler",
+    "ResourceLevelingResult",
     "ResourcePlanner",
+    "ResourceUtilizationResult",
     "RiskPlanner",
+    "ScheduleEngine",
     "SchedulePlanner",
+    "ScheduleSimulationResult",
+    "UtilizationEngine",
 ]
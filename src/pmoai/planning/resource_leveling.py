@@ -0,0 +1,331 @@
+"""
+Deterministic resource levelling and allocation.
+"""
+
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+from pydantic import BaseModel, Field
+
+from pmoai.planning.resource_planner import Resource, ResourceAllocation, ResourceRequirement
+
+# Tolerance when comparing summed allocation percentages with availability
+_EPSILON = 1e-6
+
+
+class Overallocation(BaseModel):
+    """Represents a period in which a resource is allocated beyond its availability."""
+
+    resource_id: str = Field(description="The resource identifier.")
+    start_date: str = Field(description="The first day of the period.")
+    end_date: str = Field(description="The last day of the period.")
+    allocated_percentage: float = Field(description="The highest total allocation in the period (0-100+).")
+    availability: float = Field(description="The availability percentage of the resource (0-100).")
+    task_ids: List[str] = Field(description="The tasks allocated to the resource in the period.")
+
+
+class ResourceLevelingResult(BaseModel):
+    """Represents the outcome of resource levelling."""
+
+    allocations: List[ResourceAllocation] = Field(description="The allocations, including fixed ones.")
+    unassigned: List[ResourceRequirement] = Field(default_factory=list, description="The requirements no resource could take.")
+    delays: Dict[str, int] = Field(default_factory=dict, description="The days each delayed task was pushed back.")
+    overallocations: List[Overallocation] = Field(default_factory=list, description="The remaining overallocations.")
+    explanation: Optional[str] = Field(None, description="A narrative explanation of the result.")
+
+
+class IntervalTree:
+    """Static centred interval tree over inclusive integer intervals.
+
+    Each node holds the intervals containing its centre, sorted by start and
+    by end, so a query only scans intervals that actually overlap and prunes
+    every subtree on the wrong side of the range.
+    """
+
+    def __init__(self, intervals: Iterable[Tuple[int, int, Any]]):
+        """Build the tree.
+
+        Args:
+            intervals: The start, end and payload of every interval.
+        """
+        self._root = self._build(list(intervals))
+
+    @classmethod
+    def _build(cls, intervals: List[Tuple[int, int, Any]]) -> Optional[tuple]:
+        if not intervals:
+            return None
+        points = sorted(point for start, end, _ in intervals for point in (start, end))
+        center = points[len(points) // 2]
+        left = [i for i in intervals if i[1] < center]
+        right = [i for i in intervals if i[0] > center]
+        here = [i for i in intervals if i[0] <= center <= i[1]]
+        return (
+            center,
+            sorted(here, key=lambda i: i[0]),
+            sorted(here, key=lambda i: -i[1]),
+            cls._build(left),
+            cls._build(right),
+        )
+
+    def overlapping(self, start: int, end: int) -> List[Any]:
+        """Get the payloads of the intervals overlapping a range.
+
+        Args:
+            start: The first point of the range.
+            end: The last point of the range.
+
+        Returns:
+            The payloads, in no particular order.
+        """
+        found = []
+        stack = [self._root]
+        while stack:
+            node = stack.pop()
+            if node is None:
+                continue
+            center, by_start, by_end, left, right = node
+            if end < center:
+                for interval in by_start:
+                    if interval[0] > end:
+                        break
+                    found.append(interval[2])
+                stack.append(left)
+            elif start > center:
+                for interval in by_end:
+                    if interval[1] < start:
+                        break
+                    found.append(interval[2])
+                stack.append(right)
+            else:
+                found.extend(interval[2] for interval in by_start)
+                stack.extend((left, right))
+        return found
+
+
+def _days(dates: Sequence[str]) -> np.ndarray:
+    """Parse ``YYYY-MM-DD`` dates into day numbers."""
+    return np.array(dates, dtype="datetime64[D]").astype(np.int64)
+
+
+def _date(day: int) -> str:
+    """Format a day number as a ``YYYY-MM-DD`` date."""
+    return str(np.datetime64(int(day), "D"))
+
+
+def find_overallocations(
+    resources: Sequence[Resource], allocations: Sequence[ResourceAllocation]
+) -> List[Overallocation]:
+    """Find the periods in which resources are allocated beyond their availability.
+
+    The total allocation of each resource is swept over the start and end of
+    its allocations. For every period above availability, an interval tree of
+    the resource's allocations gives the tasks involved.
+
+    Args:
+        resources: The resources.
+        allocations: The allocations to check.
+
+    Returns:
+        The overallocated periods, by resource and date.
+    """
+    availability = {resource.id: resource.availability for resource in resources}
+    by_resource: Dict[str, List[ResourceAllocation]] = {}
+    for allocation in allocations:
+        by_resource.setdefault(allocation.resource_id, []).append(allocation)
+
+    found = []
+    for resource_id, items in by_resource.items():
+        limit = availability.get(resource_id, 100.0)
+        starts = _days([a.start_date for a in items])
+        ends = _days([a.end_date for a in items])
+        percentages = np.array([a.allocation_percentage for a in items], dtype=np.float64)
+
+        # Load changes at each start and on the day after each end
+        points = np.concatenate((starts, ends + 1))
+        changes = np.concatenate((percentages, -percentages))
+        order = np.argsort(points, kind="stable")
+        points, changes = points[order], changes[order]
+        boundaries = np.flatnonzero(np.diff(points)) + 1
+        days = points[np.concatenate(([0], boundaries))]
+        load = np.cumsum(np.add.reduceat(changes, np.concatenate(([0], boundaries))))
+        over = load > limit + _EPSILON
+        if not over.any():
+            continue
+
+        tree = IntervalTree(zip(starts.tolist(), ends.tolist(), items))
+        # Merge consecutive overallocated segments into periods
+        flags = np.concatenate(([False], over, [False]))
+        period_starts = np.flatnonzero(~flags[:-1] & flags[1:])
+        period_ends = np.flatnonzero(flags[:-1] & ~flags[1:])
+        for first, last in zip(period_starts, period_ends):
+            start_day, end_day = int(days[first]), int(days[last]) - 1
+            involved = tree.overlapping(start_day, end_day)
+            found.append(
+                Overallocation(
+                    resource_id=resource_id,
+                    start_date=_date(start_day),
+                    end_date=_date(end_day),
+                    allocated_percentage=float(load[first:last].max()),
+                    availability=limit,
+                    task_ids=sorted({a.task_id for a in involved}),
+                )
+            )
+    return found
+
+
+class ResourceLeveler:
+    """Priority-based resource allocation with levelling.
+
+    Requirements are allocated in priority order, then by start date and
+    size. Each one goes to the preferred resource if it has capacity, and
+    otherwise to the eligible resource with the lowest peak load over the
+    period, then the lowest cost rate. A resource is eligible if it has every
+    required skill, is of the required type and is available for the whole
+    period. If none has capacity, the work is pushed back a day at a time up
+    to a maximum delay.
+
+    The load of every resource is kept as a dense resource by day array, so
+    checking all eligible resources for a period is one array operation.
+    """
+
+    def __init__(self, resources: Sequence[Resource]):
+        """Initialize the leveler.
+
+        Args:
+            resources: The resources to allocate.
+        """
+        self.resources = list(resources)
+        self.index = {resource.id: i for i, resource in enumerate(self.resources)}
+        self.availability = np.array([r.availability for r in self.resources], dtype=np.float64)
+        self.cost_rate = np.array(
+            [r.cost_rate if r.cost_rate is not None else 0.0 for r in self.resources],
+            dtype=np.float64,
+        )
+        no_limit = np.iinfo(np.int64)
+        self.available_from = np.array(
+            [_days([r.start_date])[0] if r.start_date else no_limit.min for r in self.resources],
+            dtype=np.int64,
+        )
+        self.available_to = np.array(
+            [_days([r.end_date])[0] if r.end_date else no_limit.max for r in self.resources],
+            dtype=np.int64,
+        )
+
+        by_skill: Dict[str, List[int]] = {}
+        for i, resource in enumerate(self.resources):
+            for skill in resource.skills or ():
+                by_skill.setdefault(skill.lower(), []).append(i)
+        self._by_skill = {s: np.array(ids, dtype=np.int64) for s, ids in by_skill.items()}
+        self._types = np.array([r.type.lower() for r in self.resources])
+        self._eligible: Dict[Tuple[Optional[str], Tuple[str, ...]], np.ndarray] = {}
+
+    def _candidates(self, requirement: ResourceRequirement) -> np.ndarray:
+        """Get the resources with the type and skills a requirement needs."""
+        skills = tuple(sorted({s.lower() for s in requirement.required_skills}))
+        resource_type = requirement.resource_type.lower() if requirement.resource_type else None
+        key = (resource_type, skills)
+        if key not in self._eligible:
+            candidates = np.arange(len(self.resources))
+            if resource_type:
+                candidates = candidates[self._types[candidates] == resource_type]
+            for skill in skills:
+                candidates = np.intersect1d(
+                    candidates, self._by_skill.get(skill, np.empty(0, dtype=np.int64))
+                )
+            self._eligible[key] = candidates
+        return self._eligible[key]
+
+    def solve(
+        self,
+        requirements: Sequence[ResourceRequirement],
+        fixed_allocations: Sequence[ResourceAllocation] = (),
+        max_delay_days: int = 0,
+    ) -> ResourceLevelingResult:
+        """Allocate resources to requirements.
+
+        Args:
+            requirements: The resource requirements of the tasks.
+            fixed_allocations: Allocations to keep as they are. Their load is
+                taken into account.
+            max_delay_days: How many days a requirement may be pushed back
+                when no resource has capacity for it.
+
+        Returns:
+            The allocations, the requirements left unassigned, the delays and
+            any remaining overallocation.
+        """
+        fixed_allocations = list(fixed_allocations)
+        starts = _days([r.start_date for r in requirements])
+        ends = _days([r.end_date for r in requirements])
+        fixed_starts = _days([a.start_date for a in fixed_allocations])
+        fixed_ends = _days([a.end_date for a in fixed_allocations])
+        all_days = np.concatenate((starts, ends + max_delay_days, fixed_starts, fixed_ends))
+        origin = int(all_days.min()) if len(all_days) else 0
+        horizon = int(all_days.max()) - origin + 1 if len(all_days) else 0
+
+        load = np.zeros((len(self.resources), horizon), dtype=np.float64)
+        for allocation, start, end in zip(fixed_allocations, fixed_starts, fixed_ends):
+            i = self.index.get(allocation.resource_id)
+            if i is not None:
+                load[i, start - origin:end - origin + 1] += allocation.allocation_percentage
+
+        allocations = list(fixed_allocations)
+        unassigned = []
+        delays: Dict[str, int] = {}
+        order = sorted(
+            range(len(requirements)),
+            key=lambda k: (
+                -requirements[k].priority,
+                starts[k],
+                -requirements[k].allocation_percentage,
+                requirements[k].task_id,
+            ),
+        )
+        for k in order:
+            requirement = requirements[k]
+            candidates = self._candidates(requirement)
+            preferred = self.index.get(requirement.preferred_resource_id)
+            chosen = None
+            for delay in range(max_delay_days + 1):
+                start, end = int(starts[k]) + delay, int(ends[k]) + delay
+                covered = candidates[
+                    (self.available_from[candidates] <= start)
+                    & (self.available_to[candidates] >= end)
+                ]
+                if not len(covered):
+                    continue
+                peak = load[covered, start - origin:end - origin + 1].max(axis=1)
+                fits = peak + requirement.allocation_percentage <= (
+                    self.availability[covered] + _EPSILON
+                )
+                if preferred is not None and preferred in covered[fits]:
+                    chosen = preferred
+                elif fits.any():
+                    fitting = np.flatnonzero(fits)
+                    best = np.lexsort((self.cost_rate[covered[fitting]], peak[fitting]))[0]
+                    chosen = int(covered[fitting[best]])
+                if chosen is not None:
+                    break
+
+            if chosen is None:
+                unassigned.append(requirement)
+                continue
+            load[chosen, start - origin:end - origin + 1] += requirement.allocation_percentage
+            if delay:
+                delays[requirement.task_id] = max(delays.get(requirement.task_id, 0), delay)
+            allocations.append(
+                ResourceAllocation(
+                    resource_id=self.resources[chosen].id,
+                    task_id=requirement.task_id,
+                    allocation_percentage=requirement.allocation_percentage,
+                    start_date=_date(start),
+                    end_date=_date(end),
+                )
+            )
+
+        return ResourceLevelingResult(
+            allocations=allocations,
+            unassigned=unassigned,
+            delays=delays,
+            overallocations=find_overallocations(self.resources, allocations),
+        )
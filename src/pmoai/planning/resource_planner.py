@@ -1,11 +1,15 @@
+import json
 from datetime import datetime, timedelta
-from typing import Any, Dict, List, Optional
+from typing import TYPE_CHECKING, Any, Dict, List, Optional
 
 from pydantic import BaseModel, Field
 
 from pmoai.agent import Agent
 from pmoai.task import Task
 
+if TYPE_CHECKING:
+    from pmoai.planning.resource_leveling import ResourceLevelingResult
+
 
 class Resource(BaseModel):
     """Represents a project resource."""
@@ -30,6 +34,19 @@ class ResourceAllocation(BaseModel):
     end_date: str = Field(description="The end date of the allocation.")
 
 
+class ResourceRequirement(BaseModel):
+    """Represents the resource a task needs for a period."""
+    
+    task_id: str = Field(description="The task identifier.")
+    start_date: str = Field(description="The earliest start date of the work.")
+    end_date: str = Field(description="The end date of the work if it starts on the start date.")
+    allocation_percentage: float = Field(default=100.0, description="The allocation percentage needed (0-100).")
+    required_skills: List[str] = Field(default_factory=list, description="The skills the resource must have.")
+    resource_type: Optional[str] = Field(None, description="The type of resource needed.")
+    priority: int = Field(default=0, description="The priority of the task; higher priorities are allocated first.")
+    preferred_resource_id: Optional[str] = Field(None, description="The resource to use if it has capacity.")
+
+
 class ResourcePlan(BaseModel):
     """Represents a resource plan."""
     
@@ -104,86 +121,166 @@ class ResourcePlanner(BaseModel):
         
         return plan
     
-    def optimize_resource_allocations(
-        self, resource_plan: ResourcePlan
-    ) -> ResourcePlan:
-        """Optimize resource allocations in a resource plan.
+    def level_resources(
+        self,
+        resources: List[Resource],
+        requirements: List[ResourceRequirement],
+        fixed_allocations: Optional[List[ResourceAllocation]] = None,
+        max_delay_days: int = 0,
+        explain: bool = False,
+    ) -> "ResourceLevelingResult":
+        """Allocate resources to task requirements without overallocating them.
+        
+        The allocation is calculated by a deterministic solver. The resource
+        manager agent is only asked to explain the result.
         
         Args:
-            resource_plan: The resource plan to optimize.
+            resources: The resources available for the project.
+            requirements: The resource requirements of the tasks.
+            fixed_allocations: Allocations to keep as they are.
+            max_delay_days: How many days work may be pushed back when no
+                resource has capacity for it.
+            explain: Whether to ask the resource manager agent to explain the
+                result.
             
         Returns:
-            The optimized resource plan.
+            The allocations, unassigned requirements, delays and any
+            remaining overallocation.
         """
-        # Create a task for the resource manager to optimize resource allocations
-        optimization_task = Task(
+        from pmoai.planning.resource_leveling import ResourceLeveler
+        
+        result = ResourceLeveler(resources).solve(
+            requirements,
+            fixed_allocations=fixed_allocations or [],
+            max_delay_days=max_delay_days,
+        )
+        if not explain:
+            return result
+        
+        # Create a task for the resource manager to explain the result
+        explanation_task = Task(
             description=f"""
-            Optimize the resource allocations in the resource plan for the project '{resource_plan.project_name}'.
+            Explain the result of resource levelling to the project team.
             
-            Current Resource Plan:
-            {resource_plan.json(indent=2)}
+            Allocations Made: {len(result.allocations)}
             
-            Optimize the resource allocations to:
-            - Minimize resource conflicts
-            - Maximize resource utilization
-            - Balance workload across resources
-            - Minimize project duration
-            - Minimize project cost
+            Delayed Tasks (days):
+            {result.delays or 'None.'}
             
-            Provide the optimized resource plan in JSON format.
+            Unassigned Requirements:
+            {[r.model_dump() for r in result.unassigned] or 'None.'}
+            
+            Remaining Overallocations:
+            {[o.model_dump() for o in result.overallocations] or 'None.'}
+            
+            Explain the trade-offs made and recommend how to resolve any
+            unassigned requirements or remaining overallocations.
             """,
-            expected_output="An optimized resource plan in JSON format.",
+            expected_output="A short explanation of the resource levelling result.",
             agent=self.resource_manager_agent,
         )
         
-        # Execute the task
-        result = optimization_task.execute()
+        result.explanation = explanation_task.execute().raw
         
-        # Parse the result into a ResourcePlan
-        optimized_plan_data = result.raw
+        return result
+    
+    def optimize_resource_allocations(
+        self, resource_plan: ResourcePlan, max_delay_days: int = 0
+    ) -> ResourcePlan:
+        """Optimize resource allocations in a resource plan.
+        
+        Every allocation stays with its resource where it has capacity.
+        Otherwise it moves to the least loaded resource of the same type, or
+        is pushed back by up to max_delay_days. Allocations that cannot be
+        placed are kept unchanged.
+        
+        Args:
+            resource_plan: The resource plan to optimize.
+            max_delay_days: How many days an allocation may be pushed back.
+            
+        Returns:
+            The optimized resource plan.
+        """
+        from pmoai.planning.resource_leveling import ResourceLeveler
+        
+        types = {resource.id: resource.type for resource in resource_plan.resources}
+        requirements = [
+            ResourceRequirement(
+                task_id=allocation.task_id,
+                start_date=allocation.start_date,
+                end_date=allocation.end_date,
+                allocation_percentage=allocation.allocation_percentage,
+                resource_type=types.get(allocation.resource_id),
+                preferred_resource_id=allocation.resource_id,
+            )
+            for allocation in resource_plan.allocations
+        ]
+        result = ResourceLeveler(resource_plan.resources).solve(
+            requirements, max_delay_days=max_delay_days
+        )
         
-        # Create a new ResourcePlan object with the optimized allocations
-        optimized_plan = ResourcePlan(**optimized_plan_data)
+        # Keep what could not be placed rather than dropping it
+        unassigned = {id(requirement) for requirement in result.unassigned}
+        allocations = result.allocations + [
+            allocation
+            for allocation, requirement in zip(resource_plan.allocations, requirements)
+            if id(requirement) in unassigned
+        ]
         
-        return optimized_plan
+        return resource_plan.model_copy(update={"allocations": allocations})
     
     def analyze_resource_utilization(
-        self, resource_plan: ResourcePlan
+        self,
+        resource_plan: ResourcePlan,
+        period: str = "week",
+        include_narrative: bool = True,
     ) -> Dict[str, Any]:
         """Analyze resource utilization in a resource plan.
         
+        The utilization figures are calculated from the allocation dates by
+        day, then summed by resource, type and period. The resource manager
+        agent only writes a narrative on top of them.
+        
         Args:
             resource_plan: The resource plan to analyze.
+            period: The period to report utilization over time by ("day",
+                "week" or "month").
+            include_narrative: Whether to ask the resource manager agent for a
+                narrative analysis of the calculated figures.
             
         Returns:
             An analysis of resource utilization.
         """
-        # Create a task for the resource manager to analyze resource utilization
+        from pmoai.utilities.resource_utilization import UtilizationEngine
+        
+        analysis = (
+            UtilizationEngine(resource_plan.resources, resource_plan.allocations)
+            .analyze(period=period)
+            .model_dump()
+        )
+        if not include_narrative:
+            return analysis
+        
+        # Create a task for the resource manager to interpret the figures
         analysis_task = Task(
             description=f"""
             Analyze the resource utilization in the resource plan for the project '{resource_plan.project_name}'.
             
-            Resource Plan:
-            {resource_plan.json(indent=2)}
+            Calculated Utilization Figures (person-days and percentages):
+            {json.dumps(analysis, indent=2)}
             
-            Provide an analysis of resource utilization, including:
-            - Overall resource utilization percentage
-            - Resource utilization over time
-            - Overallocated resources
-            - Underallocated resources
-            - Resource utilization by type
+            The figures above are exact. Based on them, provide:
+            - The main utilization trends over time
+            - The impact of overallocated and underallocated resources
             - Recommendations for improvement
-            
-            Provide your analysis in JSON format.
             """,
-            expected_output="An analysis of resource utilization in JSON format.",
+            expected_output="A narrative analysis of resource utilization.",
             agent=self.resource_manager_agent,
         )
         
         # Execute the task
         result = analysis_task.execute()
         
-        # Parse the result into a dictionary
-        analysis = result.raw
+        analysis["narrative"] = result.raw
         
         return analysis
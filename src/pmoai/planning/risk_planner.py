@@ -3,6 +3,7 @@ from typing import Any, Dict, List, Optional
 from pydantic import BaseModel, Field
 
 from pmoai.agent import Agent
+from pmoai.planning.schedule_simulation import MonteCarloScheduleSimulator, ScheduleSimulationResult
 from pmoai.task import Task
 
 
@@ -19,6 +20,8 @@ class Risk(BaseModel):
     contingency_plan: str = Field(description="The plan if the risk occurs.")
     owner: str = Field(description="The person responsible for managing the risk.")
     status: str = Field(description="The current status of the risk (Open, Closed, Mitigated).")
+    affected_tasks: List[str] = Field(default_factory=list, description="The schedule tasks delayed if the risk occurs.")
+    schedule_impact_days: Optional[float] = Field(None, description="The delay to each affected task if the risk occurs, in days.")
 
 
 class RiskPlan(BaseModel):
@@ -193,3 +196,30 @@ class RiskPlanner(BaseModel):
         analysis = result.raw
         
         return analysis
+    
+    def simulate_schedule_risk(
+        self,
+        risks: List[Risk],
+        schedule: Any,
+        iterations: int = 100_000,
+        seed: Optional[int] = None,
+        processes: Optional[int] = None,
+    ) -> ScheduleSimulationResult:
+        """Simulate the effect of risks on a project schedule.
+        
+        Each risk with affected tasks and a schedule impact delays those tasks
+        in the iterations where it occurs, according to its probability. The
+        simulation does not involve the risk analyst agent.
+        
+        Args:
+            risks: The risks to simulate.
+            schedule: The project schedule the risks affect.
+            iterations: The number of iterations to simulate.
+            seed: The seed of the random generator, for reproducible results.
+            processes: The number of worker processes to simulate with.
+            
+        Returns:
+            The completion percentiles and the criticality of each task.
+        """
+        simulator = MonteCarloScheduleSimulator.from_schedule(schedule, risks=risks)
+        return simulator.run(iterations=iterations, seed=seed, processes=processes)
@@ -0,0 +1,522 @@
+"""
+Critical path method (CPM) engine for project schedules.
+"""
+
+import heapq
+from itertools import chain
+from typing import Any, Dict, List, Optional, Sequence, Set, Tuple
+
+import numpy as np
+
+COMPUTED_TASK_FIELDS = (
+    "start_date",
+    "end_date",
+    "early_start",
+    "early_finish",
+    "late_start",
+    "late_finish",
+    "total_float",
+    "free_float",
+    "is_critical",
+)
+
+
+class ScheduleEngine:
+    """Critical path engine over the dependency graph of a schedule.
+
+    Activities are addressed by their position in ``task_ids`` and every
+    per-activity value is a NumPy array indexed by that position. Dependencies
+    are stored as compressed predecessor and successor lists, and the
+    activities are sorted topologically once, so each pass over the graph
+    visits every activity and dependency exactly once.
+
+    Times are whole days counted from the project start. An activity with
+    early start ``s`` and duration ``d`` occupies days ``s`` to ``s + d - 1``
+    and finishes at ``s + d``.
+    """
+
+    def __init__(
+        self,
+        task_ids: Sequence[str],
+        durations: Sequence[int],
+        dependencies: Sequence[Sequence[str]],
+    ):
+        """Initialize the engine and compute the schedule.
+
+        Args:
+            task_ids: The identifiers of the activities.
+            durations: The duration of each activity in days.
+            dependencies: The identifiers each activity depends on.
+
+        Raises:
+            ValueError: If an identifier is duplicated, a dependency is
+                unknown, a duration is negative or the dependencies contain a
+                cycle.
+        """
+        self.task_ids: List[str] = list(task_ids)
+        self.index: Dict[str, int] = {task_id: i for i, task_id in enumerate(self.task_ids)}
+        if len(self.index) != len(self.task_ids):
+            seen = set()
+            duplicates = [t for t in self.task_ids if t in seen or seen.add(t)]
+            raise ValueError(f"Duplicate schedule task ids: {sorted(set(duplicates))[:10]}")
+
+        self.durations = np.asarray(durations, dtype=np.int64).reshape(-1)
+        if len(self.durations) != len(self.task_ids):
+            raise ValueError("Every schedule task needs exactly one duration")
+        if (self.durations < 0).any():
+            negative = np.flatnonzero(self.durations < 0)[:10]
+            raise ValueError(
+                f"Schedule tasks have negative durations: {[self.task_ids[i] for i in negative]}"
+            )
+
+        counts = [len(deps) for deps in dependencies]
+        if len(counts) != len(self.task_ids):
+            raise ValueError("Every schedule task needs exactly one dependency list")
+        src = list(map(self.index.get, chain.from_iterable(dependencies)))
+        dst = np.repeat(np.arange(len(counts), dtype=np.int64), counts)
+        if None in src:
+            k = src.index(None)
+            dep = list(chain.from_iterable(dependencies))[k]
+            raise ValueError(
+                f"Schedule task '{self.task_ids[dst[k]]}' depends on unknown task '{dep}'"
+            )
+        self._set_edges(np.asarray(src, dtype=np.int64), dst)
+
+        n = len(self.task_ids)
+        self.early_start = np.zeros(n, dtype=np.int64)
+        self.early_finish = np.zeros(n, dtype=np.int64)
+        self.late_start = np.zeros(n, dtype=np.int64)
+        self.late_finish = np.zeros(n, dtype=np.int64)
+        self.total_float = np.zeros(n, dtype=np.int64)
+        self.free_float = np.zeros(n, dtype=np.int64)
+        self._tail = np.zeros(n, dtype=np.int64)
+        self.compute()
+
+    @classmethod
+    def from_schedule(cls, schedule: Any) -> "ScheduleEngine":
+        """Build the engine for a schedule's tasks and milestones.
+
+        Milestones are included as activities of zero duration, so tasks may
+        depend on them and they receive dates like any other activity.
+
+        Args:
+            schedule: The schedule to build the engine for.
+
+        Returns:
+            The engine, with the schedule already computed.
+        """
+        tasks = list(schedule.tasks)
+        milestones = list(schedule.milestones)
+        return cls(
+            task_ids=[t.id for t in tasks] + [m.id for m in milestones],
+            durations=[t.duration for t in tasks] + [0] * len(milestones),
+            dependencies=[t.dependencies for t in tasks] + [m.dependencies for m in milestones],
+        )
+
+    def _set_edges(
+        self, src: np.ndarray, dst: np.ndarray, order: Optional[np.ndarray] = None
+    ) -> None:
+        """Store the dependencies and sort the activities topologically.
+
+        Args:
+            src: The predecessor of every dependency.
+            dst: The dependent activity of every dependency.
+            order: A topological order the dependencies are known to respect.
+
+        Raises:
+            ValueError: If the dependencies contain a cycle. The engine is
+                left unchanged.
+        """
+        n = len(self.task_ids)
+        if len(src):
+            # Drop repeated dependencies
+            keys = np.sort(src * n + dst)
+            keys = keys[np.concatenate(([True], keys[1:] != keys[:-1]))]
+            src, dst = keys // n, keys % n
+        if order is None:
+            order = self._topological_order(src, dst)
+        self.edge_src, self.edge_dst = src, dst
+
+        self.order = order
+        self.position = np.empty(n, dtype=np.int64)
+        self.position[order] = np.arange(n)
+
+        # The passes walk the activities by topological position, so the
+        # adjacency lists are kept in that numbering for sequential access
+        rank_src, rank_dst = self.position[src], self.position[dst]
+        self.pred_ptr, self.pred_idx = _compressed(rank_dst, rank_src, n)
+        self.succ_ptr, self.succ_idx = _compressed(rank_src, rank_dst, n)
+        self._adjacency: Optional[Tuple[List[int], List[int], List[int], List[int]]] = None
+
+    def _topological_order(self, src: np.ndarray, dst: np.ndarray) -> np.ndarray:
+        """Sort the activities so that every activity follows its predecessors.
+
+        Raises:
+            ValueError: If the dependencies contain a cycle.
+        """
+        n = len(self.task_ids)
+        if (src < dst).all():
+            # Activities listed after everything they depend on need no sorting
+            return np.arange(n, dtype=np.int64)
+        succ_ptr, succ_idx = _compressed(src, dst, n)
+        indegree = np.bincount(dst, minlength=n).tolist()
+        succ_ptr, succ_idx = succ_ptr.tolist(), succ_idx.tolist()
+        order = [i for i in range(n) if not indegree[i]]
+        for i in order:
+            for j in succ_idx[succ_ptr[i]:succ_ptr[i + 1]]:
+                indegree[j] -= 1
+                if not indegree[j]:
+                    order.append(j)
+        if len(order) != n:
+            cyclic = [self.task_ids[i] for i in range(n) if indegree[i]][:10]
+            raise ValueError(f"Schedule dependencies contain a cycle involving: {cyclic}")
+        return np.asarray(order, dtype=np.int64)
+
+    def _lists(self) -> Tuple[List[int], List[int], List[int], List[int]]:
+        """Get the adjacency arrays as lists, which are faster to walk in Python."""
+        if self._adjacency is None:
+            self._adjacency = (
+                self.pred_ptr.tolist(),
+                self.pred_idx.tolist(),
+                self.succ_ptr.tolist(),
+                self.succ_idx.tolist(),
+            )
+        return self._adjacency
+
+    def compute(self) -> None:
+        """Run the forward and backward passes over the whole schedule."""
+        order = self.order
+        n = len(order)
+        durations = self.durations[order].tolist()
+        pred_ptr, pred_idx, succ_ptr, succ_idx = self._lists()
+
+        # Forward pass: an activity starts once all its predecessors finish
+        early_finish = [0] * n
+        for i in range(n):
+            start = 0
+            for p in pred_idx[pred_ptr[i]:pred_ptr[i + 1]]:
+                if early_finish[p] > start:
+                    start = early_finish[p]
+            early_finish[i] = start + durations[i]
+        self.early_finish[order] = early_finish
+
+        # Backward pass: the longest chain from each activity to the end
+        tail = [0] * n
+        for i in range(n - 1, -1, -1):
+            longest = 0
+            for s in succ_idx[succ_ptr[i]:succ_ptr[i + 1]]:
+                if tail[s] > longest:
+                    longest = tail[s]
+            tail[i] = longest + durations[i]
+        self._tail[order] = tail
+
+        self._derive()
+
+    def update(
+        self,
+        durations: Optional[Dict[str, int]] = None,
+        dependencies: Optional[Dict[str, Sequence[str]]] = None,
+    ) -> np.ndarray:
+        """Change activities and recompute only the part of the graph they affect.
+
+        Early finishes are propagated forward from the changed activities to
+        their descendants, and the longest chain to the end backward to their
+        ancestors, stopping wherever a value does not change. Late times and
+        float then follow with a few array operations. A new dependency that
+        contradicts the current topological order makes the engine sort the
+        activities again and compute the whole schedule.
+
+        Args:
+            durations: New durations keyed by activity identifier.
+            dependencies: New dependency lists keyed by activity identifier.
+                Each list replaces the activity's current dependencies.
+
+        Returns:
+            The positions of the activities whose duration or computed times
+            changed.
+
+        Raises:
+            ValueError: If an identifier is unknown, a duration is negative or
+                the dependencies would contain a cycle. The engine is left
+                unchanged.
+        """
+        durations = durations or {}
+        dependencies = dependencies or {}
+        index = self.index
+        unknown = [t for t in chain(durations, dependencies) if t not in index]
+        if unknown:
+            raise ValueError(f"Unknown schedule tasks: {unknown[:10]}")
+        negative = [t for t, d in durations.items() if d < 0]
+        if negative:
+            raise ValueError(f"Schedule tasks have negative durations: {negative[:10]}")
+
+        forward: Set[int] = set()
+        backward: Set[int] = set()
+        resort = False
+        if dependencies:
+            new_src: List[int] = []
+            new_dst: List[int] = []
+            for task_id, deps in dependencies.items():
+                for dep in deps:
+                    j = index.get(dep)
+                    if j is None:
+                        raise ValueError(
+                            f"Schedule task '{task_id}' depends on unknown task '{dep}'"
+                        )
+                    new_src.append(j)
+                    new_dst.append(index[task_id])
+            changed = np.fromiter((index[t] for t in dependencies), dtype=np.int64)
+            kept = ~np.isin(self.edge_dst, changed)
+            added_src = np.asarray(new_src, dtype=np.int64)
+            added_dst = np.asarray(new_dst, dtype=np.int64)
+            resort = bool((self.position[added_src] >= self.position[added_dst]).any())
+            removed_src = self.edge_src[~kept]
+            self._set_edges(
+                np.concatenate((self.edge_src[kept], added_src)),
+                np.concatenate((self.edge_dst[kept], added_dst)),
+                order=None if resort else self.order,
+            )
+            forward.update(changed.tolist())
+            backward.update(removed_src.tolist())
+            backward.update(new_src)
+
+        before = np.stack((self.durations, self.early_start, self.late_start, self.free_float))
+        for task_id, duration in durations.items():
+            i = index[task_id]
+            if self.durations[i] != duration:
+                self.durations[i] = duration
+                forward.add(i)
+                backward.add(i)
+
+        if resort:
+            self.compute()
+        elif forward or backward:
+            self._propagate(forward, backward)
+            self._derive()
+        after = np.stack((self.durations, self.early_start, self.late_start, self.free_float))
+        return np.flatnonzero((before != after).any(axis=0))
+
+    def _propagate(self, forward: Set[int], backward: Set[int]) -> None:
+        """Recompute early finishes downstream and chain lengths upstream.
+
+        Activities are visited in topological order from a heap, so each one
+        is recomputed at most once and only after everything it depends on.
+        """
+        order = self.order
+        durations = self.durations[order].tolist()
+        pred_ptr, pred_idx, succ_ptr, succ_idx = self._lists()
+
+        early_finish = self.early_finish[order].tolist()
+        heap = sorted(self.position[list(forward)].tolist())
+        queued = set(heap)
+        while heap:
+            i = heapq.heappop(heap)
+            start = 0
+            for p in pred_idx[pred_ptr[i]:pred_ptr[i + 1]]:
+                if early_finish[p] > start:
+                    start = early_finish[p]
+            if start + durations[i] != early_finish[i]:
+                early_finish[i] = start + durations[i]
+                for s in succ_idx[succ_ptr[i]:succ_ptr[i + 1]]:
+                    if s not in queued:
+                        queued.add(s)
+                        heapq.heappush(heap, s)
+        self.early_finish[order] = early_finish
+
+        tail = self._tail[order].tolist()
+        heap = sorted((-self.position[list(backward)]).tolist())
+        queued = set(heap)
+        while heap:
+            i = -heapq.heappop(heap)
+            longest = 0
+            for s in succ_idx[succ_ptr[i]:succ_ptr[i + 1]]:
+                if tail[s] > longest:
+                    longest = tail[s]
+            if longest + durations[i] != tail[i]:
+                tail[i] = longest + durations[i]
+                for p in pred_idx[pred_ptr[i]:pred_ptr[i + 1]]:
+                    if -p not in queued:
+                        queued.add(-p)
+                        heapq.heappush(heap, -p)
+        self._tail[order] = tail
+
+    def _derive(self) -> None:
+        """Derive the remaining times and float from the passes' results."""
+        np.subtract(self.early_finish, self.durations, out=self.early_start)
+        # The late start leaves exactly enough time for the longest chain
+        np.subtract(self.project_duration, self._tail, out=self.late_start)
+        np.add(self.late_start, self.durations, out=self.late_finish)
+        np.subtract(self.late_start, self.early_start, out=self.total_float)
+        # Free float is the slack before the earliest successor start
+        next_start = np.full(len(self.task_ids), self.project_duration, dtype=np.int64)
+        if len(self.edge_src):
+            np.minimum.at(next_start, self.edge_src, self.early_start[self.edge_dst])
+        np.subtract(next_start, self.early_finish, out=self.free_float)
+
+    def levels(self, reverse: bool = False) -> np.ndarray:
+        """Get the largest number of dependency steps before each activity.
+
+        Activities on the same level do not depend on each other, so they can
+        be computed together.
+
+        Args:
+            reverse: Whether to count the steps after each activity instead.
+
+        Returns:
+            The level of every activity.
+        """
+        n = len(self.order)
+        pred_ptr, pred_idx, succ_ptr, succ_idx = self._lists()
+        if reverse:
+            ptr, idx, ranks = succ_ptr, succ_idx, range(n - 1, -1, -1)
+        else:
+            ptr, idx, ranks = pred_ptr, pred_idx, range(n)
+        level = [0] * n
+        for i in ranks:
+            for j in idx[ptr[i]:ptr[i + 1]]:
+                if level[j] >= level[i]:
+                    level[i] = level[j] + 1
+        levels = np.empty(n, dtype=np.int64)
+        levels[self.order] = level
+        return levels
+
+    @property
+    def project_duration(self) -> int:
+        """The number of days from the project start to its last finish."""
+        return int(self.early_finish.max()) if len(self.early_finish) else 0
+
+    @property
+    def critical(self) -> np.ndarray:
+        """Whether each activity has no total float."""
+        return self.total_float <= 0
+
+    @property
+    def critical_path(self) -> List[str]:
+        """The identifiers of the critical activities in schedule order."""
+        critical = np.flatnonzero(self.critical)
+        ordered = critical[np.lexsort((self.position[critical], self.early_start[critical]))]
+        return [self.task_ids[i] for i in ordered]
+
+    def task_times(self, task_id: str) -> Dict[str, int]:
+        """Get the computed times of a single activity.
+
+        Args:
+            task_id: The activity identifier.
+
+        Returns:
+            The early and late start and finish, and the total and free float.
+        """
+        i = self.index[task_id]
+        return {
+            "early_start": int(self.early_start[i]),
+            "early_finish": int(self.early_finish[i]),
+            "late_start": int(self.late_start[i]),
+            "late_finish": int(self.late_finish[i]),
+            "total_float": int(self.total_float[i]),
+            "free_float": int(self.free_float[i]),
+        }
+
+    def apply_to(self, schedule: Any, positions: Optional[Sequence[int]] = None) -> Any:
+        """Write the computed dates, float and critical path to a schedule.
+
+        Tasks start on their early start and end on the last day they occupy.
+        Milestones fall on the last day of the work they depend on.
+
+        Args:
+            schedule: The schedule the engine was built from with
+                :meth:`from_schedule`.
+            positions: The activities to write, such as those returned by
+                :meth:`update`. Defaults to every activity.
+
+        Returns:
+            The same schedule, updated in place.
+        """
+        tasks, milestones = schedule.tasks, schedule.milestones
+        if positions is None:
+            positions = np.arange(len(self.task_ids))
+        positions = np.asarray(positions, dtype=np.int64)
+        project_start = np.datetime64(schedule.start_date, "D")
+
+        task_positions = positions[positions < len(tasks)]
+        starts = self._format_dates(project_start, self.early_start[task_positions])
+        ends = self._format_dates(
+            project_start,
+            np.maximum(self.early_finish - 1, self.early_start)[task_positions],
+        )
+        columns = zip(
+            task_positions.tolist(),
+            starts,
+            ends,
+            self.early_start[task_positions].tolist(),
+            self.early_finish[task_positions].tolist(),
+            self.late_start[task_positions].tolist(),
+            self.late_finish[task_positions].tolist(),
+            self.total_float[task_positions].tolist(),
+            self.free_float[task_positions].tolist(),
+        )
+        for i, start, end, es, ef, ls, lf, tf, ff in columns:
+            task = tasks[i]
+            # The values are already valid, so skip validation on assignment
+            task.__dict__.update(
+                start_date=start,
+                end_date=end,
+                early_start=es,
+                early_finish=ef,
+                late_start=ls,
+                late_finish=lf,
+                total_float=tf,
+                free_float=ff,
+                is_critical=tf <= 0,
+            )
+            task.__pydantic_fields_set__.update(COMPUTED_TASK_FIELDS)
+
+        milestone_positions = positions[positions >= len(tasks)]
+        milestone_days = np.maximum(self.early_start[milestone_positions] - 1, 0)
+        for i, date in zip(
+            milestone_positions.tolist(), self._format_dates(project_start, milestone_days)
+        ):
+            milestones[i - len(tasks)].date = date
+
+        schedule.end_date = self._format_dates(
+            project_start, np.array([max(self.project_duration - 1, 0)])
+        )[0]
+        schedule.critical_path = self.critical_path
+        return schedule
+
+    @staticmethod
+    def _format_dates(project_start: np.datetime64, offsets: np.ndarray) -> List[str]:
+        """Format day offsets from the project start as ``YYYY-MM-DD`` dates."""
+        return np.datetime_as_string(project_start + offsets, unit="D").tolist()
+
+    def summary(self, near_critical_days: int = 5) -> Dict[str, Any]:
+        """Summarise the computed schedule.
+
+        Args:
+            near_critical_days: Total float up to which a non-critical task is
+                reported as near-critical.
+
+        Returns:
+            Headline figures for the schedule, suitable for reporting or as
+            grounding for a narrative analysis.
+        """
+        critical = self.critical
+        total_float = self.total_float
+        return {
+            "task_count": len(self.task_ids),
+            "dependency_count": int(len(self.edge_src)),
+            "project_duration": self.project_duration,
+            "critical_task_count": int(critical.sum()),
+            "critical_path": self.critical_path,
+            "average_total_float": float(total_float.mean()) if len(total_float) else 0.0,
+            "near_critical_tasks": [
+                self.task_ids[i]
+                for i in np.flatnonzero((total_float > 0) & (total_float <= near_critical_days))
+            ],
+        }
+
+
+def _compressed(keys: np.ndarray, values: np.ndarray, n: int):
+    """Group values by key as an offsets array and a flat values array."""
+    by_key = np.argsort(keys, kind="stable")
+    offsets = np.concatenate(([0], np.cumsum(np.bincount(keys, minlength=n))))
+    return offsets, values[by_key]
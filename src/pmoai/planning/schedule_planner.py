@@ -1,25 +1,41 @@
+import json
 from datetime import datetime, timedelta
 from typing import Any, Dict, List, Optional
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, PrivateAttr
 
 from pmoai.agent import Agent
+from pmoai.planning.schedule_engine import COMPUTED_TASK_FIELDS, ScheduleEngine
+from pmoai.planning.schedule_simulation import MonteCarloScheduleSimulator, ScheduleSimulationResult
 from pmoai.task import Task
 
 
+TASK_UPDATE_FIELDS = ("duration", "progress", "dependencies")
+MILESTONE_UPDATE_FIELDS = ("dependencies",)
+
+
 class ScheduleTask(BaseModel):
     """Represents a task in a project schedule."""
     
     id: str = Field(description="The task identifier.")
     name: str = Field(description="The name of the task.")
     description: str = Field(description="A description of the task.")
-    start_date: str = Field(description="The start date of the task.")
-    end_date: str = Field(description="The end date of the task.")
+    start_date: Optional[str] = Field(None, description="The start date of the task.")
+    end_date: Optional[str] = Field(None, description="The end date of the task.")
     duration: int = Field(description="The duration of the task in days.")
+    optimistic_duration: Optional[int] = Field(None, description="The optimistic duration of the task in days.")
+    pessimistic_duration: Optional[int] = Field(None, description="The pessimistic duration of the task in days.")
     dependencies: List[str] = Field(default_factory=list, description="The dependencies of the task.")
     resources: List[str] = Field(default_factory=list, description="The resources assigned to the task.")
     progress: float = Field(default=0.0, description="The progress of the task (0-100).")
     status: str = Field(default="Not Started", description="The status of the task.")
+    early_start: Optional[int] = Field(None, description="The early start of the task in days from the project start.")
+    early_finish: Optional[int] = Field(None, description="The early finish of the task in days from the project start.")
+    late_start: Optional[int] = Field(None, description="The late start of the task in days from the project start.")
+    late_finish: Optional[int] = Field(None, description="The late finish of the task in days from the project start.")
+    total_float: Optional[int] = Field(None, description="The days the task can slip without delaying the project.")
+    free_float: Optional[int] = Field(None, description="The days the task can slip without delaying any successor.")
+    is_critical: bool = Field(default=False, description="Whether the task is on the critical path.")
 
 
 class Milestone(BaseModel):
@@ -28,7 +44,7 @@ class Milestone(BaseModel):
     id: str = Field(description="The milestone identifier.")
     name: str = Field(description="The name of the milestone.")
     description: str = Field(description="A description of the milestone.")
-    date: str = Field(description="The date of the milestone.")
+    date: Optional[str] = Field(None, description="The date of the milestone.")
     dependencies: List[str] = Field(default_factory=list, description="The dependencies of the milestone.")
     status: str = Field(default="Not Started", description="The status of the milestone.")
 
@@ -39,10 +55,38 @@ class Schedule(BaseModel):
     project_name: str = Field(description="The name of the project.")
     project_code: Optional[str] = Field(None, description="The project code.")
     start_date: str = Field(description="The start date of the project.")
-    end_date: str = Field(description="The end date of the project.")
+    end_date: Optional[str] = Field(None, description="The end date of the project.")
     tasks: List[ScheduleTask] = Field(description="The tasks in the project schedule.")
-    milestones: List[Milestone] = Field(description="The milestones in the project schedule.")
-    critical_path: List[str] = Field(description="The critical path of the project schedule.")
+    milestones: List[Milestone] = Field(default_factory=list, description="The milestones in the project schedule.")
+    critical_path: List[str] = Field(default_factory=list, description="The critical path of the project schedule.")
+    
+    _engine: Optional[ScheduleEngine] = PrivateAttr(default=None)
+
+
+class ScheduleChange(BaseModel):
+    """Represents a change to a field of a task or milestone."""
+    
+    id: str = Field(description="The task or milestone identifier.")
+    field: str = Field(description="The name of the changed field.")
+    old_value: Any = Field(description="The value before the change.")
+    new_value: Any = Field(description="The value after the change.")
+
+
+class ScheduleChangeSet(BaseModel):
+    """Represents the changes made to a project schedule by an update."""
+    
+    changes: List[ScheduleChange] = Field(default_factory=list, description="The changed fields.")
+    old_end_date: Optional[str] = Field(None, description="The end date of the project before the update.")
+    new_end_date: Optional[str] = Field(None, description="The end date of the project after the update.")
+    critical_path_added: List[str] = Field(default_factory=list, description="The tasks that became critical.")
+    critical_path_removed: List[str] = Field(default_factory=list, description="The tasks that are no longer critical.")
+
+
+def _tracked_values(item: Any) -> Dict[str, Any]:
+    """Get the calculated fields of a task or milestone."""
+    if isinstance(item, Milestone):
+        return {"date": item.date}
+    return {field: getattr(item, field) for field in COMPUTED_TASK_FIELDS}
 
 
 class SchedulePlanner(BaseModel):
@@ -81,11 +125,12 @@ class SchedulePlanner(BaseModel):
             Project Start Date: {start_date}
             
             Include the following in your project schedule:
-            - Project end date
-            - Tasks with start dates, end dates, and durations
+            - Tasks with durations in days
             - Task dependencies
-            - Milestones
-            - Critical path
+            - Milestones and the tasks they depend on
+            
+            Dates, float and the critical path are calculated from the
+            durations and dependencies, so do not include them.
             
             Provide your project schedule in JSON format.
             """,
@@ -107,13 +152,130 @@ class SchedulePlanner(BaseModel):
             **schedule_data,
         )
         
-        return schedule
+        # Dates and the critical path are derived from the dependencies
+        return self.compute_schedule(schedule)
+    
+    def compute_schedule(self, schedule: Schedule) -> Schedule:
+        """Calculate the dates, float and critical path of a project schedule.
+        
+        The calculation is a critical path method pass over the task
+        dependencies and does not involve the project manager agent.
+        
+        Args:
+            schedule: The project schedule to calculate.
+            
+        Returns:
+            The same project schedule, updated in place.
+            
+        Raises:
+            ValueError: If the dependencies are unknown or contain a cycle.
+        """
+        engine = ScheduleEngine.from_schedule(schedule)
+        schedule._engine = engine
+        return engine.apply_to(schedule)
+    
+    def recalculate_schedule(
+        self, schedule: Schedule, task_updates: Dict[str, Dict[str, Any]]
+    ) -> ScheduleChangeSet:
+        """Apply task updates and recalculate only the affected part of a schedule.
+        
+        Unlike update_schedule, this does not involve the project manager
+        agent. Duration and dependency changes are propagated through the
+        dependency graph to the tasks downstream of them, and to the float of
+        the tasks upstream. Progress changes are recorded but do not move any
+        dates. The schedule, including its critical path, is updated in place.
+        
+        The calculation state is kept with the schedule, so tasks and
+        milestones should only be added or removed through compute_schedule.
+        
+        Args:
+            schedule: The project schedule to update.
+            task_updates: The new values keyed by task or milestone identifier.
+                Tasks accept 'duration', 'progress' and 'dependencies', and
+                milestones accept 'dependencies'.
+            
+        Returns:
+            The changes made to the schedule.
+            
+        Raises:
+            ValueError: If an update is not supported, or the dependencies are
+                unknown or contain a cycle. The schedule is left unchanged.
+        """
+        items = schedule.tasks + schedule.milestones
+        engine = schedule._engine
+        if engine is None or len(engine.task_ids) != len(items):
+            self.compute_schedule(schedule)
+            engine = schedule._engine
+        
+        durations: Dict[str, int] = {}
+        dependencies: Dict[str, List[str]] = {}
+        for item_id, fields in task_updates.items():
+            if item_id not in engine.index:
+                raise ValueError(f"Unknown schedule task: {item_id}")
+            allowed = (
+                TASK_UPDATE_FIELDS
+                if engine.index[item_id] < len(schedule.tasks)
+                else MILESTONE_UPDATE_FIELDS
+            )
+            unsupported = set(fields) - set(allowed)
+            if unsupported:
+                raise ValueError(
+                    f"Cannot update {sorted(unsupported)} of schedule task '{item_id}'"
+                )
+            if "duration" in fields:
+                durations[item_id] = fields["duration"]
+            if "dependencies" in fields:
+                dependencies[item_id] = list(fields["dependencies"])
+        
+        positions = engine.update(durations=durations, dependencies=dependencies)
+        
+        change_set = ScheduleChangeSet(old_end_date=schedule.end_date)
+        old_path = schedule.critical_path
+        before = {i: _tracked_values(items[i]) for i in positions.tolist()}
+        for item_id, fields in task_updates.items():
+            item = items[engine.index[item_id]]
+            for field, value in fields.items():
+                if getattr(item, field) != value:
+                    change_set.changes.append(
+                        ScheduleChange(
+                            id=item_id,
+                            field=field,
+                            old_value=getattr(item, field),
+                            new_value=value,
+                        )
+                    )
+                    setattr(item, field, value)
+        
+        engine.apply_to(schedule, positions)
+        
+        for i, old_values in before.items():
+            item = items[i]
+            for field, new_value in _tracked_values(item).items():
+                if old_values[field] != new_value:
+                    change_set.changes.append(
+                        ScheduleChange(
+                            id=item.id,
+                            field=field,
+                            old_value=old_values[field],
+                            new_value=new_value,
+                        )
+                    )
+        
+        change_set.new_end_date = schedule.end_date
+        old_critical, new_critical = set(old_path), set(schedule.critical_path)
+        change_set.critical_path_added = [t for t in schedule.critical_path if t not in old_critical]
+        change_set.critical_path_removed = [t for t in old_path if t not in new_critical]
+        
+        return change_set
     
     def update_schedule(
         self, schedule: Schedule, updates: Dict[str, Any]
     ) -> Schedule:
         """Update a project schedule.
         
+        Duration, progress and dependency changes can be applied without the
+        project manager agent with recalculate_schedule.
+        
         Args:
             schedule: The project schedule to update.
             updates: The updates to apply to the schedule.
@@ -149,43 +311,92 @@ class SchedulePlanner(BaseModel):
         
         return updated_schedule
     
-    def analyze_schedule(self, schedule: Schedule) -> Dict[str, Any]:
+    def simulate_schedule(
+        self,
+        schedule: Schedule,
+        risks: Optional[List[Any]] = None,
+        iterations: int = 100_000,
+        seed: Optional[int] = None,
+        processes: Optional[int] = None,
+        distribution: str = "pert",
+    ) -> ScheduleSimulationResult:
+        """Simulate the completion of a project schedule.
+        
+        Task durations are drawn from their optimistic, most likely and
+        pessimistic estimates, and risks with affected tasks and a schedule
+        impact delay those tasks when they occur.
+        
+        Args:
+            schedule: The project schedule to simulate.
+            risks: The risks that may delay the schedule.
+            iterations: The number of iterations to simulate.
+            seed: The seed of the random generator, for reproducible results.
+            processes: The number of worker processes to simulate with.
+            distribution: Either 'pert' or 'triangular'.
+            
+        Returns:
+            The completion percentiles and the criticality of each task.
+        """
+        simulator = MonteCarloScheduleSimulator.from_schedule(
+            schedule, risks=risks, distribution=distribution
+        )
+        return simulator.run(iterations=iterations, seed=seed, processes=processes)
+    
+    def analyze_schedule(
+        self,
+        schedule: Schedule,
+        include_narrative: bool = True,
+        risks: Optional[List[Any]] = None,
+        iterations: int = 0,
+    ) -> Dict[str, Any]:
         """Analyze a project schedule.
         
+        The schedule figures are calculated with the critical path method,
+        and optionally a Monte Carlo simulation of its completion. The
+        project manager agent only writes a narrative on top of them.
+        
         Args:
             schedule: The project schedule to analyze.
+            include_narrative: Whether to ask the project manager agent for a
+                narrative analysis of the calculated figures.
+            risks: The risks that may delay the schedule in the simulation.
+            iterations: The number of iterations to simulate, or 0 to skip
+                the simulation.
             
         Returns:
             An analysis of the project schedule.
         """
-        # Create a task for the project manager to analyze the schedule
+        analysis = ScheduleEngine.from_schedule(schedule).summary()
+        if iterations:
+            analysis["simulation"] = self.simulate_schedule(
+                schedule, risks=risks, iterations=iterations
+            ).summary()
+        if not include_narrative:
+            return analysis
+        
+        # Create a task for the project manager to interpret the figures
         analysis_task = Task(
             description=f"""
             Analyze the project schedule for the project '{schedule.project_name}'.
             
-            Schedule:
-            {schedule.json(indent=2)}
+            Calculated Schedule Figures (durations in days):
+            {json.dumps(analysis, indent=2)}
             
-            Provide an analysis of the project schedule, including:
-            - Project duration
+            The figures above are exact. Based on them, provide:
             - Critical path analysis
             - Schedule risks
-            - Resource utilization
             - Schedule compression opportunities
             - Schedule quality assessment
             - Recommendations for improvement
-            
-            Provide your analysis in JSON format.
             """,
-            expected_output="An analysis of the project schedule in JSON format.",
+            expected_output="A narrative analysis of the project schedule.",
             agent=self.project_manager_agent,
         )
         
         # Execute the task
         result = analysis_task.execute()
         
-        # Parse the result into a dictionary
-        analysis = result.raw
+        analysis["narrative"] = result.raw
         
         return analysis
     
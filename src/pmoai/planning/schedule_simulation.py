@@ -0,0 +1,371 @@
+"""
+Monte Carlo simulation of schedule risk.
+"""
+
+import concurrent.futures
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from pydantic import BaseModel, Field
+
+from pmoai.planning.schedule_engine import ScheduleEngine
+
+RISK_PROBABILITIES = {"high": 0.7, "medium": 0.4, "low": 0.1}
+PERCENTILES = (50, 80, 95)
+
+# Number of iteration x activity cells simulated at once, which bounds memory
+_CHUNK_CELLS = 1 << 21
+
+_Levels = List[Tuple[np.ndarray, np.ndarray, np.ndarray]]
+
+
+class ScheduleSimulationResult(BaseModel):
+    """Represents the outcome of a Monte Carlo schedule simulation."""
+
+    iterations: int = Field(description="The number of simulated iterations.")
+    planned_duration: int = Field(description="The project duration from the planned task durations, in days.")
+    mean_duration: float = Field(description="The mean simulated project duration, in days.")
+    std_duration: float = Field(description="The standard deviation of the simulated project duration, in days.")
+    percentile_durations: Dict[str, float] = Field(description="The simulated project duration at each percentile, in days.")
+    completion_dates: Dict[str, str] = Field(default_factory=dict, description="The completion date at each percentile.")
+    criticality: Dict[str, float] = Field(description="The share of iterations in which each task was critical.")
+
+    def summary(self, top: int = 10) -> Dict[str, Any]:
+        """Summarise the simulation for reporting.
+
+        Args:
+            top: The number of most critical tasks to include.
+
+        Returns:
+            The headline figures and the most critical tasks.
+        """
+        most_critical = sorted(self.criticality.items(), key=lambda item: -item[1])[:top]
+        return {
+            "iterations": self.iterations,
+            "planned_duration": self.planned_duration,
+            "mean_duration": round(self.mean_duration, 2),
+            "percentile_durations": self.percentile_durations,
+            "completion_dates": self.completion_dates,
+            "most_critical_tasks": dict(most_critical),
+        }
+
+
+class _SimulationModel:
+    """The arrays needed to simulate one chunk, kept small to send to workers."""
+
+    def __init__(
+        self,
+        minimum: np.ndarray,
+        mode: np.ndarray,
+        maximum: np.ndarray,
+        distribution: str,
+        forward: _Levels,
+        backward: _Levels,
+        risk_probabilities: np.ndarray,
+        risk_impacts: np.ndarray,
+        risk_links: np.ndarray,
+    ):
+        self.minimum = minimum
+        self.mode = mode
+        self.maximum = maximum
+        self.distribution = distribution
+        self.forward = forward
+        self.backward = backward
+        self.risk_probabilities = risk_probabilities
+        self.risk_impacts = risk_impacts
+        self.risk_links = risk_links
+
+        self.uncertain = np.flatnonzero(maximum > minimum)
+        spread = (maximum - minimum)[self.uncertain]
+        # PERT shape parameters for the uncertain activities
+        self.alpha = 1 + 4 * (mode - minimum)[self.uncertain] / spread
+        self.beta = 1 + 4 * (maximum - mode)[self.uncertain] / spread
+
+    def sample(self, rng: np.random.Generator, iterations: int) -> np.ndarray:
+        """Draw the activity durations of a number of iterations.
+
+        Returns:
+            An array with one row per activity and one column per iteration.
+        """
+        durations = np.repeat(self.mode[:, None], iterations, axis=1)
+        uncertain = self.uncertain
+        if len(uncertain):
+            low = self.minimum[uncertain, None]
+            high = self.maximum[uncertain, None]
+            size = (len(uncertain), iterations)
+            if self.distribution == "triangular":
+                durations[uncertain] = rng.triangular(low, self.mode[uncertain, None], high, size=size)
+            else:
+                fraction = rng.beta(self.alpha[:, None], self.beta[:, None], size=size)
+                durations[uncertain] = low + fraction * (high - low)
+
+        if len(self.risk_probabilities):
+            occurred = rng.random((len(self.risk_probabilities), iterations))
+            delays = (occurred < self.risk_probabilities[:, None]) * self.risk_impacts[:, None]
+            for risk, activity in self.risk_links:
+                durations[activity] += delays[risk]
+        return durations
+
+
+def _longest_paths(durations: np.ndarray, levels: _Levels) -> np.ndarray:
+    """Compute the longest chain ending at every activity, level by level.
+
+    Each level lists its activities, the neighbours of those activities
+    grouped by activity, and where each group starts. Activities are rows,
+    so gathering the neighbours copies whole contiguous rows.
+    """
+    totals = durations.copy()
+    for activities, neighbours, starts in levels:
+        totals[activities] += np.maximum.reduceat(totals[neighbours], starts, axis=0)
+    return totals
+
+
+def _simulate_chunk(
+    model: _SimulationModel, iterations: int, seed: np.random.SeedSequence
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Simulate a chunk of iterations.
+
+    Returns:
+        The project duration of every iteration and the number of iterations
+        in which each activity was critical.
+    """
+    rng = np.random.default_rng(seed)
+    durations = model.sample(rng, iterations)
+    early_finish = _longest_paths(durations, model.forward)
+    tail = _longest_paths(durations, model.backward)
+    project = early_finish.max(axis=0)
+    # An activity is critical when the longest chain through it is the project
+    through = early_finish - durations + tail
+    critical = through >= project * (1 - 1e-9)
+    return project, critical.sum(axis=1)
+
+
+class MonteCarloScheduleSimulator:
+    """Monte Carlo simulation of a schedule's completion.
+
+    Every iteration draws each task's duration from its three-point estimate,
+    adds the delays of the risks that occur, and computes the critical path
+    over the dependency graph. Iterations are simulated in vectorised chunks:
+    the activities are grouped by dependency level, and each level is one
+    array operation over every iteration of the chunk, so memory stays
+    bounded however many iterations are run. Chunks can be spread over a
+    process pool and give the same results for a given seed either way.
+    """
+
+    def __init__(
+        self,
+        engine: ScheduleEngine,
+        optimistic: Sequence[float],
+        pessimistic: Sequence[float],
+        risks: Sequence[Tuple[float, float, Sequence[str]]] = (),
+        distribution: str = "pert",
+        start_date: Optional[str] = None,
+    ):
+        """Initialize the simulator.
+
+        Args:
+            engine: The schedule engine holding the dependency graph and the
+                most likely duration of every activity.
+            optimistic: The optimistic duration of every activity.
+            pessimistic: The pessimistic duration of every activity.
+            risks: The probability, delay in days and affected activities of
+                every risk.
+            distribution: Either 'pert' or 'triangular'.
+            start_date: The project start date, used to report completion dates.
+
+        Raises:
+            ValueError: If an estimate or risk is invalid.
+        """
+        if distribution not in ("pert", "triangular"):
+            raise ValueError(f"Unknown duration distribution: {distribution}")
+        mode = engine.durations.astype(np.float64)
+        minimum = np.minimum(np.asarray(optimistic, dtype=np.float64), mode)
+        maximum = np.maximum(np.asarray(pessimistic, dtype=np.float64), mode)
+        if (minimum < 0).any():
+            raise ValueError("Optimistic durations cannot be negative")
+
+        links = []
+        for r, (probability, _, activities) in enumerate(risks):
+            if not 0 <= probability <= 1:
+                raise ValueError(f"Risk probability must be between 0 and 1, got {probability}")
+            for activity in activities:
+                if activity not in engine.index:
+                    raise ValueError(f"Risk affects unknown schedule task: {activity}")
+                links.append((r, engine.index[activity]))
+
+        self.engine = engine
+        self.start_date = start_date
+        self._model = _SimulationModel(
+            minimum=minimum,
+            mode=mode,
+            maximum=maximum,
+            distribution=distribution,
+            forward=_group_levels(engine.levels(), engine.edge_dst, engine.edge_src),
+            backward=_group_levels(engine.levels(reverse=True), engine.edge_src, engine.edge_dst),
+            risk_probabilities=np.array([r[0] for r in risks], dtype=np.float64),
+            risk_impacts=np.array([r[1] for r in risks], dtype=np.float64),
+            risk_links=np.array(links, dtype=np.int64).reshape(-1, 2),
+        )
+
+    @classmethod
+    def from_schedule(
+        cls,
+        schedule: Any,
+        risks: Optional[Sequence[Any]] = None,
+        distribution: str = "pert",
+    ) -> "MonteCarloScheduleSimulator":
+        """Build the simulator for a schedule and the risks of a risk plan.
+
+        Tasks without three-point estimates keep their planned duration.
+        Risks are only simulated when they name the tasks they affect and
+        their schedule impact.
+
+        Args:
+            schedule: The schedule to simulate.
+            risks: The risks that may delay tasks.
+            distribution: Either 'pert' or 'triangular'.
+
+        Returns:
+            The simulator.
+        """
+        engine = ScheduleEngine.from_schedule(schedule)
+        optimistic = [
+            t.duration if t.optimistic_duration is None else t.optimistic_duration
+            for t in schedule.tasks
+        ] + [0] * len(schedule.milestones)
+        pessimistic = [
+            t.duration if t.pessimistic_duration is None else t.pessimistic_duration
+            for t in schedule.tasks
+        ] + [0] * len(schedule.milestones)
+
+        risk_impacts = [
+            (risk_probability(risk.probability), risk.schedule_impact_days, risk.affected_tasks)
+            for risk in risks or ()
+            if risk.affected_tasks and risk.schedule_impact_days
+        ]
+        return cls(
+            engine,
+            optimistic,
+            pessimistic,
+            risks=risk_impacts,
+            distribution=distribution,
+            start_date=schedule.start_date,
+        )
+
+    def run(
+        self,
+        iterations: int = 100_000,
+        seed: Optional[int] = None,
+        chunk_size: Optional[int] = None,
+        processes: Optional[int] = None,
+    ) -> ScheduleSimulationResult:
+        """Run the simulation.
+
+        Args:
+            iterations: The number of iterations to simulate.
+            seed: The seed of the random generator, for reproducible results.
+            chunk_size: The number of iterations simulated at once. Defaults
+                to a size that keeps each chunk to a few tens of megabytes.
+            processes: The number of worker processes. Chunks are simulated
+                in this process if not set.
+
+        Returns:
+            The simulated completion percentiles and criticality indexes.
+        """
+        if iterations < 1:
+            raise ValueError("At least one iteration is required")
+        n = len(self.engine.task_ids)
+        chunk_size = chunk_size or max(1, min(iterations, _CHUNK_CELLS // max(n, 1)))
+        sizes = [chunk_size] * (iterations // chunk_size)
+        if iterations % chunk_size:
+            sizes.append(iterations % chunk_size)
+        seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+        models = [self._model] * len(sizes)
+
+        if processes and processes > 1 and len(sizes) > 1:
+            with concurrent.futures.ProcessPoolExecutor(max_workers=processes) as pool:
+                chunks = list(pool.map(_simulate_chunk, models, sizes, seeds))
+        else:
+            chunks = list(map(_simulate_chunk, models, sizes, seeds))
+
+        durations = np.concatenate([project for project, _ in chunks])
+        critical = np.sum([counts for _, counts in chunks], axis=0)
+        percentiles = np.percentile(durations, PERCENTILES)
+
+        completion_dates = {}
+        if self.start_date:
+            # A project of d days ends on the last day it occupies
+            days = np.maximum(np.ceil(percentiles).astype(np.int64) - 1, 0)
+            dates = np.datetime_as_string(np.datetime64(self.start_date, "D") + days, unit="D")
+            completion_dates = {f"P{p}": str(date) for p, date in zip(PERCENTILES, dates)}
+
+        return ScheduleSimulationResult(
+            iterations=iterations,
+            planned_duration=self.engine.project_duration,
+            mean_duration=float(durations.mean()),
+            std_duration=float(durations.std()),
+            percentile_durations={
+                f"P{p}": round(float(value), 2) for p, value in zip(PERCENTILES, percentiles)
+            },
+            completion_dates=completion_dates,
+            criticality=dict(
+                zip(self.engine.task_ids, (critical / iterations).round(4).tolist())
+            ),
+        )
+
+
+def risk_probability(probability: Any) -> float:
+    """Convert a risk probability to a number between 0 and 1.
+
+    Args:
+        probability: A number, a numeric string, a percentage such as '30%',
+            or one of the levels in RISK_PROBABILITIES.
+
+    Returns:
+        The probability.
+
+    Raises:
+        ValueError: If the probability cannot be interpreted.
+    """
+    if isinstance(probability, (int, float)):
+        return float(probability)
+    text = str(probability).strip().lower()
+    if text in RISK_PROBABILITIES:
+        return RISK_PROBABILITIES[text]
+    try:
+        if text.endswith("%"):
+            return float(text[:-1]) / 100
+        return float(text)
+    except ValueError:
+        raise ValueError(f"Cannot interpret risk probability: {probability}") from None
+
+
+def _group_levels(levels: np.ndarray, targets: np.ndarray, neighbours: np.ndarray) -> _Levels:
+    """Group dependencies by the level of the activity they lead into.
+
+    Args:
+        levels: The level of every activity.
+        targets: The activity each dependency leads into.
+        neighbours: The activity at the other end of each dependency.
+
+    Returns:
+        For every level above zero, its activities, their neighbours grouped
+        by activity, and the offset of each group.
+    """
+    if not len(targets):
+        return []
+    target_levels = levels[targets]
+    by_level = np.lexsort((targets, target_levels))
+    targets, neighbours, target_levels = (
+        targets[by_level],
+        neighbours[by_level],
+        target_levels[by_level],
+    )
+    grouped = []
+    bounds = np.flatnonzero(np.diff(target_levels)) + 1
+    for level_targets, level_neighbours in zip(
+        np.split(targets, bounds), np.split(neighbours, bounds)
+    ):
+        starts = np.concatenate(([0], np.flatnonzero(np.diff(level_targets)) + 1))
+        grouped.append((level_targets[starts], level_neighbours, starts))
+    return grouped
@@ -1,8 +1,9 @@
 import asyncio
+import concurrent.futures
 import warnings
 from abc import ABC, abstractmethod
-from inspect import signature
-from typing import Any, Callable, Type, get_args, get_origin
+from inspect import iscoroutinefunction, signature
+from typing import Any, Callable, List, Type, get_args, get_origin
 
 from pydantic import (
     BaseModel,
@@ -34,6 +35,10 @@ class BaseTool(BaseModel, ABC):
     """Flag to check if the description has been updated."""
     cache_function: Callable = lambda _args=None, _result=None: True
     """Function that will be used to determine if the tool should be cached, should return a boolean. If None, the tool will be cached."""
+    cache_version: str = ""
+    """Salt for the tool's cache keys. Changing it stops results cached by other versions from being used."""
+    cache_tags: List[str] = Field(default_factory=list)
+    """Tags under which the tool's cached results can be invalidated together."""
     result_as_answer: bool = False
     """Flag to check if the tool should be the final agent answer."""
 
@@ -70,8 +75,48 @@ class BaseTool(BaseModel, ABC):
 
         # If _run is async, we safely run it
         if asyncio.iscoroutine(result):
-            return asyncio.run(result)
+            try:
+                asyncio.get_running_loop()
+            except RuntimeError:
+                return asyncio.run(result)
 
+            # Called from inside an event loop, so run on a separate one;
+            # arun awaits the tool on the caller's loop instead
+            with concurrent.futures.ThreadPoolExecutor(max_workers=1) as pool:
+                return pool.submit(asyncio.run, result).result()
+
+        return result
+
+    async def arun(
+        self,
+        *args: Any,
+        **kwargs: Any,
+    ) -> Any:
+        """Run the tool on the caller's event loop.
+
+        Unlike run, this never creates an event loop, so concurrent tool calls
+        can overlap while they wait on I/O.
+        """
+        print(f"Using Tool: {self.name}")
+        return await self._arun(*args, **kwargs)
+
+    async def _arun(
+        self,
+        *args: Any,
+        **kwargs: Any,
+    ) -> Any:
+        """Asynchronous implementation of the tool.
+
+        By default, an async _run is awaited directly and a sync _run is
+        offloaded to the default thread pool, so it does not block the loop.
+        Override this for a native asynchronous implementation.
+        """
+        if iscoroutinefunction(self._run):
+            return await self._run(*args, **kwargs)
+
+        result = await asyncio.to_thread(self._run, *args, **kwargs)
+        if asyncio.iscoroutine(result):
+            return await result
         return result
 
     @abstractmethod
@@ -91,6 +136,7 @@ class BaseTool(BaseModel, ABC):
             args_schema=self.args_schema,
             func=self._run,
             result_as_answer=self.result_as_answer,
+            afunc=self._arun,
         )
 
     @classmethod
@@ -0,0 +1,240 @@
+import hashlib
+import sqlite3
+import threading
+import time
+from functools import lru_cache
+from typing import Dict, Iterable, Optional, Sequence, Set
+
+from pmoai.utilities.sqlite_pool import get_connection_pool
+
+# Separates the parts hashed into a namespace so that they cannot run together
+_SEPARATOR = b"\x1f"
+
+
+def _digest(*parts: bytes) -> str:
+    return hashlib.blake2b(_SEPARATOR.join(parts), digest_size=16).hexdigest()
+
+
+class CacheIndex:
+    """
+    Generation counters for invalidating groups of cache entries in O(1).
+
+    Every cache key mixes in the generation of each group its entry belongs
+    to: its tool, each of its tool's tags, and each leading run of its
+    arguments in schema order. Invalidating a group increments one counter,
+    which moves every key in the group to a new address at once; the orphaned
+    entries are never read again and age out of the cache by LRU eviction or
+    TTL. Only invalidated groups are stored, so the index stays small.
+
+    Because the tool's generation is part of every key, invalidating a tool
+    also drops the counters of its argument prefixes: combined with the new
+    tool generation, they restart from addresses that were never used. This
+    keeps the table bounded, and a tool with more than ``max_prefixes``
+    invalidated prefixes is invalidated as a whole.
+
+    Counters are kept in the cache database and mirrored in memory, so a
+    lookup does not touch the disk. Every change is numbered, and the mirror
+    periodically reads the changes made since it last looked, which picks up
+    invalidations from other processes.
+    """
+
+    def __init__(
+        self, db_path: str, refresh_interval: float = 1.0, max_prefixes: int = 10000
+    ):
+        """
+        Initialize the index
+
+        Args:
+            db_path: Path of the SQLite file holding the counters
+            refresh_interval: Seconds after which the in-memory counters are
+                refreshed to see invalidations from other processes
+            max_prefixes: Number of invalidated argument prefixes kept per
+                tool before the whole tool is invalidated instead
+        """
+        self.refresh_interval = refresh_interval
+        self.max_prefixes = max_prefixes
+        self._lock = threading.Lock()
+        self._generations: Dict[str, int] = {}
+        self._prefixes: Dict[str, Set[str]] = {}
+        # Below the change number of rows written before changes were numbered
+        self._seq = -1
+        self._loaded_at = 0.0
+        self._pool = get_connection_pool(db_path)
+        with self._pool.transaction() as conn:
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS tool_cache_generations (
+                    namespace TEXT PRIMARY KEY,
+                    generation INTEGER NOT NULL
+                ) WITHOUT ROWID
+                """
+            )
+            self._migrate(conn)
+        self._refresh()
+
+    @staticmethod
+    def _migrate(conn: sqlite3.Connection) -> None:
+        """Add change numbers and owning tools to tables written before them."""
+        columns = {row[1] for row in conn.execute("PRAGMA table_info(tool_cache_generations)")}
+        if "seq" not in columns:
+            conn.execute(
+                "ALTER TABLE tool_cache_generations ADD COLUMN seq INTEGER NOT NULL DEFAULT 0"
+            )
+            # Owning tool of argument prefix counters, which are dropped with it
+            conn.execute("ALTER TABLE tool_cache_generations ADD COLUMN tool TEXT")
+        conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_tool_cache_generations_seq "
+            "ON tool_cache_generations (seq)"
+        )
+        conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_tool_cache_generations_tool "
+            "ON tool_cache_generations (tool)"
+        )
+
+    def _refresh(self) -> None:
+        """Apply the changes made since the last refresh to the in-memory counters"""
+        with self._pool.connection() as conn:
+            changes = conn.execute(
+                """
+                SELECT namespace, generation, tool, seq FROM tool_cache_generations
+                WHERE seq > ? ORDER BY seq
+                """,
+                (self._seq,),
+            ).fetchall()
+        with self._lock:
+            for namespace, generation, tool, seq in changes:
+                if tool is not None and namespace == self._tool_namespace(tool):
+                    # Its prefix counters were dropped in the same transaction
+                    for prefix in self._prefixes.pop(tool, ()):
+                        self._generations.pop(prefix, None)
+                elif tool is not None:
+                    self._prefixes.setdefault(tool, set()).add(namespace)
+                self._generations[namespace] = generation
+                self._seq = max(self._seq, seq)
+            self._loaded_at = time.monotonic()
+
+    @staticmethod
+    def _bump(conn: sqlite3.Connection, namespace: str, tool: Optional[str] = None) -> int:
+        """Increment the generation of a group within a write transaction"""
+        # Plain UPSERT and SELECT rather than RETURNING, which needs SQLite 3.35
+        conn.execute(
+            """
+            INSERT INTO tool_cache_generations (namespace, generation, tool, seq)
+            VALUES (?, 1, ?, (SELECT COALESCE(MAX(seq), 0) + 1 FROM tool_cache_generations))
+            ON CONFLICT (namespace) DO UPDATE
+            SET generation = generation + 1, seq = excluded.seq
+            """,
+            (namespace, tool),
+        )
+        return conn.execute(
+            "SELECT generation FROM tool_cache_generations WHERE namespace = ?", (namespace,)
+        ).fetchone()[0]
+
+    @staticmethod
+    @lru_cache(maxsize=1024)
+    def _tool_namespace(tool_name: str) -> str:
+        return _digest(b"tool", tool_name.encode())
+
+    @staticmethod
+    @lru_cache(maxsize=1024)
+    def _tag_namespace(tag: str) -> str:
+        return _digest(b"tag", tag.encode())
+
+    @staticmethod
+    def _prefix_namespaces(tool_name: str, fingerprints: Iterable[bytes]) -> Iterable[str]:
+        """Get the namespace of each leading run of argument fingerprints"""
+        chain = _digest(b"args", tool_name.encode())
+        for fingerprint in fingerprints:
+            chain = _digest(chain.encode(), fingerprint)
+            yield chain
+
+    def key(
+        self,
+        tool_name: str,
+        fingerprints: Sequence[bytes],
+        version: str = "",
+        tags: Sequence[str] = (),
+    ) -> str:
+        """
+        Build the cache key of a tool call
+
+        Args:
+            tool_name: Name of the tool
+            fingerprints: Fingerprints of the call's arguments, in schema order
+            version: Version salt of the tool
+            tags: Tags of the tool
+
+        Returns:
+            Cache key, prefixed with the tool name
+        """
+        if time.monotonic() - self._loaded_at > self.refresh_interval:
+            self._refresh()
+        generations = self._generations
+        namespaces = [self._tool_namespace(tool_name)]
+        namespaces.extend(self._tag_namespace(tag) for tag in sorted(tags))
+        namespaces.extend(self._prefix_namespaces(tool_name, fingerprints))
+        salt = ",".join(str(generations.get(namespace, 0)) for namespace in namespaces)
+        return f"{tool_name}:" + _digest(
+            version.encode(), salt.encode(), *fingerprints
+        )
+
+    def invalidate_tool(self, tool_name: str) -> int:
+        """
+        Invalidate every cached call of a tool
+
+        Args:
+            tool_name: Name of the tool
+
+        Returns:
+            The new generation of the tool
+        """
+        with self._pool.transaction() as conn:
+            # Bumped first so that its change number counts the prefixes it replaces
+            generation = self._bump(conn, self._tool_namespace(tool_name), tool_name)
+            conn.execute(
+                "DELETE FROM tool_cache_generations WHERE tool = ? AND namespace != ?",
+                (tool_name, self._tool_namespace(tool_name)),
+            )
+        self._refresh()
+        return generation
+
+    def invalidate_tag(self, tag: str) -> int:
+        """
+        Invalidate every cached call of the tools with a tag
+
+        Args:
+            tag: Tag to invalidate
+
+        Returns:
+            The new generation of the tag
+        """
+        with self._pool.transaction() as conn:
+            generation = self._bump(conn, self._tag_namespace(tag))
+        self._refresh()
+        return generation
+
+    def invalidate_prefix(self, tool_name: str, fingerprints: Sequence[bytes]) -> int:
+        """
+        Invalidate every cached call of a tool whose leading arguments match
+
+        Args:
+            tool_name: Name of the tool
+            fingerprints: Fingerprints of the leading arguments, in schema order
+
+        Returns:
+            The new generation of the argument prefix, or of the tool if the
+            tool had too many invalidated prefixes and was invalidated whole
+        """
+        if not fingerprints:
+            return self.invalidate_tool(tool_name)
+        *_, namespace = self._prefix_namespaces(tool_name, fingerprints)
+        with self._pool.transaction() as conn:
+            generation = self._bump(conn, namespace, tool_name)
+            prefixes = conn.execute(
+                "SELECT COUNT(*) FROM tool_cache_generations WHERE tool = ? AND namespace != ?",
+                (tool_name, self._tool_namespace(tool_name)),
+            ).fetchone()[0]
+        if prefixes > self.max_prefixes:
+            return self.invalidate_tool(tool_name)
+        self._refresh()
+        return generation
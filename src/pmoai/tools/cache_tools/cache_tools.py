@@ -1,13 +1,14 @@
-import hashlib
-import json
+import asyncio
 import logging
 import os
-import pickle
-from datetime import datetime, timedelta
 from pathlib import Path
-from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+from typing import Any, Dict, List, Optional, Tuple
 
 from pmoai.tools.base_tool import BaseTool
+from pmoai.tools.cache_tools.cache_index import CacheIndex
+from pmoai.tools.cache_tools.fingerprint import fingerprint
+from pmoai.tools.cache_tools.single_flight import SingleFlight
+from pmoai.tools.cache_tools.tiered_cache import MISSING, TieredCache
 from pmoai.utilities.paths import cache_storage_path
 
 logger = logging.getLogger(__name__)
@@ -23,14 +24,18 @@ class CacheTools:
         cache_dir: Optional[str] = None,
         ttl: Optional[int] = None,
         enabled: bool = True,
+        max_memory_bytes: int = 64 * 1024 * 1024,
+        max_disk_bytes: int = 1024 * 1024 * 1024,
     ):
         """
         Initialize the cache tools.
 
         Args:
-            cache_dir: Directory to store cache files
+            cache_dir: Directory to store the cache database
             ttl: Time-to-live for cache entries in seconds
             enabled: Whether caching is enabled
+            max_memory_bytes: Size budget of the in-process cache tier
+            max_disk_bytes: Size budget of the on-disk cache tier
         """
         self.cache_dir = cache_dir or os.path.join(cache_storage_path(), "tools_cache")
         self.ttl = ttl  # Time-to-live in seconds
@@ -39,6 +44,17 @@ class CacheTools:
         # Create cache directory if it doesn't exist
         os.makedirs(self.cache_dir, exist_ok=True)
         
+        db_path = os.path.join(self.cache_dir, "tools_cache.db")
+        self.store = TieredCache(
+            db_path,
+            ttl=ttl,
+            max_memory_bytes=max_memory_bytes,
+            max_disk_bytes=max_disk_bytes,
+        )
+        self.index = CacheIndex(db_path)
+        self.flight = SingleFlight()
+        self._tools: Dict[str, BaseTool] = {}
+        
         logger.debug(f"Initialized tool cache at {self.cache_dir}")
 
     def wrap_tools(self, tools: List[BaseTool]) -> List[BaseTool]:
@@ -54,10 +70,11 @@ class CacheTools:
         if not self.enabled:
             return tools
             
+        default_cache_function = BaseTool.model_fields["cache_function"].default
         wrapped_tools = []
         for tool in tools:
             # Skip tools that have custom cache functions
-            if hasattr(tool, "cache_function") and tool.cache_function != BaseTool.cache_function:
+            if getattr(tool, "cache_function", default_cache_function) is not default_cache_function:
                 wrapped_tools.append(tool)
                 continue
                 
@@ -78,109 +95,176 @@ class CacheTools:
             Wrapped tool
         """
         original_run = tool._run
-        cache_dir = self.cache_dir
-        ttl = self.ttl
+        store = self.store
+        self._tools[tool.name] = tool
+        flight = self.flight
         
+        def run_and_store(cache_key: str, /, *args: Any, **kwargs: Any) -> Any:
+            # Execute the original tool and cache the result before waiters are released
+            result = original_run(*args, **kwargs)
+            store.set(cache_key, result)
+            return result
+            
+        def wrap_async(original_arun: Any) -> Any:
+            async def arun_and_store(cache_key: str, /, *args: Any, **kwargs: Any) -> Any:
+                result = await original_arun(*args, **kwargs)
+                store.set(cache_key, result)
+                return result
+
+            async def wrapped_arun(*args: Any, **kwargs: Any) -> Any:
+                cache_key = self._generate_cache_key(tool, args, kwargs)
+
+                cached_result = store.get(cache_key)
+                if cached_result is not MISSING:
+                    logger.debug(f"Cache hit for tool {tool.name}")
+                    return cached_result
+
+                return await flight.do_async(cache_key, arun_and_store, cache_key, *args, **kwargs)
+
+            return wrapped_arun
+            
         def wrapped_run(*args: Any, **kwargs: Any) -> Any:
             # Generate a cache key based on tool name and arguments
-            cache_key = self._generate_cache_key(tool.name, args, kwargs)
-            cache_file = os.path.join(cache_dir, f"{cache_key}.pkl")
+            cache_key = self._generate_cache_key(tool, args, kwargs)
             
             # Check if we have a valid cache entry
-            cached_result = self._get_cached_result(cache_file, ttl)
-            if cached_result is not None:
+            cached_result = store.get(cache_key)
+            if cached_result is not MISSING:
                 logger.debug(f"Cache hit for tool {tool.name}")
                 return cached_result
                 
-            # Execute the original tool
-            result = original_run(*args, **kwargs)
-            
-            # Cache the result
-            self._cache_result(cache_file, result)
-            
-            return result
+            # Run once for every concurrent caller with the same arguments
+            return flight.do(cache_key, run_and_store, cache_key, *args, **kwargs)
             
         # Replace the _run method with our wrapped version
-        tool._run = wrapped_run
+        if asyncio.iscoroutinefunction(original_run):
+            tool._run = wrap_async(original_run)
+        else:
+            tool._run = wrapped_run
+        # The default _arun goes through _run, but a native one needs its own wrapper
+        if type(tool)._arun is not BaseTool._arun:
+            tool._arun = wrap_async(tool._arun)
         
         return tool
         
-    def _generate_cache_key(
-        self, tool_name: str, args: Tuple[Any, ...], kwargs: Dict[str, Any]
-    ) -> str:
+    @staticmethod
+    def _argument_names(tool: BaseTool) -> List[str]:
+        """Get the argument names of a tool in schema order."""
+        return list(tool.args_schema.model_fields)
+        
+    def _fingerprint_arguments(
+        self, tool: BaseTool, args: Tuple[Any, ...], kwargs: Dict[str, Any]
+    ) -> List[bytes]:
         """
-        Generate a cache key based on tool name and arguments.
+        Fingerprint the arguments of a call, in schema order.
+
+        Positional arguments are matched to the schema by position, and
+        keyword arguments outside the schema follow in name order.
 
         Args:
-            tool_name: Name of the tool
+            tool: Tool being called
             args: Positional arguments
             kwargs: Keyword arguments
 
         Returns:
-            Cache key string
-        """
-        # Create a dictionary of all arguments
-        all_args = {
-            "tool_name": tool_name,
-            "args": args,
-            "kwargs": kwargs,
-        }
+            One fingerprint per argument
+        """
+        names = self._argument_names(tool)
+        in_schema = set(names)
+        bound = dict(zip(names, args))
+        bound.update(kwargs)
+        ordered = [name for name in names if name in bound]
+        ordered += sorted(name for name in bound if name not in in_schema)
+        fingerprints = [
+            self._fingerprint_argument(name, bound[name]) for name in ordered
+        ]
+        # Positional arguments beyond the schema
+        fingerprints += [
+            self._fingerprint_argument(f"*{i}", value)
+            for i, value in enumerate(args[len(names):])
+        ]
+        return fingerprints
         
-        # Convert to a stable string representation
-        try:
-            args_str = json.dumps(all_args, sort_keys=True)
-        except (TypeError, ValueError):
-            # If JSON serialization fails, use a simpler approach
-            args_str = str(all_args)
-            
-        # Create a hash of the arguments
-        return hashlib.md5(args_str.encode()).hexdigest()
+    @staticmethod
+    def _fingerprint_argument(name: str, value: Any) -> bytes:
+        """
+        Fingerprint a named argument value.
+
+        Args:
+            name: Argument name
+            value: Argument value
+
+        Returns:
+            Fingerprint bytes
+        """
+        return name.encode() + b"=" + fingerprint(value)
         
-    def _get_cached_result(
-        self, cache_file: str, ttl: Optional[int]
-    ) -> Optional[Any]:
+    def _generate_cache_key(
+        self, tool: BaseTool, args: Tuple[Any, ...], kwargs: Dict[str, Any]
+    ) -> str:
         """
-        Get a cached result if it exists and is valid.
+        Generate a cache key based on the tool and its arguments.
+
+        The key also depends on the tool's version salt and on the current
+        generation of the tool, its tags and its argument prefixes, so that
+        invalidating any of them changes the key.
 
         Args:
-            cache_file: Path to the cache file
-            ttl: Time-to-live in seconds
+            tool: Tool being called
+            args: Positional arguments
+            kwargs: Keyword arguments
 
         Returns:
-            Cached result or None if not found or expired
+            Cache key string, prefixed with the tool name
         """
-        if not os.path.exists(cache_file):
-            return None
-            
-        # Check if the cache entry has expired
-        if ttl is not None:
-            file_mtime = datetime.fromtimestamp(os.path.getmtime(cache_file))
-            if datetime.now() - file_mtime > timedelta(seconds=ttl):
-                logger.debug(f"Cache entry expired: {cache_file}")
-                return None
-                
-        # Load the cached result
-        try:
-            with open(cache_file, "rb") as f:
-                return pickle.load(f)
-        except Exception as e:
-            logger.warning(f"Error loading cache file {cache_file}: {e}")
-            return None
-            
-    def _cache_result(self, cache_file: str, result: Any) -> None:
+        return self.index.key(
+            tool.name,
+            self._fingerprint_arguments(tool, args, kwargs),
+            version=tool.cache_version,
+            tags=tool.cache_tags,
+        )
+        
+    def invalidate(
+        self,
+        tool_name: Optional[str] = None,
+        arguments: Optional[Dict[str, Any]] = None,
+        tag: Optional[str] = None,
+    ) -> None:
         """
-        Cache a tool result.
+        Invalidate cached results without deleting them.
+
+        Invalidated results are never returned again and are evicted over
+        time, so this takes constant time however many results are affected.
 
         Args:
-            cache_file: Path to the cache file
-            result: Result to cache
-        """
-        try:
-            with open(cache_file, "wb") as f:
-                pickle.dump(result, f)
-        except Exception as e:
-            logger.warning(f"Error caching result to {cache_file}: {e}")
+            tool_name: Invalidate the results of this tool. With arguments,
+                only the calls whose leading arguments have these values.
+            arguments: Values of the first arguments of the tool, in schema
+                order
+            tag: Invalidate the results of the tools with this tag
+        """
+        if tag is not None:
+            self.index.invalidate_tag(tag)
+        if tool_name is None:
+            if arguments:
+                raise ValueError("Invalidating by arguments requires a tool name")
+            return
+        if not arguments:
+            self.index.invalidate_tool(tool_name)
+            return
             
+        tool = self._tools.get(tool_name)
+        if tool is None:
+            raise ValueError(f"Tool '{tool_name}' has not been wrapped by this cache")
+        names = self._argument_names(tool)[: len(arguments)]
+        if set(names) != set(arguments):
+            raise ValueError(
+                f"Arguments must be the first arguments of '{tool_name}': {', '.join(names)}"
+            )
+        self.index.invalidate_prefix(
+            tool_name, [self._fingerprint_argument(name, arguments[name]) for name in names]
+        )
+        
     def clear_cache(self, tool_name: Optional[str] = None) -> int:
         """
         Clear the cache for a specific tool or all tools.
@@ -191,13 +275,26 @@ class CacheTools:
         Returns:
             Number of cache entries cleared
         """
-        count = 0
+        if tool_name is not None:
+            return self.store.clear(prefix=f"{tool_name}:")
+        
+        count = self.store.clear()
+        # Remove the per-call pickle files written by earlier versions
         for cache_file in Path(self.cache_dir).glob("*.pkl"):
-            if tool_name is None or tool_name in cache_file.stem:
-                try:
-                    os.remove(cache_file)
-                    count += 1
-                except Exception as e:
-                    logger.warning(f"Error removing cache file {cache_file}: {e}")
-                    
+            try:
+                os.remove(cache_file)
+                count += 1
+            except Exception as e:
+                logger.warning(f"Error removing cache file {cache_file}: {e}")
+                
         return count
+        
+    def stats(self) -> Dict[str, int]:
+        """
+        Get the cache hit, miss and size counters.
+
+        Returns:
+            Dictionary of counters, including the number of calls that
+            waited on an identical call in flight
+        """
+        return {**self.store.stats(), "coalesced": self.flight.coalesced}
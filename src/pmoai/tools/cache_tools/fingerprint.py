@@ -0,0 +1,208 @@
+import dataclasses
+import datetime
+import decimal
+import enum
+import hashlib
+import pathlib
+import struct
+import sys
+import threading
+import uuid
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Any, List, Tuple
+
+from pydantic import BaseModel
+
+DIGEST_SIZE = 16
+
+_LENGTH = struct.Struct("<Q")
+
+# Strings and bytes at least this long are hashed once and then looked up
+_MEMO_MIN_BYTES = 1024
+# The memo keeps its strings alive, so it is bounded by their total size too
+_MEMO_MAX_BYTES = 32 * 1024 * 1024
+_MEMO_MAX_ENTRIES = 4096
+
+_memo_lock = threading.Lock()
+# Large strings and bytes, by value, with their encoded size
+_by_value: "OrderedDict[Tuple[type, Any], Tuple[bytes, int]]" = OrderedDict()
+_by_value_bytes = 0
+# Immutable containers, by identity; the value is kept so that its id stays unique
+_by_id: "OrderedDict[int, Tuple[Any, bytes]]" = OrderedDict()
+
+_SCALARS = (
+    datetime.datetime,
+    datetime.date,
+    datetime.time,
+    datetime.timedelta,
+    decimal.Decimal,
+    uuid.UUID,
+    pathlib.PurePath,
+)
+
+
+def _remember_container(value: Any, digest: bytes) -> None:
+    with _memo_lock:
+        _by_id[id(value)] = (value, digest)
+        if len(_by_id) > _MEMO_MAX_ENTRIES:
+            _by_id.popitem(last=False)
+
+
+def _hash(*parts: bytes) -> bytes:
+    hasher = hashlib.blake2b(digest_size=DIGEST_SIZE)
+    for part in parts:
+        hasher.update(part)
+    return hasher.digest()
+
+
+def _sized(tag: bytes, data: bytes) -> bytes:
+    return tag + _LENGTH.pack(len(data)) + data
+
+
+@lru_cache(maxsize=1024)
+def _type_name(cls: type) -> bytes:
+    return _sized(b"", f"{cls.__module__}.{cls.__qualname__}".encode())
+
+
+@lru_cache(maxsize=1024)
+def _field_name(name: str) -> bytes:
+    return _sized(b"", name.encode())
+
+
+def _blob(tag: bytes, value: Any, data: bytes) -> bytes:
+    """Encode text or bytes, memoising the digest of large values"""
+    global _by_value_bytes
+    if len(data) < _MEMO_MIN_BYTES:
+        return _sized(tag, data)
+    key = (type(value), value)
+    memoised = _by_value.get(key)
+    if memoised is not None:
+        return tag.upper() + memoised[0]
+    digest = _hash(data)
+    if len(data) <= _MEMO_MAX_BYTES // 4:
+        with _memo_lock:
+            if key not in _by_value:
+                _by_value[key] = (digest, len(data))
+                _by_value_bytes += len(data)
+            while _by_value_bytes > _MEMO_MAX_BYTES or len(_by_value) > _MEMO_MAX_ENTRIES:
+                _by_value_bytes -= _by_value.popitem(last=False)[1][1]
+    return tag.upper() + digest
+
+
+def _container(tag: bytes, value: Any, parts: List[bytes], immutable: bool) -> Tuple[bytes, bool]:
+    """Encode a container as its parts, or as their memoised digest if it is immutable"""
+    encoded = tag + _LENGTH.pack(len(parts)) + b"".join(parts)
+    if not immutable:
+        return encoded, False
+    digest = _hash(encoded)
+    _remember_container(value, digest)
+    return b"#" + digest, True
+
+
+def _part(value: Any) -> Tuple[bytes, bool]:
+    """
+    Encode a value canonically
+
+    Every encoding starts with a tag and is either fixed-size or
+    length-prefixed, so encodings can be concatenated without ambiguity.
+    Containers are encoded as their item count and items, except immutable
+    ones, which are encoded as the digest of that so it can be memoised.
+
+    Args:
+        value: Value to encode
+
+    Returns:
+        The encoding, and whether the value is immutable
+    """
+    cls = type(value)
+    if value is None:
+        return b"N", True
+    if cls is bool:
+        return (b"T" if value else b"F"), True
+    if cls is int:
+        return _sized(b"i", str(value).encode()), True
+    if cls is float:
+        return b"f" + struct.pack("<d", value), True
+    if cls is str:
+        data = value.encode("utf-8", "surrogatepass")
+        if len(data) < _MEMO_MIN_BYTES:
+            return b"s" + _LENGTH.pack(len(data)) + data, True
+        return _blob(b"s", value, data), True
+    if cls is bytes:
+        return _blob(b"b", value, value), True
+
+    memoised = _by_id.get(id(value))
+    if memoised is not None and memoised[0] is value:
+        return b"#" + memoised[1], True
+
+    if isinstance(value, (list, tuple)):
+        parts = [_part(item) for item in value]
+        immutable = cls is tuple and all(flag for _, flag in parts)
+        return _container(b"l", value, [part for part, _ in parts], immutable)
+    if isinstance(value, dict):
+        return _container(
+            b"d", value, sorted(_part(k)[0] + _part(v)[0] for k, v in value.items()), False
+        )
+    if isinstance(value, (set, frozenset)):
+        parts = sorted(_part(item) for item in value)
+        immutable = cls is frozenset and all(flag for _, flag in parts)
+        return _container(b"e", value, [part for part, _ in parts], immutable)
+    if isinstance(value, BaseModel):
+        fields = [(name, getattr(value, name)) for name in type(value).model_fields]
+        fields += sorted((value.__pydantic_extra__ or {}).items())
+        return _record(b"m", value, fields, bool(value.model_config.get("frozen")))
+    if dataclasses.is_dataclass(value) and not isinstance(value, type):
+        fields = [(f.name, getattr(value, f.name)) for f in dataclasses.fields(value)]
+        return _record(b"c", value, fields, value.__dataclass_params__.frozen)
+    if isinstance(value, enum.Enum):
+        part, immutable = _part(value.value)
+        return b"n" + _type_name(cls) + part, immutable
+    if isinstance(value, _SCALARS):
+        return b"x" + _type_name(cls) + _sized(b"", str(value).encode()), True
+    if isinstance(value, (bytearray, memoryview)):
+        return _sized(b"b", bytes(value)), False
+
+    numpy = sys.modules.get("numpy")
+    if numpy is not None:
+        if isinstance(value, numpy.ndarray):
+            if value.dtype.hasobject:
+                return _container(b"o", value, [_part(value.tolist())[0]], False)
+            header = f"{value.dtype.str}{value.shape}".encode()
+            data = numpy.ascontiguousarray(value).reshape(-1).view(numpy.uint8)
+            return b"a" + _hash(header, data), False
+        if isinstance(value, numpy.generic):
+            return _sized(b"g", value.dtype.str.encode()) + _sized(b"", value.tobytes()), True
+
+    # Last resort: the representation, which may not be stable across processes
+    return b"r" + _type_name(cls) + _sized(b"", repr(value).encode()), False
+
+
+def _record(tag: bytes, value: Any, fields: Any, frozen: bool) -> Tuple[bytes, bool]:
+    """Encode a model or dataclass as its type and named fields"""
+    parts = [_type_name(type(value))]
+    immutable = frozen
+    for name, field_value in fields:
+        part, field_immutable = _part(field_value)
+        parts.append(_field_name(name) + part)
+        immutable = immutable and field_immutable
+    return _container(tag, value, parts, immutable)
+
+
+def fingerprint(value: Any) -> bytes:
+    """
+    Compute a canonical fingerprint of a value
+
+    Equal values get equal fingerprints regardless of dictionary or set
+    order, in any process. Pydantic models and dataclasses are fingerprinted
+    by type and fields, and NumPy arrays by dtype, shape and data. Long
+    strings and immutable containers, such as frozen models, are only hashed
+    once while they stay in the memo.
+
+    Args:
+        value: Value to fingerprint
+
+    Returns:
+        16-byte blake2b digest
+    """
+    return _hash(_part(value)[0])
@@ -0,0 +1,143 @@
+import asyncio
+import pickle
+import threading
+from concurrent.futures import CancelledError, Future
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls that share a key into one execution.
+
+    The first caller for a key runs the function; callers arriving while it
+    runs wait for its outcome and get the same exception, or a copy of the
+    result. The result is pickled once if anyone is waiting, and each waiter
+    unpickles its own copy, so no two callers share a mutable value; results
+    that cannot be pickled are shared as they are. The shared outcome is a ``concurrent.futures.Future``, so threads block on it
+    and asyncio tasks await it without blocking their loop, and the two can
+    wait on each other. Cancelling a waiting task does not cancel the shared
+    call, and if the task running the call is cancelled, the waiters retry
+    and one of them runs it instead.
+    """
+
+    def __init__(self) -> None:
+        """
+        Initialize the group of in-flight calls
+        """
+        self._lock = threading.Lock()
+        self._calls: Dict[str, Future] = {}
+        self._waiters: Dict[str, int] = {}
+        self.coalesced = 0
+
+    def _join(self, key: str) -> Tuple[Future, bool]:
+        """Get the in-flight call for a key, and whether the caller must run it"""
+        with self._lock:
+            future = self._calls.get(key)
+            if future is not None:
+                self.coalesced += 1
+                self._waiters[key] += 1
+                return future, False
+            future = Future()
+            self._calls[key] = future
+            self._waiters[key] = 0
+            return future, True
+
+    def _leave(self, key: str, future: Future) -> int:
+        """Stop sharing a call, and get the number of callers waiting on it"""
+        with self._lock:
+            if self._calls.get(key) is not future:
+                return 0
+            del self._calls[key]
+            return self._waiters.pop(key)
+
+    @staticmethod
+    def _share(result: Any) -> Tuple[Optional[bytes], Any]:
+        """Pickle a result for the waiters, or keep it as is if it cannot be pickled"""
+        try:
+            return pickle.dumps(result, protocol=pickle.HIGHEST_PROTOCOL), None
+        except Exception:
+            return None, result
+
+    @staticmethod
+    def _copy(outcome: Tuple[Optional[bytes], Any]) -> Any:
+        """Get a waiter's own copy of a shared result"""
+        blob, result = outcome
+        return result if blob is None else pickle.loads(blob)
+
+    def _finish(self, key: str, future: Future, result: Any) -> None:
+        """Release the waiters of a call that succeeded"""
+        # No one can join once the call has left, so an unwaited result is never pickled
+        waiters = self._leave(key, future)
+        future.set_result(self._share(result) if waiters else (None, result))
+
+    def do(self, key: str, fn: Callable[..., Any], /, *args: Any, **kwargs: Any) -> Any:
+        """
+        Run a function once for all concurrent callers with the same key
+
+        Args:
+            key: Key identifying identical calls
+            fn: Function to run
+            *args: Positional arguments for the function
+            **kwargs: Keyword arguments for the function
+
+        Returns:
+            The result of the function
+        """
+        while True:
+            future, leader = self._join(key)
+            if leader:
+                break
+            try:
+                return self._copy(future.result())
+            except CancelledError:
+                continue
+
+        try:
+            result = fn(*args, **kwargs)
+        except BaseException as e:
+            self._leave(key, future)
+            future.set_exception(e)
+            raise
+        self._finish(key, future, result)
+        return result
+
+    async def do_async(
+        self, key: str, fn: Callable[..., Awaitable[Any]], /, *args: Any, **kwargs: Any
+    ) -> Any:
+        """
+        Await a coroutine function once for all concurrent callers with the same key
+
+        Args:
+            key: Key identifying identical calls
+            fn: Coroutine function to await
+            *args: Positional arguments for the function
+            **kwargs: Keyword arguments for the function
+
+        Returns:
+            The result of the coroutine
+        """
+        while True:
+            future, leader = self._join(key)
+            if leader:
+                break
+            try:
+                # Shielded so that cancelling this waiter leaves the shared call running
+                outcome = await asyncio.shield(asyncio.wrap_future(future))
+                return self._copy(outcome)
+            except asyncio.CancelledError:
+                if not future.cancelled():
+                    raise
+                continue
+
+        try:
+            result = await fn(*args, **kwargs)
+        except asyncio.CancelledError:
+            self._leave(key, future)
+            future.cancel()
+            raise
+        except BaseException as e:
+            self._leave(key, future)
+            future.set_exception(e)
+            raise
+        self._finish(key, future, result)
+        return result
@@ -0,0 +1,319 @@
+import logging
+import pickle
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from pmoai.utilities.sqlite_pool import get_connection_pool
+
+logger = logging.getLogger(__name__)
+
+MISSING = object()
+
+
+class TieredCache:
+    """
+    Two-tier cache: an in-process LRU in front of a single SQLite file.
+
+    Values are pickled once when stored, and both tiers keep the pickle, so
+    every hit returns a fresh copy that callers are free to mutate. A hit in
+    the memory tier costs a dictionary lookup and an unpickle. Misses fall
+    through to the disk tier, which is one indexed query; disk hits are
+    promoted to memory. Both tiers honour the time-to-live, and the disk tier
+    evicts the least recently used entries once it grows past its byte
+    budget.
+    """
+
+    def __init__(
+        self,
+        db_path: str,
+        ttl: Optional[float] = None,
+        max_memory_bytes: int = 64 * 1024 * 1024,
+        max_disk_bytes: int = 1024 * 1024 * 1024,
+    ):
+        """
+        Initialize the cache
+
+        Args:
+            db_path: Path of the SQLite file holding the disk tier
+            ttl: Time-to-live of entries in seconds, or None to keep them
+                until they are evicted
+            max_memory_bytes: Total pickled size of the values kept in memory
+            max_disk_bytes: Total pickled size of the values kept on disk
+        """
+        self.ttl = ttl
+        self.max_memory_bytes = max_memory_bytes
+        self.max_disk_bytes = max_disk_bytes
+
+        self._lru: "OrderedDict[str, Tuple[bytes, int, float]]" = OrderedDict()
+        self._memory_bytes = 0
+        self._lock = threading.RLock()
+        self._counters: Dict[str, int] = dict.fromkeys(
+            (
+                "memory_hits",
+                "disk_hits",
+                "misses",
+                "writes",
+                "bytes_read",
+                "bytes_written",
+                "memory_evictions",
+                "disk_evictions",
+                "expirations",
+            ),
+            0,
+        )
+
+        self._pool = get_connection_pool(db_path)
+        with self._pool.transaction() as conn:
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS tool_cache (
+                    key TEXT PRIMARY KEY,
+                    value BLOB NOT NULL,
+                    size INTEGER NOT NULL,
+                    expires_at REAL,
+                    accessed_at REAL NOT NULL
+                )
+                """
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS tool_cache_accessed ON tool_cache (accessed_at)"
+            )
+            self._disk_bytes = conn.execute(
+                "SELECT COALESCE(SUM(size), 0) FROM tool_cache"
+            ).fetchone()[0]
+
+    def _count(self, name: str, amount: int = 1) -> None:
+        self._counters[name] += amount
+
+    def _remember(self, key: str, blob: bytes, size: int, expires_at: float) -> None:
+        """Put a pickled value in the memory tier, evicting least recently used values"""
+        # Forgotten first so that a value too large to keep does not leave the old one behind
+        self._forget(key)
+        if size > self.max_memory_bytes:
+            return
+        self._lru[key] = (blob, size, expires_at)
+        self._memory_bytes += size
+        while self._memory_bytes > self.max_memory_bytes:
+            _, (_, evicted_size, _) = self._lru.popitem(last=False)
+            self._memory_bytes -= evicted_size
+            self._count("memory_evictions")
+
+    def _forget(self, key: str) -> None:
+        entry = self._lru.pop(key, None)
+        if entry is not None:
+            self._memory_bytes -= entry[1]
+
+    def get(self, key: str, default: Any = MISSING) -> Any:
+        """
+        Look up a value
+
+        Args:
+            key: Cache key
+            default: Value returned when the key is not cached
+
+        Returns:
+            The cached value, or default
+        """
+        now = time.time()
+        with self._lock:
+            entry = self._lru.get(key)
+            if entry is not None:
+                if entry[2] >= now:
+                    self._lru.move_to_end(key)
+                    self._count("memory_hits")
+                else:
+                    self._forget(key)
+                    entry = None
+        if entry is not None:
+            # Unpickled outside the lock, and on every hit so that callers never share a value
+            return pickle.loads(entry[0])
+
+        with self._pool.connection() as conn:
+            row = conn.execute(
+                "SELECT value, size, expires_at FROM tool_cache WHERE key = ?", (key,)
+            ).fetchone()
+        if row is None:
+            with self._lock:
+                self._count("misses")
+            return default
+
+        blob, size, expires_at = row
+        expires_at = float("inf") if expires_at is None else expires_at
+        if expires_at < now:
+            self.delete(key)
+            with self._lock:
+                self._count("expirations")
+                self._count("misses")
+            return default
+
+        try:
+            value = pickle.loads(blob)
+        except Exception as e:
+            logger.warning(f"Error loading cache entry {key}: {e}")
+            self.delete(key)
+            with self._lock:
+                self._count("misses")
+            return default
+
+        with self._pool.transaction() as conn:
+            conn.execute("UPDATE tool_cache SET accessed_at = ? WHERE key = ?", (now, key))
+        with self._lock:
+            self._remember(key, blob, size, expires_at)
+            self._count("disk_hits")
+            self._count("bytes_read", size)
+        return value
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> bool:
+        """
+        Store a value in both tiers
+
+        Args:
+            key: Cache key
+            value: Picklable value to store
+            ttl: Time-to-live in seconds, defaults to the cache's
+
+        Returns:
+            Whether the value could be stored
+        """
+        try:
+            blob = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        except Exception as e:
+            logger.warning(f"Error caching result for {key}: {e}")
+            return False
+
+        now = time.time()
+        ttl = self.ttl if ttl is None else ttl
+        expires_at = now + ttl if ttl is not None else None
+        size = len(blob)
+        with self._lock:
+            self._remember(key, blob, size, float("inf") if expires_at is None else expires_at)
+            self._count("writes")
+            self._count("bytes_written", size)
+            with self._pool.transaction() as conn:
+                # The replaced row no longer counts towards the disk budget
+                replaced = conn.execute(
+                    "SELECT size FROM tool_cache WHERE key = ?", (key,)
+                ).fetchone()
+                if replaced is not None:
+                    self._disk_bytes -= replaced[0]
+                if size > self.max_disk_bytes:
+                    # Too large to keep on disk, but the old value must not be read back
+                    conn.execute("DELETE FROM tool_cache WHERE key = ?", (key,))
+                    return True
+                conn.execute(
+                    """
+                    INSERT OR REPLACE INTO tool_cache (key, value, size, expires_at, accessed_at)
+                    VALUES (?, ?, ?, ?, ?)
+                    """,
+                    (key, blob, size, expires_at, now),
+                )
+            self._disk_bytes += size
+            if self._disk_bytes > self.max_disk_bytes:
+                self._evict_disk()
+        return True
+
+    def delete(self, key: str) -> None:
+        """
+        Remove a value from both tiers
+
+        Args:
+            key: Cache key
+        """
+        with self._lock, self._pool.transaction() as conn:
+            self._forget(key)
+            deleted = conn.execute(
+                "SELECT size FROM tool_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if deleted is not None:
+                conn.execute("DELETE FROM tool_cache WHERE key = ?", (key,))
+                self._disk_bytes -= deleted[0]
+
+    def _evict_disk(self) -> None:
+        """Drop expired entries, then least recently used ones, down to the byte budget"""
+        with self._pool.transaction() as conn:
+            expired = conn.execute(
+                "DELETE FROM tool_cache WHERE expires_at < ?", (time.time(),)
+            ).rowcount
+            self._count("expirations", expired)
+            # Other processes may share the file, so recount rather than trust the estimate
+            total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM tool_cache").fetchone()[0]
+            # Leave some headroom so that eviction does not run on every write
+            target = self.max_disk_bytes * 0.9
+            if total > target:
+                victims = []
+                for key, size in conn.execute(
+                    "SELECT key, size FROM tool_cache ORDER BY accessed_at"
+                ):
+                    victims.append((key,))
+                    total -= size
+                    if total <= target:
+                        break
+                conn.executemany("DELETE FROM tool_cache WHERE key = ?", victims)
+                self._count("disk_evictions", len(victims))
+            self._disk_bytes = total
+
+    def purge_expired(self) -> int:
+        """
+        Remove every expired entry
+
+        Returns:
+            Number of entries removed from disk
+        """
+        now = time.time()
+        with self._lock, self._pool.transaction() as conn:
+            for key in [k for k, (_, _, expires_at) in self._lru.items() if expires_at < now]:
+                self._forget(key)
+            removed = conn.execute(
+                "DELETE FROM tool_cache WHERE expires_at < ?", (now,)
+            ).rowcount
+            self._count("expirations", removed)
+            self._disk_bytes = conn.execute(
+                "SELECT COALESCE(SUM(size), 0) FROM tool_cache"
+            ).fetchone()[0]
+        return removed
+
+    def clear(self, prefix: Optional[str] = None) -> int:
+        """
+        Remove every entry, or every entry whose key starts with a prefix
+
+        Args:
+            prefix: Key prefix, or None to remove everything
+
+        Returns:
+            Number of entries removed from disk
+        """
+        with self._lock, self._pool.transaction() as conn:
+            if prefix is None:
+                self._lru.clear()
+                self._memory_bytes = 0
+                removed = conn.execute("DELETE FROM tool_cache").rowcount
+            else:
+                for key in [k for k in self._lru if k.startswith(prefix)]:
+                    self._forget(key)
+                # A range on the primary key instead of LIKE, which cannot use the index
+                removed = conn.execute(
+                    "DELETE FROM tool_cache WHERE key >= ? AND key < ?",
+                    (prefix, prefix + "\U0010ffff"),
+                ).rowcount
+            self._disk_bytes = conn.execute(
+                "SELECT COALESCE(SUM(size), 0) FROM tool_cache"
+            ).fetchone()[0]
+        return removed
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Get the cache counters
+
+        Returns:
+            Hits per tier, misses, writes, bytes read and written, evictions
+            and expirations, with the current size of both tiers
+        """
+        with self._lock:
+            return {
+                **self._counters,
+                "memory_entries": len(self._lru),
+                "memory_bytes": self._memory_bytes,
+                "disk_bytes": self._disk_bytes,
+            }
@@ -1,4 +1,6 @@
-from typing import Dict, List, Optional, Type
+from datetime import date
+from functools import lru_cache
+from typing import Dict, Iterator, List, Optional, TextIO, Tuple, Type
 
 from pydantic import BaseModel, Field
 
@@ -15,6 +17,8 @@ class GanttTask(BaseModel):
     progress: float = Field(description="The progress of the task in percentage (0-100).")
     dependencies: Optional[List[str]] = Field(default=None, description="The IDs of tasks that this task depends on.")
     assignee: Optional[str] = Field(default=None, description="The person assigned to the task.")
+    is_critical: bool = Field(default=False, description="Whether the task is on the critical path.")
+    wbs_code: Optional[str] = Field(default=None, description="The WBS code of the task (e.g., 1.2.3).")
 
 
 class GanttMilestone(BaseModel):
@@ -26,6 +30,30 @@ class GanttMilestone(BaseModel):
     description: Optional[str] = Field(default=None, description="A description of the milestone.")
 
 
+SCALES = ("day", "week", "month")
+
+
+@lru_cache(maxsize=65536)
+def _parse_date(value: str) -> date:
+    """Parse a ``YYYY-MM-DD`` date, caching the result."""
+    return date.fromisoformat(value)
+
+
+def _column(value: date, scale: str) -> int:
+    """Get the timeline column of a date at a time scale."""
+    if scale == "week":
+        # Ordinal 1 (0001-01-01) is a Monday
+        return (value.toordinal() - 1) // 7
+    if scale == "month":
+        return value.year * 12 + value.month - 1
+    return value.toordinal()
+
+
+def _bar(width: int) -> str:
+    """Draw a task bar spanning a number of columns."""
+    return "[" + "=" * (width - 2) + "]" if width > 1 else "="
+
+
 class GanttChartInput(BaseModel):
     """Input schema for GanttChartTool."""
     
@@ -34,6 +62,9 @@ class GanttChartInput(BaseModel):
     milestones: Optional[List[GanttMilestone]] = Field(default=None, description="The list of milestones for the Gantt chart.")
     start_date: str = Field(description="The start date of the project (YYYY-MM-DD).")
     end_date: str = Field(description="The end date of the project (YYYY-MM-DD).")
+    scale: str = Field(default="auto", description="The time scale of the bars: day, week, month or auto.")
+    critical_only: bool = Field(default=False, description="Whether to show only critical path tasks.")
+    max_wbs_level: Optional[int] = Field(default=None, description="The deepest WBS level to show (1 = top level).")
 
 
 class GanttChartTool(BaseTool):
@@ -42,6 +73,7 @@ class GanttChartTool(BaseTool):
     name: str = "Gantt Chart Generator"
     description: str = "Creates a text-based Gantt chart document based on provided information."
     args_schema: Type[BaseModel] = GanttChartInput
+    max_width: int = 120
     
     def _run(
         self,
@@ -50,6 +82,10 @@ class GanttChartTool(BaseTool):
         milestones: Optional[List[GanttMilestone]] = None,
         start_date: str = "",
         end_date: str = "",
+        scale: str = "auto",
+        critical_only: bool = False,
+        max_wbs_level: Optional[int] = None,
+        output: Optional[TextIO] = None,
     ) -> str:
         """Create a text-based Gantt chart document.
         
@@ -59,101 +95,187 @@ class GanttChartTool(BaseTool):
             milestones: The list of milestones for the Gantt chart.
             start_date: The start date of the project.
             end_date: The end date of the project.
+            scale: The time scale of the bars ("day", "week", "month", or
+                "auto" for the finest scale that fits in max_width columns).
+                At any scale the timeline is clipped to max_width columns.
+            critical_only: Whether to show only critical path tasks.
+            max_wbs_level: The deepest WBS level to show.
+            output: A file to write the chart to instead of returning it.
             
         Returns:
-            A formatted Gantt chart document.
+            A formatted Gantt chart document, or a confirmation if it was
+            written to output.
         """
-        from datetime import datetime, timedelta
+        lines = self.iter_lines(
+            project_name,
+            tasks,
+            milestones=milestones,
+            start_date=start_date,
+            end_date=end_date,
+            scale=scale,
+            critical_only=critical_only,
+            max_wbs_level=max_wbs_level,
+        )
+        if output is None:
+            return "\n".join(lines)
         
+        count = 0
+        for line in lines:
+            output.write(line)
+            output.write("\n")
+            count += 1
+        return f"Gantt chart for {project_name} written ({count} lines)."
+    
+    def iter_lines(
+        self,
+        project_name: str,
+        tasks: List[GanttTask],
+        milestones: Optional[List[GanttMilestone]] = None,
+        start_date: str = "",
+        end_date: str = "",
+        scale: str = "auto",
+        critical_only: bool = False,
+        max_wbs_level: Optional[int] = None,
+    ) -> Iterator[str]:
+        """Render a text-based Gantt chart line by line.
+        
+        Each date is parsed once, and nothing but the sorted tasks is held in
+        memory, so very large schedules can be streamed to a file.
+        
+        Args:
+            project_name: The name of the project.
+            tasks: The list of tasks for the Gantt chart.
+            milestones: The list of milestones for the Gantt chart.
+            start_date: The start date of the project. Defaults to the
+                earliest task start.
+            end_date: The end date of the project. Defaults to the latest
+                task end.
+            scale: The time scale of the bars ("day", "week", "month", or
+                "auto" for the finest scale that fits in max_width columns).
+                At any scale the timeline is clipped to max_width columns.
+            critical_only: Whether to show only critical path tasks.
+            max_wbs_level: The deepest WBS level to show.
+            
+        Yields:
+            The lines of the Gantt chart document.
+        """
         # Parse dates
-        project_start = datetime.strptime(start_date, "%Y-%m-%d")
-        project_end = datetime.strptime(end_date, "%Y-%m-%d")
+        task_dates: Dict[str, Tuple[date, date]] = {
+            task.id: (_parse_date(task.start_date), _parse_date(task.end_date)) for task in tasks
+        }
+        project_start = _parse_date(start_date) if start_date else min(
+            (start for start, _ in task_dates.values()), default=date.today()
+        )
+        project_end = _parse_date(end_date) if end_date else max(
+            (end for _, end in task_dates.values()), default=project_start
+        )
+        scale = self._resolve_scale(scale, project_start, project_end)
+        origin = _column(project_start, scale)
+        width = _column(project_end, scale) - origin + 1
+        clipped = width > self.max_width
+        width = min(width, self.max_width)
         
         # Calculate project duration in days
         project_duration = (project_end - project_start).days + 1
         
         # Create the header of the Gantt chart
-        gantt_chart = f"""
-# GANTT CHART
-
-## Project Name
-{project_name}
-
-## Project Duration
-{start_date} to {end_date} ({project_duration} days)
-
-## Tasks and Timeline
-
-"""
+        yield ""
+        yield "# GANTT CHART"
+        yield ""
+        yield "## Project Name"
+        yield project_name
+        yield ""
+        yield "## Project Duration"
+        yield f"{project_start.isoformat()} to {project_end.isoformat()} ({project_duration} days)"
+        yield ""
+        if scale != "day" or clipped:
+            yield "## Time Scale"
+            yield f"1 column = 1 {scale}"
+            if clipped:
+                yield f"Timeline clipped to the first {width} {scale}s"
+            yield ""
+        yield "## Tasks and Timeline"
+        yield ""
         
         # Create a dictionary to store task information
         task_dict: Dict[str, GanttTask] = {task.id: task for task in tasks}
         
-        # Sort tasks by start date
-        sorted_tasks = sorted(tasks, key=lambda x: datetime.strptime(x.start_date, "%Y-%m-%d"))
+        shown = [
+            task
+            for task in tasks
+            if (task.is_critical or not critical_only)
+            and (max_wbs_level is None or self._wbs_level(task) <= max_wbs_level)
+        ]
         
-        # Add each task to the Gantt chart
-        for task in sorted_tasks:
-            task_start = datetime.strptime(task.start_date, "%Y-%m-%d")
-            task_end = datetime.strptime(task.end_date, "%Y-%m-%d")
+        # Add each task to the Gantt chart, sorted by start date
+        for task in sorted(shown, key=lambda x: task_dates[x.id][0]):
+            task_start, task_end = task_dates[task.id]
             task_duration = (task_end - task_start).days + 1
             
-            # Calculate the position of the task in the timeline
-            start_offset = (task_start - project_start).days
-            
             # Create the task line
             task_line = f"{task.id}: {task.name} "
             if task.assignee:
                 task_line += f"[{task.assignee}] "
             task_line += f"({task.start_date} to {task.end_date}, {task_duration} days, {task.progress}% complete)"
+            yield task_line
             
             # Add dependencies if any
             if task.dependencies:
-                dependency_names = []
-                for dep_id in task.dependencies:
-                    if dep_id in task_dict:
-                        dependency_names.append(f"{dep_id}: {task_dict[dep_id].name}")
+                dependency_names = [
+                    f"{dep_id}: {task_dict[dep_id].name}"
+                    for dep_id in task.dependencies
+                    if dep_id in task_dict
+                ]
                 if dependency_names:
-                    task_line += f"\n   Dependencies: {', '.join(dependency_names)}"
+                    yield f"   Dependencies: {', '.join(dependency_names)}"
             
-            gantt_chart += f"{task_line}\n"
-            
-            # Create the Gantt bar
-            gantt_bar = " " * start_offset
-            gantt_bar += "[" + "=" * (task_duration - 2) + "]"
-            
-            gantt_chart += f"   {gantt_bar}\n\n"
+            # Create the Gantt bar, clipped to the project timeline
+            first = max(_column(task_start, scale) - origin, 0)
+            last = min(_column(task_end, scale) - origin, width - 1)
+            yield "   " + " " * first + _bar(last - first + 1) if last >= first else "   "
+            yield ""
         
         # Add milestones if any
         if milestones:
-            gantt_chart += "## Milestones\n\n"
+            yield "## Milestones"
+            yield ""
             
             # Sort milestones by date
-            sorted_milestones = sorted(milestones, key=lambda x: datetime.strptime(x.date, "%Y-%m-%d"))
-            
-            for milestone in sorted_milestones:
-                milestone_date = datetime.strptime(milestone.date, "%Y-%m-%d")
-                
+            for milestone in sorted(milestones, key=lambda x: _parse_date(x.date)):
                 # Calculate the position of the milestone in the timeline
-                milestone_offset = (milestone_date - project_start).days
+                milestone_offset = _column(_parse_date(milestone.date), scale) - origin
                 
                 # Create the milestone line
                 milestone_line = f"{milestone.id}: {milestone.name} ({milestone.date})"
                 if milestone.description:
                     milestone_line += f" - {milestone.description}"
+                yield milestone_line
                 
-                gantt_chart += f"{milestone_line}\n"
-                
-                # Create the milestone marker
-                milestone_marker = " " * milestone_offset + "◆"
-                
-                gantt_chart += f"   {milestone_marker}\n\n"
+                # Create the milestone marker, unless it is past the clipped timeline
+                if milestone_offset < width:
+                    yield "   " + " " * max(milestone_offset, 0) + "◆"
+                else:
+                    yield "   "
+                yield ""
         
         # Add a legend
-        gantt_chart += """
-## Legend
-- [====] : Task duration
-- ◆ : Milestone
-"""
-        
-        return gantt_chart
+        yield ""
+        yield "## Legend"
+        yield "- [====] : Task duration"
+        yield "- ◆ : Milestone"
+    
+    def _resolve_scale(self, scale: str, start: date, end: date) -> str:
+        """Get the time scale to draw with, choosing one if scale is "auto"."""
+        if scale in SCALES:
+            return scale
+        if scale != "auto":
+            raise ValueError(f"Unknown scale '{scale}'; expected one of {', '.join(SCALES)} or auto")
+        for candidate in SCALES:
+            if _column(end, candidate) - _column(start, candidate) + 1 <= self.max_width:
+                return candidate
+        return SCALES[-1]
+    
+    @staticmethod
+    def _wbs_level(task: GanttTask) -> int:
+        """Get the WBS level of a task, counting tasks without a code as top level."""
+        return task.wbs_code.count(".") + 1 if task.wbs_code else 1
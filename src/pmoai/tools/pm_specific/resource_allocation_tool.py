@@ -1,4 +1,4 @@
-from typing import Dict, List, Type
+from typing import List, Type
 
 from pydantic import BaseModel, Field
 
@@ -54,6 +54,7 @@ class ResourceAllocationTool(BaseTool):
     name: str = "Resource Allocation Generator"
     description: str = "Creates a comprehensive resource allocation document based on provided information."
     args_schema: Type[BaseModel] = ResourceAllocationInput
+    hours_per_day: float = 8.0
     
     def _run(
         self,
@@ -133,25 +134,45 @@ class ResourceAllocationTool(BaseTool):
         allocation_doc += """
 ## Resource Utilization Summary
 
-| Resource | Total Allocated Hours | Total Available Hours | Utilization % |
-|----------|----------------------|----------------------|--------------|
+| Resource | Total Allocated Hours | Total Available Hours | Utilization % | Peak Allocation % | Overallocated Days |
+|----------|----------------------|----------------------|--------------|------------------|-------------------|
 """
         
-        # Calculate resource utilization
-        resource_hours: Dict[str, float] = {r.id: 0 for r in resources}
-        for allocation in allocations:
-            if allocation.task_id in task_lookup and allocation.resource_id in resource_lookup:
-                task = task_lookup[allocation.task_id]
-                resource_hours[allocation.resource_id] += (allocation.allocation_percentage / 100) * task.duration
+        # Calculate resource utilization day by day over the allocation dates
+        from pmoai.utilities.resource_utilization import UtilizationEngine
+        
+        utilization = UtilizationEngine(resources, allocations, type_field="role").analyze(
+            period="week"
+        )
         
         # Add resource utilization summary
-        for resource_id, hours in resource_hours.items():
-            if resource_id in resource_lookup:
-                resource = resource_lookup[resource_id]
-                # Assuming 40-hour work week and 100% availability means 40 hours
-                available_hours = (resource.availability / 100) * 40
-                utilization_percentage = (hours / available_hours) * 100 if available_hours > 0 else 0
-                allocation_doc += f"| {resource.name} | {hours:.2f} | {available_hours:.2f} | {utilization_percentage:.2f}% |\n"
+        for usage in utilization.resources:
+            resource = resource_lookup[usage.resource_id]
+            allocated_hours = usage.allocated_days * self.hours_per_day
+            available_hours = usage.available_days * self.hours_per_day
+            allocation_doc += f"| {resource.name} | {allocated_hours:.2f} | {available_hours:.2f} | {usage.utilization_percentage:.2f}% | {usage.peak_allocation_percentage:.2f}% | {usage.overallocated_days} |\n"
+        
+        # Add utilization by role
+        allocation_doc += """
+## Utilization by Role
+
+| Role | Utilization % |
+|------|--------------|
+"""
+        
+        for role, percentage in utilization.by_type.items():
+            allocation_doc += f"| {role} | {percentage:.2f}% |\n"
+        
+        # Add utilization by week
+        allocation_doc += """
+## Utilization by Week
+
+| Week Starting | Allocated Hours | Available Hours | Utilization % |
+|---------------|----------------|----------------|--------------|
+"""
+        
+        for week in utilization.by_period:
+            allocation_doc += f"| {week.start_date} | {week.allocated_days * self.hours_per_day:.2f} | {week.available_days * self.hours_per_day:.2f} | {week.utilization_percentage:.2f}% |\n"
         
         return allocation_doc
     
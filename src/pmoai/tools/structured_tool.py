@@ -1,8 +1,10 @@
 from __future__ import annotations
 
+import asyncio
+import concurrent.futures
 import inspect
 import textwrap
-from typing import Any, Callable, Optional, Union, get_type_hints
+from typing import Any, Awaitable, Callable, Optional, Union, get_type_hints
 
 from pydantic import BaseModel, Field, create_model
 
@@ -23,6 +25,7 @@ class CrewStructuredTool:
         args_schema: type[BaseModel],
         func: Callable[..., Any],
         result_as_answer: bool = False,
+        afunc: Optional[Callable[..., Awaitable[Any]]] = None,
     ) -> None:
         """Initialize the structured tool.
 
@@ -32,11 +35,14 @@ class CrewStructuredTool:
             args_schema: The pydantic model for the tool's arguments
             func: The function to run when the tool is called
             result_as_answer: Whether to return the output directly
+            afunc: Optional coroutine function to await when the tool is
+                called asynchronously. Defaults to func.
         """
         self.name = name
         self.description = description
         self.args_schema = args_schema
         self.func = func
+        self.afunc = afunc
         self._logger = Logger()
         self.result_as_answer = result_as_answer
 
@@ -211,15 +217,16 @@ class CrewStructuredTool:
         """
         parsed_args = self._parse_args(input)
 
+        if self.afunc is not None:
+            return await self.afunc(**parsed_args, **kwargs)
         if inspect.iscoroutinefunction(self.func):
             return await self.func(**parsed_args, **kwargs)
-        else:
-            # Run sync functions in a thread pool
-            import asyncio
 
-            return await asyncio.get_event_loop().run_in_executor(
-                None, lambda: self.func(**parsed_args, **kwargs)
-            )
+        # Run sync functions in a thread pool
+        result = await asyncio.to_thread(self.func, **parsed_args, **kwargs)
+        if inspect.iscoroutine(result):
+            return await result
+        return result
 
     def _run(self, *args, **kwargs) -> Any:
         """Legacy method for compatibility."""
@@ -228,12 +235,29 @@ class CrewStructuredTool:
         input_dict.update(kwargs)
         return self.invoke(input_dict)
 
+    async def _arun(self, *args, **kwargs) -> Any:
+        """Legacy asynchronous method for compatibility."""
+        input_dict = dict(zip(self.args_schema.model_fields.keys(), args))
+        input_dict.update(kwargs)
+        return await self.ainvoke(input_dict)
+
     def invoke(
         self, input: Union[str, dict], config: Optional[dict] = None, **kwargs: Any
     ) -> Any:
         """Main method for tool execution."""
         parsed_args = self._parse_args(input)
-        return self.func(**parsed_args, **kwargs)
+        result = self.func(**parsed_args, **kwargs)
+        if not inspect.iscoroutine(result):
+            return result
+
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return asyncio.run(result)
+
+        # Called from inside an event loop, so run on a separate one
+        with concurrent.futures.ThreadPoolExecutor(max_workers=1) as pool:
+            return pool.submit(asyncio.run, result).result()
 
     @property
     def args(self) -> dict:
@@ -1,3 +1,4 @@
+import asyncio
 import json
 import logging
 import re
@@ -56,6 +57,39 @@ class ToolUsage:
         
         return clean_response, tool_calls
 
+    @staticmethod
+    def _find_tool(
+        tool_name: Optional[str],
+        tools: List[BaseTool],
+    ) -> Union[BaseTool, ToolResult]:
+        """
+        Find the tool a call refers to.
+
+        Args:
+            tool_name: Name of the called tool
+            tools: List of available tools
+
+        Returns:
+            The matching tool, or an error result if there is none
+        """
+        for tool in tools:
+            if tool.name == tool_name:
+                return tool
+
+        logger.warning(f"Tool not found: {tool_name}")
+        return ToolResult(
+            result=f"Error: Tool '{tool_name}' not found. Available tools: {', '.join(t.name for t in tools)}",
+            result_as_answer=False,
+        )
+
+    @staticmethod
+    def _error_result(tool_name: Optional[str], error: Exception) -> ToolResult:
+        logger.error(f"Error executing tool {tool_name}: {error}")
+        return ToolResult(
+            result=f"Error executing tool '{tool_name}': {str(error)}",
+            result_as_answer=False,
+        )
+
     @staticmethod
     def execute_tool_calls(
         tool_calls: List[Dict[str, Any]],
@@ -78,20 +112,11 @@ class ToolUsage:
             arguments = call.get("arguments", {})
             
             # Find the matching tool
-            matching_tools = [t for t in tools if t.name == tool_name]
-            
-            if not matching_tools:
-                logger.warning(f"Tool not found: {tool_name}")
-                results.append(
-                    ToolResult(
-                        result=f"Error: Tool '{tool_name}' not found. Available tools: {', '.join(t.name for t in tools)}",
-                        result_as_answer=False,
-                    )
-                )
+            tool = ToolUsage._find_tool(tool_name, tools)
+            if isinstance(tool, ToolResult):
+                results.append(tool)
                 continue
             
-            tool = matching_tools[0]
-            
             try:
                 # Execute the tool
                 result = tool.run(**arguments)
@@ -102,16 +127,46 @@ class ToolUsage:
                     )
                 )
             except Exception as e:
-                logger.error(f"Error executing tool {tool_name}: {e}")
-                results.append(
-                    ToolResult(
-                        result=f"Error executing tool '{tool_name}': {str(e)}",
-                        result_as_answer=False,
-                    )
-                )
+                results.append(ToolUsage._error_result(tool_name, e))
         
         return results
 
+    @staticmethod
+    async def aexecute_tool_calls(
+        tool_calls: List[Dict[str, Any]],
+        tools: List[BaseTool],
+    ) -> List[ToolResult]:
+        """
+        Execute a list of tool calls concurrently on the running event loop.
+
+        Each tool is awaited through its arun method, so async tools share
+        the caller's loop and sync tools run in the default thread pool.
+
+        Args:
+            tool_calls: List of tool call dictionaries
+            tools: List of available tools
+
+        Returns:
+            List of tool results, in the order of the calls
+        """
+
+        async def execute(call: Dict[str, Any]) -> ToolResult:
+            tool_name = call.get("tool_name")
+            tool = ToolUsage._find_tool(tool_name, tools)
+            if isinstance(tool, ToolResult):
+                return tool
+
+            try:
+                result = await tool.arun(**call.get("arguments", {}))
+            except Exception as e:
+                return ToolUsage._error_result(tool_name, e)
+            return ToolResult(
+                result=str(result),
+                result_as_answer=tool.result_as_answer,
+            )
+
+        return list(await asyncio.gather(*(execute(call) for call in tool_calls)))
+
     @staticmethod
     def format_tool_results(
         results: List[ToolResult],
@@ -9,6 +9,11 @@ from pmoai.utilities.paths import (
     logs_path,
 )
 from pmoai.utilities.printer import Printer
+from pmoai.utilities.sqlite_pool import (
+    SQLiteConnectionPool,
+    close_connection_pools,
+    get_connection_pool,
+)
 
 
 class I18N:
@@ -75,8 +80,11 @@ __all__ = [
     "I18N",
     "Logger",
     "Printer",
+    "SQLiteConnectionPool",
     "cache_storage_path",
+    "close_connection_pools",
     "db_storage_path",
+    "get_connection_pool",
     "get_pmoai_home",
     "logs_path",
 ]
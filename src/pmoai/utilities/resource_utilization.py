@@ -0,0 +1,257 @@
+"""
+Time-bucketed resource utilization.
+"""
+
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from pydantic import BaseModel, Field
+
+# Tolerance when comparing summed allocation percentages with availability
+_EPSILON = 1e-6
+
+PERIODS = ("day", "week", "month")
+
+
+class ResourceUtilization(BaseModel):
+    """Represents the utilization of one resource over the analyzed period."""
+
+    resource_id: str = Field(description="The resource identifier.")
+    resource_type: Optional[str] = Field(None, description="The type or role of the resource.")
+    allocated_days: float = Field(description="The allocated person-days.")
+    available_days: float = Field(description="The available person-days.")
+    utilization_percentage: float = Field(description="The allocated share of the available days (0-100+).")
+    peak_allocation_percentage: float = Field(description="The highest total allocation on any day (0-100+).")
+    overallocated_days: int = Field(description="The number of days allocated beyond availability.")
+
+
+class PeriodUtilization(BaseModel):
+    """Represents the utilization of all resources in one period."""
+
+    start_date: str = Field(description="The first day of the period.")
+    end_date: str = Field(description="The last day of the period.")
+    allocated_days: float = Field(description="The allocated person-days.")
+    available_days: float = Field(description="The available person-days.")
+    utilization_percentage: float = Field(description="The allocated share of the available days (0-100+).")
+
+
+class ResourceUtilizationResult(BaseModel):
+    """Represents the outcome of a resource utilization analysis."""
+
+    start_date: Optional[str] = Field(None, description="The first day analyzed.")
+    end_date: Optional[str] = Field(None, description="The last day analyzed.")
+    utilization_percentage: float = Field(description="The overall utilization percentage.")
+    resources: List[ResourceUtilization] = Field(default_factory=list, description="The utilization of each resource.")
+    by_type: Dict[str, float] = Field(default_factory=dict, description="The utilization percentage of each resource type.")
+    by_period: List[PeriodUtilization] = Field(default_factory=list, description="The utilization of each period.")
+    overallocated: List[str] = Field(default_factory=list, description="The resources allocated beyond availability on any day.")
+    underallocated: List[str] = Field(default_factory=list, description="The resources utilized below the threshold.")
+
+
+def _days(dates: Sequence[Optional[str]]) -> np.ndarray:
+    """Parse ``YYYY-MM-DD`` dates into day numbers, with missing dates as NaT."""
+    return np.array(dates, dtype="datetime64[D]")
+
+
+def _percentage(part: np.ndarray, whole: np.ndarray) -> np.ndarray:
+    """Divide elementwise as a percentage, giving 0 where the whole is 0."""
+    part, whole = np.asarray(part, dtype=np.float64), np.asarray(whole, dtype=np.float64)
+    out = np.zeros(np.broadcast(part, whole).shape)
+    np.divide(part * 100.0, whole, out=out, where=whole > 0)
+    return out
+
+
+class UtilizationEngine:
+    """Dense resource by day allocation matrix.
+
+    Every allocation adds its percentage to a difference array at its start
+    and subtracts it on the day after its end, so the whole matrix is built
+    with one ``bincount`` and one cumulative sum, whatever the number of
+    allocations. Availability is the resource's percentage on the days inside
+    its availability window. Totals by resource, type and period are then
+    reductions over the matrix.
+
+    Resources and allocations are read by attribute, so both the planning
+    models and the tool models can be used.
+    """
+
+    def __init__(
+        self,
+        resources: Sequence[Any],
+        allocations: Sequence[Any],
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None,
+        type_field: str = "type",
+    ):
+        """Build the matrices.
+
+        Args:
+            resources: The resources, with ``id`` and ``availability`` and
+                optionally ``start_date`` and ``end_date``.
+            allocations: The allocations, with ``resource_id``,
+                ``allocation_percentage``, ``start_date`` and ``end_date``.
+                Allocations of unknown resources are ignored.
+            start_date: The first day to analyze. Defaults to the earliest
+                allocation start.
+            end_date: The last day to analyze. Defaults to the latest
+                allocation end.
+            type_field: The resource attribute to group resources by.
+        """
+        self.resource_ids = [resource.id for resource in resources]
+        self.index = {resource_id: i for i, resource_id in enumerate(self.resource_ids)}
+        self.resource_types = [getattr(resource, type_field, None) for resource in resources]
+        self.availability = np.array([r.availability for r in resources], dtype=np.float64)
+
+        known = [a for a in allocations if a.resource_id in self.index]
+        rows = np.array([self.index[a.resource_id] for a in known], dtype=np.int64)
+        starts = _days([a.start_date for a in known]).astype(np.int64)
+        ends = _days([a.end_date for a in known]).astype(np.int64)
+        percentages = np.array([a.allocation_percentage for a in known], dtype=np.float64)
+
+        first = _days([start_date])[0].astype(np.int64) if start_date else (starts.min() if len(known) else 0)
+        last = _days([end_date])[0].astype(np.int64) if end_date else (ends.max() if len(known) else -1)
+        self.origin = int(first)
+        horizon = max(int(last) - self.origin + 1, 0)
+
+        # Clip to the analyzed days, dropping what falls entirely outside
+        starts = np.clip(starts - self.origin, 0, None)
+        ends = np.clip(ends - self.origin, None, horizon - 1)
+        inside = starts <= ends
+        rows, starts, ends, percentages = rows[inside], starts[inside], ends[inside], percentages[inside]
+
+        width = horizon + 1
+        changes = np.bincount(
+            np.concatenate((rows * width + starts, rows * width + ends + 1)),
+            weights=np.concatenate((percentages, -percentages)),
+            minlength=len(self.resource_ids) * width,
+        ).reshape(len(self.resource_ids), width)
+        self.load = np.cumsum(changes[:, :horizon], axis=1)
+
+        days = np.arange(self.origin, self.origin + horizon, dtype=np.int64)
+        self.days = days
+        available_from = _days([getattr(r, "start_date", None) for r in resources])
+        available_to = _days([getattr(r, "end_date", None) for r in resources])
+        no_limit = np.iinfo(np.int64)
+        available_from = np.where(
+            np.isnat(available_from), no_limit.min, available_from.astype(np.int64)
+        )
+        available_to = np.where(
+            np.isnat(available_to), no_limit.max, available_to.astype(np.int64)
+        )
+        window = (days >= available_from[:, None]) & (days <= available_to[:, None])
+        self.capacity = np.where(window, self.availability[:, None], 0.0)
+
+    @property
+    def horizon(self) -> int:
+        """The number of days analyzed."""
+        return len(self.days)
+
+    def buckets(self, period: str = "week") -> Tuple[np.ndarray, np.ndarray]:
+        """Get the first and last day column of every period.
+
+        Weeks start on Monday and months on the first. The first and last
+        periods are cut to the analyzed days.
+
+        Args:
+            period: One of ``"day"``, ``"week"`` and ``"month"``.
+
+        Returns:
+            The first and last column of each period.
+        """
+        if period not in PERIODS:
+            raise ValueError(f"Unknown period '{period}'; expected one of {', '.join(PERIODS)}")
+        if period == "day":
+            keys = self.days
+        elif period == "week":
+            # Day 0 (1970-01-01) is a Thursday
+            keys = (self.days + 3) // 7
+        else:
+            keys = self.days.astype("datetime64[D]").astype("datetime64[M]").astype(np.int64)
+        firsts = np.concatenate(([0], np.flatnonzero(np.diff(keys)) + 1)) if self.horizon else np.empty(0, dtype=np.int64)
+        lasts = np.append(firsts[1:] - 1, self.horizon - 1) if self.horizon else firsts
+        return firsts, lasts
+
+    def by_period(self, period: str = "week") -> Tuple[np.ndarray, np.ndarray]:
+        """Get the allocated and available person-days of every resource in every period.
+
+        Args:
+            period: One of ``"day"``, ``"week"`` and ``"month"``.
+
+        Returns:
+            The allocated and available person-days, as resource by period
+            arrays.
+        """
+        firsts, _ = self.buckets(period)
+        if not len(firsts):
+            empty = np.zeros((len(self.resource_ids), 0))
+            return empty, empty
+        return (
+            np.add.reduceat(self.load, firsts, axis=1) / 100.0,
+            np.add.reduceat(self.capacity, firsts, axis=1) / 100.0,
+        )
+
+    def analyze(
+        self, period: str = "week", underallocation_threshold: float = 50.0
+    ) -> ResourceUtilizationResult:
+        """Summarize utilization by resource, type and period.
+
+        Args:
+            period: The period to bucket utilization over time by.
+            underallocation_threshold: The utilization percentage below which
+                a resource counts as underallocated.
+
+        Returns:
+            The utilization analysis.
+        """
+        allocated = self.load.sum(axis=1) / 100.0
+        available = self.capacity.sum(axis=1) / 100.0
+        utilization = _percentage(allocated, available)
+        peak = self.load.max(axis=1) if self.horizon else np.zeros(len(self.resource_ids))
+        over_days = (self.load > self.capacity + _EPSILON).sum(axis=1)
+
+        types = [t if t is not None else "unspecified" for t in self.resource_types]
+        names, codes = np.unique(np.array(types, dtype=object).astype(str), return_inverse=True)
+        type_utilization = _percentage(
+            np.bincount(codes, weights=allocated, minlength=len(names)),
+            np.bincount(codes, weights=available, minlength=len(names)),
+        )
+
+        firsts, lasts = self.buckets(period)
+        period_allocated, period_available = self.by_period(period)
+        period_allocated, period_available = period_allocated.sum(axis=0), period_available.sum(axis=0)
+        period_utilization = _percentage(period_allocated, period_available)
+        labels = (self.days[np.concatenate((firsts, lasts))]).astype("datetime64[D]").astype(str)
+
+        return ResourceUtilizationResult(
+            start_date=labels[0] if len(firsts) else None,
+            end_date=labels[-1] if len(firsts) else None,
+            utilization_percentage=float(_percentage(allocated.sum(), available.sum())),
+            resources=[
+                ResourceUtilization(
+                    resource_id=resource_id,
+                    resource_type=self.resource_types[i],
+                    allocated_days=float(allocated[i]),
+                    available_days=float(available[i]),
+                    utilization_percentage=float(utilization[i]),
+                    peak_allocation_percentage=float(peak[i]),
+                    overallocated_days=int(over_days[i]),
+                )
+                for i, resource_id in enumerate(self.resource_ids)
+            ],
+            by_type=dict(zip(names.tolist(), type_utilization.tolist())),
+            by_period=[
+                PeriodUtilization(
+                    start_date=labels[k],
+                    end_date=labels[len(firsts) + k],
+                    allocated_days=float(period_allocated[k]),
+                    available_days=float(period_available[k]),
+                    utilization_percentage=float(period_utilization[k]),
+                )
+                for k in range(len(firsts))
+            ],
+            overallocated=[self.resource_ids[i] for i in np.flatnonzero(over_days)],
+            underallocated=[
+                self.resource_ids[i]
+                for i in np.flatnonzero((utilization < underallocation_threshold) & (available > 0))
+            ],
+        )
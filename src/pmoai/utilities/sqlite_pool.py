@@ -0,0 +1,221 @@
+"""Shared SQLite connection pool for PMOAI storages."""
+
+import atexit
+import os
+import queue
+import sqlite3
+import threading
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional
+
+DEFAULT_BUSY_TIMEOUT = 5.0
+DEFAULT_MAX_IDLE_CONNECTIONS = 8
+DEFAULT_CACHED_STATEMENTS = 256
+
+
+class SQLiteConnectionPool:
+    """A thread-aware pool of SQLite connections for a single database file.
+
+    Connections are opened once, switched to WAL journaling and reused across
+    calls, so the per-connection statement cache of the ``sqlite3`` module
+    acts as a prepared-statement cache. A thread that is already holding a
+    connection gets the same connection back on nested calls, which keeps
+    transactions consistent when a storage method calls another one.
+    """
+
+    def __init__(
+        self,
+        db_path: str,
+        busy_timeout: float = DEFAULT_BUSY_TIMEOUT,
+        max_idle_connections: int = DEFAULT_MAX_IDLE_CONNECTIONS,
+        cached_statements: int = DEFAULT_CACHED_STATEMENTS,
+    ):
+        """Initialize the pool.
+
+        Args:
+            db_path: The path to the SQLite database file.
+            busy_timeout: Seconds to wait on a locked database before failing.
+            max_idle_connections: Maximum number of idle connections kept open.
+            cached_statements: Size of the prepared statement cache per connection.
+        """
+        self.db_path = db_path
+        self.busy_timeout = busy_timeout
+        self.max_idle_connections = max_idle_connections
+        self.cached_statements = cached_statements
+
+        self._idle: "queue.LifoQueue[sqlite3.Connection]" = queue.LifoQueue()
+        self._all: List[sqlite3.Connection] = []
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._closed = False
+
+        # Every plain ":memory:" connection is a separate database, so pooled
+        # in-memory databases go through a named shared-cache URI instead.
+        self._uri = db_path.startswith("file:")
+        self._target = db_path
+        self._keeper: Optional[sqlite3.Connection] = None
+        if db_path == ":memory:":
+            self._uri = True
+            self._target = f"file:pmoai-pool-{id(self)}?mode=memory&cache=shared"
+            self._keeper = self._open()
+
+    def _open(self) -> sqlite3.Connection:
+        """Open and configure a new connection."""
+        conn = sqlite3.connect(
+            self._target,
+            timeout=self.busy_timeout,
+            check_same_thread=False,
+            cached_statements=self.cached_statements,
+            uri=self._uri,
+        )
+        conn.execute(f"PRAGMA busy_timeout = {int(self.busy_timeout * 1000)}")
+        conn.execute("PRAGMA journal_mode = WAL")
+        conn.execute("PRAGMA synchronous = NORMAL")
+        conn.execute("PRAGMA foreign_keys = ON")
+        with self._lock:
+            self._all.append(conn)
+        return conn
+
+    def _acquire(self) -> sqlite3.Connection:
+        if self._closed:
+            raise sqlite3.ProgrammingError(
+                f"Connection pool for {self.db_path} is closed"
+            )
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            return self._open()
+
+    def _release(self, conn: sqlite3.Connection) -> None:
+        if conn.in_transaction:
+            conn.rollback()
+        if not self._closed and self._idle.qsize() < self.max_idle_connections:
+            self._idle.put(conn)
+            return
+        with self._lock:
+            if conn in self._all:
+                self._all.remove(conn)
+        conn.close()
+
+    @contextmanager
+    def connection(self) -> Iterator[sqlite3.Connection]:
+        """Borrow a connection for the current thread.
+
+        Nested calls on the same thread reuse the outer connection. Writes
+        should go through :meth:`transaction`, since anything left uncommitted
+        is rolled back when the connection returns to the pool.
+
+        Yields:
+            A configured SQLite connection.
+        """
+        held: Optional[sqlite3.Connection] = getattr(self._local, "conn", None)
+        if held is not None:
+            yield held
+            return
+
+        conn = self._acquire()
+        self._local.conn = conn
+        try:
+            yield conn
+        finally:
+            self._local.conn = None
+            self._release(conn)
+
+    @contextmanager
+    def transaction(self) -> Iterator[sqlite3.Connection]:
+        """Borrow a connection and run the block in a single transaction.
+
+        The transaction is committed when the block exits normally and rolled
+        back if it raises. Nested transactions join the outermost one.
+
+        Yields:
+            A configured SQLite connection with an open transaction.
+        """
+        with self.connection() as conn:
+            if conn.in_transaction:
+                yield conn
+                return
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield conn
+            except BaseException:
+                conn.rollback()
+                raise
+            else:
+                conn.commit()
+
+    def close(self) -> None:
+        """Close every connection owned by the pool."""
+        self._closed = True
+        with self._lock:
+            connections, self._all = self._all, []
+        while True:
+            try:
+                self._idle.get_nowait()
+            except queue.Empty:
+                break
+        for conn in connections:
+            try:
+                conn.close()
+            except sqlite3.Error:
+                pass
+
+
+_pools: Dict[str, SQLiteConnectionPool] = {}
+_pools_lock = threading.Lock()
+
+
+def _pool_key(db_path: str) -> Optional[str]:
+    if db_path == ":memory:":
+        return None
+    if db_path.startswith("file:"):
+        return db_path
+    return os.path.realpath(db_path)
+
+
+def get_connection_pool(
+    db_path: str, busy_timeout: Optional[float] = None
+) -> SQLiteConnectionPool:
+    """Get the shared connection pool for a database file.
+
+    Storages pointing at the same file share one pool, so a crew with several
+    memories on the same database keeps a single set of connections.
+
+    Args:
+        db_path: The path to the SQLite database file.
+        busy_timeout: Seconds to wait on a locked database. Only applied when
+            the pool is created.
+
+    Returns:
+        The connection pool for the database.
+    """
+    key = _pool_key(db_path)
+    if key is None:
+        # In-memory databases are private to the storage that asked for them.
+        return SQLiteConnectionPool(
+            db_path,
+            busy_timeout=DEFAULT_BUSY_TIMEOUT if busy_timeout is None else busy_timeout,
+        )
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None or pool._closed:
+            pool = SQLiteConnectionPool(
+                db_path,
+                busy_timeout=(
+                    DEFAULT_BUSY_TIMEOUT if busy_timeout is None else busy_timeout
+                ),
+            )
+            _pools[key] = pool
+        return pool
+
+
+def close_connection_pools() -> None:
+    """Close all shared connection pools."""
+    with _pools_lock:
+        pools = list(_pools.values())
+        _pools.clear()
+    for pool in pools:
+        pool.close()
+
+
+atexit.register(close_connection_pools)
@@ -0,0 +1,314 @@
+import asyncio
+import os
+import tempfile
+import threading
+import time
+import unittest
+from typing import List
+
+from pydantic import BaseModel, Field
+
+from pmoai.flow.flow import Flow, and_, listen, router, start
+from pmoai.flow.persistence import AsyncSQLiteFlowPersistence, SQLiteFlowPersistence, persist
+from pmoai.flow.persistence.sqlite import _buffered_persistences, _flush_buffered_persistences
+from pmoai.utilities.sqlite_pool import get_connection_pool
+
+
+class ReviewState(BaseModel):
+    id: str = "review-1"
+    log: List[str] = Field(default_factory=list)
+    threshold: int = 0
+
+
+class ReviewFlow(Flow[ReviewState]):
+    @start()
+    def collect(self):
+        self.state.log.append("collect")
+        return 1
+
+    @listen("collect")
+    def schedule_review(self, result):
+        time.sleep(0.2)
+        self.state.log.append("schedule")
+        return result + 1
+
+    @listen("collect")
+    async def budget_review(self, result):
+        await asyncio.sleep(0.2)
+        self.state.log.append("budget")
+        return result + 2
+
+    @and_()
+    @listen("schedule_review")
+    @listen("budget_review")
+    def consolidate(self):
+        self.state.log.append("consolidate")
+        return len(self.state.log)
+
+    @router()
+    @listen("consolidate")
+    def escalate(self, count):
+        return "escalated" if count > self.state.threshold else "closed"
+
+    @listen("escalated")
+    def notify_sponsor(self):
+        self.state.log.append("escalated")
+        return "sponsor notified"
+
+    @listen("closed")
+    def archive(self):
+        self.state.log.append("closed")
+        return "archived"
+
+
+class TestFlowExecution(unittest.TestCase):
+    def test_independent_listeners_run_concurrently(self):
+        """Test that listeners of the same method overlap and AND joins wait for both."""
+        flow = ReviewFlow(state=ReviewState())
+
+        started = time.perf_counter()
+        result = flow.kickoff()
+        elapsed = time.perf_counter() - started
+
+        self.assertEqual(result, "sponsor notified")
+        self.assertLess(elapsed, 0.35)
+        self.assertEqual(flow.state.log[-2:], ["consolidate", "escalated"])
+        self.assertEqual(flow.state.log.count("consolidate"), 1)
+        self.assertEqual(len(flow.method_timings["schedule_review"]), 1)
+        self.assertGreaterEqual(flow.method_timings["schedule_review"][0], 0.2)
+
+    def test_router_follows_returned_label(self):
+        """Test that kickoff inputs reach the state and the router picks the path."""
+        flow = ReviewFlow(state=ReviewState())
+
+        result = asyncio.run(flow.kickoff_async(inputs={"threshold": 100}))
+
+        self.assertEqual(result, "archived")
+        self.assertNotIn("escalated", flow.state.log)
+
+    def test_failing_method_propagates(self):
+        """Test that an exception in a listener stops the flow and is raised."""
+        class FailingFlow(ReviewFlow):
+            @listen("collect")
+            def schedule_review(self, result):
+                raise RuntimeError("calendar unavailable")
+
+        with self.assertRaises(RuntimeError):
+            FailingFlow(state=ReviewState()).kickoff()
+
+
+class PortfolioState(BaseModel):
+    id: str = "template"
+    project: str = ""
+    report: str = ""
+
+
+class NightlyReportFlow(Flow[PortfolioState]):
+    running = 0
+    peak = 0
+    lock = threading.Lock()
+
+    @start()
+    def build_report(self):
+        with self.lock:
+            NightlyReportFlow.running += 1
+            NightlyReportFlow.peak = max(NightlyReportFlow.peak, NightlyReportFlow.running)
+        try:
+            time.sleep(0.02)
+            if self.state.project == "broken":
+                raise ValueError("missing schedule")
+            self.state.report = f"{self.state.project} on track"
+            return self.crews
+        finally:
+            with self.lock:
+                NightlyReportFlow.running -= 1
+
+
+class TestFlowKickoffMany(unittest.TestCase):
+    def test_batch_is_bounded_and_isolates_failures(self):
+        """Test that batch runs share resources, respect the limit and survive failures."""
+        crews = [object()]
+        flow = NightlyReportFlow(crews=crews, state=PortfolioState())
+        projects = [f"P{i}" for i in range(12)] + ["broken"]
+
+        results = list(
+            flow.kickoff_many(({"project": p} for p in projects), max_concurrency=3)
+        )
+
+        self.assertEqual(len(results), 13)
+        self.assertLessEqual(NightlyReportFlow.peak, 3)
+        failed = [r for r in results if not r.succeeded]
+        self.assertEqual([r.inputs["project"] for r in failed], ["broken"])
+        self.assertIsInstance(failed[0].error, ValueError)
+        succeeded = [r for r in results if r.succeeded]
+        self.assertTrue(all(r.result[0] is crews[0] for r in succeeded))
+        self.assertEqual(len({r.state.id for r in results}), 13)
+        self.assertEqual(flow.state.report, "")
+
+
+class Milestone(BaseModel):
+    name: str
+    done: bool = False
+
+
+class PlanState(BaseModel):
+    id: str = "plan-1"
+    milestones: List[Milestone] = Field(default_factory=list)
+
+
+class TestSQLiteFlowPersistence(unittest.TestCase):
+    def setUp(self):
+        """Set up test fixtures."""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.temp_dir.name, "flow_states.db")
+
+    def tearDown(self):
+        """Tear down test fixtures."""
+        get_connection_pool(self.db_path).close()
+        self.temp_dir.cleanup()
+
+    def _save_steps(self, persistence, count):
+        state = PlanState(milestones=[Milestone(name=f"M{i}") for i in range(20)])
+        history = []
+        for step in range(count):
+            state.milestones[step % 20].done = not state.milestones[step % 20].done
+            persistence.save_state("plan-1", f"step_{step}", state)
+            history.append(state.model_dump())
+        return history
+
+    def test_deltas_rebuild_every_step(self):
+        """Test that batched delta steps rebuild to the exact saved states."""
+        persistence = SQLiteFlowPersistence(self.db_path, snapshot_interval=5, batch_size=4)
+        history = self._save_steps(persistence, 12)
+
+        steps = persistence.list_steps("plan-1")
+
+        self.assertEqual([s["is_delta"] for s in steps[:6]], [False, True, True, True, True, False])
+        for step, expected in enumerate(history):
+            self.assertEqual(persistence.load_state_at("plan-1", step), expected)
+        self.assertEqual(persistence.load_state("plan-1"), history[-1])
+
+    def test_compact_keeps_recent_steps(self):
+        """Test that compaction drops old steps but keeps recent ones rebuildable."""
+        persistence = SQLiteFlowPersistence(self.db_path, snapshot_interval=5)
+        history = self._save_steps(persistence, 12)
+
+        deleted = persistence.compact(keep_steps=2)
+
+        self.assertEqual(deleted, 9)
+        self.assertIsNone(persistence.load_state_at("plan-1", 8))
+        self.assertEqual(persistence.load_state_at("plan-1", 9), history[9])
+        self.assertEqual(persistence.load_state("plan-1"), history[-1])
+
+    def test_persistences_sharing_a_database_number_steps_in_turn(self):
+        """Test that two persistences on one file interleave steps without conflicts."""
+        first = SQLiteFlowPersistence(self.db_path)
+        second = SQLiteFlowPersistence(self.db_path, snapshot_interval=5)
+        state = PlanState(milestones=[Milestone(name=f"M{i}") for i in range(20)])
+
+        for step in range(6):
+            state.milestones[step].done = True
+            (first if step % 3 else second).save_state("plan-1", f"step_{step}", state)
+
+        self.assertEqual([s["step"] for s in first.list_steps("plan-1")], list(range(6)))
+        self.assertEqual(second.load_state("plan-1"), state.model_dump())
+        self.assertEqual(
+            second.load_state_at("plan-1", 3)["milestones"][3], {"name": "M3", "done": True}
+        )
+
+
+class BrokenPersistence(SQLiteFlowPersistence):
+    def flush(self):
+        raise RuntimeError("disk full")
+
+
+class SlowAsyncPersistence(AsyncSQLiteFlowPersistence):
+    def _save_dict(self, flow_uuid, method_name, state_dict):
+        time.sleep(0.02)
+        super()._save_dict(flow_uuid, method_name, state_dict)
+
+
+class TestAsyncSQLiteFlowPersistence(unittest.TestCase):
+    def setUp(self):
+        """Set up test fixtures."""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.temp_dir.name, "flow_states.db")
+
+    def tearDown(self):
+        """Tear down test fixtures."""
+        get_connection_pool(self.db_path).close()
+        self.temp_dir.cleanup()
+
+    def _row_count(self):
+        with get_connection_pool(self.db_path).connection() as conn:
+            return conn.execute("SELECT COUNT(*) FROM flow_states").fetchone()[0]
+
+    def test_exit_flush_survives_a_failing_persistence(self):
+        """Test that one persistence failing at exit does not lose the others' states."""
+        broken = BrokenPersistence(os.path.join(self.temp_dir.name, "broken.db"), batch_size=10)
+        persistence = AsyncSQLiteFlowPersistence(self.db_path, batch_size=10)
+        broken.save_state("plan-1", "plan", PlanState())
+        persistence.save_state("plan-1", "plan", PlanState())
+
+        with self.assertLogs("pmoai.flow.persistence.sqlite", level="ERROR"):
+            _flush_buffered_persistences()
+
+        self.assertEqual(self._row_count(), 1)
+        self.assertFalse(persistence._writer.is_alive())
+        _buffered_persistences.discard(broken)
+        get_connection_pool(broken.db_path).close()
+
+    def test_kickoff_writes_buffered_states_before_returning(self):
+        """Test that single and batch kickoffs flush the flow's persistence."""
+        persistence = SQLiteFlowPersistence(self.db_path, batch_size=100)
+
+        @persist(persistence)
+        class BufferedPlanFlow(Flow[PlanState]):
+            @start()
+            def plan(self):
+                self.state.milestones.append(Milestone(name="M0"))
+
+            @listen("plan")
+            def review(self):
+                self.state.milestones[0].done = True
+
+        flow = BufferedPlanFlow(state=PlanState())
+
+        asyncio.run(flow.kickoff_async())
+        self.assertEqual(self._row_count(), 2)
+        list(flow.kickoff_many([None, None]))
+        self.assertEqual(self._row_count(), 6)
+
+    def test_async_methods_do_not_wait_for_writes(self):
+        """Test that persisted coroutines return before the writer catches up."""
+        persistence = SlowAsyncPersistence(self.db_path, snapshot_interval=4)
+
+        class CountingFlow(Flow[PlanState]):
+            @start()
+            @persist(persistence)
+            async def plan(self):
+                for i in range(10):
+                    self.state.milestones.append(Milestone(name=f"M{i}"))
+                    await self.record()
+
+            @persist(persistence)
+            async def record(self):
+                return len(self.state.milestones)
+
+        flow = CountingFlow(state=PlanState())
+        started = time.perf_counter()
+        asyncio.run(flow.kickoff_async())
+        elapsed = time.perf_counter() - started
+
+        self.assertLess(elapsed, 0.15)
+        persistence.flush()
+        steps = persistence.list_steps("plan-1")
+        self.assertEqual(len(steps), 11)
+        self.assertEqual(
+            len(persistence.load_state_at("plan-1", 3)["milestones"]), 4
+        )
+        persistence.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
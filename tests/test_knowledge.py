@@ -0,0 +1,255 @@
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+from pmoai.knowledge.embedder.embedding_cache import CachedEmbeddingFunction, EmbeddingCache
+from pmoai.knowledge.source.base_file_knowledge_source import BaseFileKnowledgeSource
+from pmoai.knowledge.source.csv_knowledge_source import CSVKnowledgeSource
+from pmoai.knowledge.storage.knowledge_manifest import KnowledgeManifest
+from pmoai.knowledge.storage.knowledge_storage import KnowledgeStorage
+from pmoai.knowledge.utils.knowledge_utils import (
+    iter_paragraphs,
+    iter_text_chunks,
+    split_text_into_chunks,
+)
+from pmoai.utilities.sqlite_pool import get_connection_pool
+
+
+class ScaledEmbedding:
+    def __init__(self, scale):
+        self.scale = scale
+
+    def __call__(self, texts):
+        return [np.full(4, len(text) * self.scale, dtype=np.float32) for text in texts]
+
+    def get_config(self):
+        return {"scale": self.scale}
+
+
+class TestEmbeddingCache(unittest.TestCase):
+    def setUp(self):
+        """Set up test fixtures."""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.calls = []
+
+    def tearDown(self):
+        """Tear down test fixtures."""
+        get_connection_pool(f"{self.temp_dir.name}/index.db").close()
+        self.temp_dir.cleanup()
+
+    def embed(self, texts):
+        self.calls.append(list(texts))
+        return [np.full(4, len(text), dtype=np.float32) for text in texts]
+
+    def test_embeds_each_text_once(self):
+        """Test that repeated and previously seen texts are not re-embedded."""
+        cache = EmbeddingCache(self.temp_dir.name)
+
+        first = cache.embed("bge-small", ["scope", "budget", "scope"], self.embed)
+        second = cache.embed("bge-small", ["budget", "timeline"], self.embed)
+
+        self.assertEqual(self.calls, [["scope", "budget"], ["timeline"]])
+        self.assertEqual([v[0] for v in first], [5.0, 6.0, 5.0])
+        self.assertEqual([v[0] for v in second], [6.0, 8.0])
+
+    def test_persists_across_instances(self):
+        """Test that a new cache instance reads vectors back from disk."""
+        EmbeddingCache(self.temp_dir.name).embed("bge-small", ["scope", "budget"], self.embed)
+
+        reopened = EmbeddingCache(self.temp_dir.name, max_memory_entries=1)
+        vectors = reopened.embed("bge-small", ["budget", "scope"], self.embed)
+
+        self.assertEqual(len(self.calls), 1)
+        np.testing.assert_array_equal(vectors[0], np.full(4, 6, dtype=np.float32))
+
+    def test_keys_include_model_name(self):
+        """Test that embeddings from another model are not reused."""
+        cache = EmbeddingCache(self.temp_dir.name)
+        cache.embed("bge-small", ["scope"], self.embed)
+        cache.embed("bge-large", ["scope"], self.embed)
+
+        self.assertEqual(len(self.calls), 2)
+
+    def test_wrapped_functions_are_namespaced_by_configuration(self):
+        """Test that differently configured embedders never share cached vectors."""
+        cache = EmbeddingCache(self.temp_dir.name)
+        small = CachedEmbeddingFunction(ScaledEmbedding(1), cache=cache)
+        large = CachedEmbeddingFunction(ScaledEmbedding(2), cache=cache)
+
+        self.assertEqual(small(["scope"])[0][0], 5.0)
+        self.assertEqual(large(["scope"])[0][0], 10.0)
+        with self.assertRaises(ValueError):
+            CachedEmbeddingFunction(lambda texts: self.embed(texts), cache=cache)
+        self.assertEqual(
+            CachedEmbeddingFunction(self.embed, cache=cache, model_name="bge-small")(["scope"])[0][0],
+            5.0,
+        )
+
+
+class NotesFileSource(BaseFileKnowledgeSource):
+    def get_content(self):
+        with open(self.file_path) as handle:
+            return handle.read()
+
+
+class FakeEmbedder:
+    def __init__(self):
+        self.texts = []
+
+    def embed_texts(self, texts):
+        self.texts.extend(texts)
+        return [np.zeros(4, dtype=np.float32) for _ in texts]
+
+
+class FakeCollection:
+    def __init__(self):
+        self.records = {}
+        self.batches = []
+
+    def upsert(self, ids, embeddings, documents, metadatas):
+        self.batches.append(len(ids))
+        self.records.update(zip(ids, documents))
+
+    def delete(self, ids):
+        for chunk_id in ids:
+            self.records.pop(chunk_id, None)
+
+
+class TestIncrementalIngestion(unittest.TestCase):
+    def setUp(self):
+        """Set up test fixtures."""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.manifest_path = os.path.join(self.temp_dir.name, "manifest.db")
+        self.file_path = os.path.join(self.temp_dir.name, "charter.txt")
+        self.embedder = FakeEmbedder()
+        self.storage = KnowledgeStorage.model_construct(
+            collection_name="charters",
+            embedder=self.embedder,
+            collection=FakeCollection(),
+            manifest=KnowledgeManifest("charters", db_path=self.manifest_path),
+        )
+
+    def tearDown(self):
+        """Tear down test fixtures."""
+        get_connection_pool(self.manifest_path).close()
+        self.temp_dir.cleanup()
+
+    def _ingest(self, content=None):
+        if content is not None:
+            with open(self.file_path, "w") as handle:
+                handle.write(content)
+        source = NotesFileSource(file_path=self.file_path, chunk_size=20, chunk_overlap=0)
+        source.storage = self.storage
+        source.add()
+
+    def test_unchanged_file_is_skipped(self):
+        """Test that re-adding an unchanged or merely touched file embeds nothing."""
+        self._ingest("Scope statement\n\nBudget baseline")
+        embedded = list(self.embedder.texts)
+
+        self._ingest()
+        os.utime(self.file_path, ns=(0, 0))
+        self._ingest()
+
+        self.assertEqual(self.embedder.texts, embedded)
+        self.assertEqual(len(self.storage.collection.records), 2)
+
+    def test_only_changed_chunks_are_replaced(self):
+        """Test that an edited file replaces only the chunks that changed."""
+        self._ingest("Scope statement\n\nBudget baseline")
+        self.embedder.texts.clear()
+
+        self._ingest("Scope statement\n\nRevised budget")
+
+        self.assertEqual(self.embedder.texts, ["Revised budget"])
+        self.assertEqual(
+            sorted(self.storage.collection.records.values()),
+            ["Revised budget", "Scope statement"],
+        )
+
+    def test_csv_rows_are_streamed_in_batches(self):
+        """Test that CSV rows are chunked lazily and stored in bounded batches."""
+        csv_path = os.path.join(self.temp_dir.name, "tasks.csv")
+        with open(csv_path, "w") as handle:
+            handle.write("id,name\n")
+            for i in range(500):
+                handle.write(f"{i},Task {i}\n")
+        source = CSVKnowledgeSource(file_path=csv_path, chunk_size=100, chunk_overlap=0, batch_size=8)
+        source.storage = self.storage
+
+        first = next(source.iter_chunks())
+        source.add()
+
+        self.assertTrue(first.startswith("{'id': '0', 'name': 'Task 0'}"))
+        self.assertLessEqual(max(self.storage.collection.batches), 8)
+        self.assertEqual(len(self.storage.collection.records), len(source.get_chunks()))
+
+
+class QueryEmbedder:
+    def embed_texts(self, texts):
+        return [np.full(4, len(text), dtype=np.float32) for text in texts]
+
+
+class QueryCollection:
+    """Returns canned chunks and distances for each query, keyed by query length."""
+
+    def __init__(self, results):
+        self.results = results
+        self.queries = []
+
+    def query(self, query_embeddings, n_results, include):
+        self.queries.append(len(query_embeddings))
+        hits = [self.results[int(embedding[0])][:n_results] for embedding in query_embeddings]
+        return {
+            "ids": [[chunk_id for chunk_id, _ in hit] for hit in hits],
+            "documents": [[f"text {chunk_id}" for chunk_id, _ in hit] for hit in hits],
+            "metadatas": [[{"id": chunk_id} for chunk_id, _ in hit] for hit in hits],
+            "distances": [[distance for _, distance in hit] for hit in hits],
+        }
+
+
+class TestKnowledgeSearch(unittest.TestCase):
+    def setUp(self):
+        """Set up test fixtures."""
+        self.collection = QueryCollection(
+            {
+                5: [("a", 0.1), ("b", 0.3), ("c", 0.7)],
+                6: [("b", 0.2), ("d", 0.4), ("a", 0.5)],
+            }
+        )
+        self.storage = KnowledgeStorage.model_construct(
+            collection_name="charters",
+            embedder=QueryEmbedder(),
+            collection=self.collection,
+        )
+
+    def test_queries_are_merged_by_best_score(self):
+        """Test that several queries are searched at once and merged by each chunk's best score."""
+        results = self.storage.search(["scope", "budget"], limit=3, score_threshold=0.0)
+
+        self.assertEqual(self.collection.queries, [2])
+        self.assertEqual([r["metadata"]["id"] for r in results], ["a", "b", "d"])
+        self.assertEqual([round(r["score"], 2) for r in results], [0.9, 0.8, 0.6])
+
+    def test_score_threshold_filters_merged_results(self):
+        """Test that chunks below the threshold are dropped before the limit is applied."""
+        results = self.storage.search(["scope", "budget"], limit=5, score_threshold=0.65)
+
+        self.assertEqual([r["metadata"]["id"] for r in results], ["a", "b"])
+
+
+class TestChunking(unittest.TestCase):
+    def test_streaming_matches_split(self):
+        """Test that chunking a paragraph stream matches splitting the whole text."""
+        paragraphs = [f"Paragraph {i} " + "x" * (i % 7 * 10) for i in range(50)]
+
+        self.assertEqual(
+            list(iter_text_chunks(iter_paragraphs(iter(paragraphs)), 120, 40)),
+            split_text_into_chunks("\n\n".join(paragraphs), 120, 40),
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,383 @@
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+import unittest
+
+import numpy as np
+
+from pmoai.knowledge.embedder.base_embedder import BaseEmbedder
+from pmoai.memory.long_term.long_term_memory import LongTermMemory
+from pmoai.memory.project_memory import ProjectMemoryItem
+from pmoai.memory.storage.kickoff_task_outputs_storage import KickoffTaskOutputsSQLiteStorage
+from pmoai.memory.storage.ltm_sqlite_storage import LTMSQLiteStorage
+from pmoai.memory.storage.project_memory_storage import ProjectMemoryStorage
+from pmoai.memory.storage.project_memory_vector_index import ProjectMemoryVectorIndex
+from pmoai.utilities.sqlite_pool import get_connection_pool
+
+
+class TestSQLiteConnectionPool(unittest.TestCase):
+    def setUp(self):
+        """Set up test fixtures."""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.temp_dir.name, "memory.db")
+
+    def tearDown(self):
+        """Tear down test fixtures."""
+        get_connection_pool(self.db_path).close()
+        self.temp_dir.cleanup()
+
+    def test_pool_is_shared_and_uses_wal(self):
+        """Test that storages on the same file share one WAL-mode pool."""
+        first = LTMSQLiteStorage(db_path=self.db_path)
+        second = KickoffTaskOutputsSQLiteStorage(db_path=self.db_path)
+
+        self.assertIs(first._pool, second._pool)
+        with first._pool.connection() as conn:
+            self.assertEqual(conn.execute("PRAGMA journal_mode").fetchone()[0], "wal")
+
+    def test_concurrent_saves(self):
+        """Test that concurrent writers do not lose rows."""
+        storage = LTMSQLiteStorage(db_path=self.db_path)
+
+        def write():
+            for i in range(25):
+                storage.save("Plan sprint", {"quality": i}, f"{i:04d}", i)
+
+        threads = [threading.Thread(target=write) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len(storage.load("Plan sprint", 1000)), 100)
+
+    def test_failed_transaction_rolls_back(self):
+        """Test that a failing transaction leaves no partial writes."""
+        storage = KickoffTaskOutputsSQLiteStorage(db_path=self.db_path)
+        storage.save([{"task_id": "1", "expected_output": "charter", "raw": "done"}])
+
+        with self.assertRaises(KeyError):
+            storage.save([{"task_id": "2"}])
+
+        self.assertEqual([row["task_id"] for row in storage.load()], ["1"])
+
+
+class TestLTMSQLiteStorage(unittest.TestCase):
+    def setUp(self):
+        """Set up test fixtures."""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.temp_dir.name, "ltm.db")
+
+    def tearDown(self):
+        """Tear down test fixtures."""
+        get_connection_pool(self.db_path).close()
+        self.temp_dir.cleanup()
+
+    def test_migrates_legacy_database(self):
+        """Test that rows written before the task hash column are still found."""
+        conn = sqlite3.connect(self.db_path)
+        conn.execute(
+            """
+            CREATE TABLE long_term_memories (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                task_description TEXT,
+                metadata TEXT,
+                datetime TEXT,
+                score REAL
+            )
+            """
+        )
+        conn.execute(
+            "INSERT INTO long_term_memories (task_description, metadata, datetime, score) "
+            "VALUES ('Draft charter', '{}', '2024-01-01', 7)"
+        )
+        conn.commit()
+        conn.close()
+
+        storage = LTMSQLiteStorage(db_path=self.db_path)
+
+        self.assertEqual(len(storage.load("Draft charter", 3)), 1)
+
+    def test_load_uses_index_and_limit(self):
+        """Test that lookups are ordered, limited and served by the index."""
+        storage = LTMSQLiteStorage(db_path=self.db_path)
+        for day in range(1, 6):
+            storage.save("Draft charter", {"quality": day}, f"2024-01-0{day}", day)
+        storage.save("Other task", {"quality": 1}, "2024-02-01", 1)
+
+        results = storage.load("Draft charter", 2)
+
+        self.assertEqual([r["datetime"] for r in results], ["2024-01-05", "2024-01-04"])
+        with storage._pool.connection() as conn:
+            plan = conn.execute(
+                """
+                EXPLAIN QUERY PLAN
+                SELECT metadata, datetime, score FROM long_term_memories
+                WHERE task_hash = ? AND task_description = ?
+                ORDER BY datetime DESC, score ASC LIMIT ?
+                """,
+                (0, "Draft charter", 2),
+            ).fetchall()
+        details = " ".join(row[-1] for row in plan)
+        self.assertIn("idx_ltm_task_hash_datetime_score", details)
+        self.assertNotIn("TEMP B-TREE", details)
+
+    def _row_count(self, storage):
+        with storage._pool.connection() as conn:
+            return conn.execute("SELECT COUNT(*) FROM long_term_memories").fetchone()[0]
+
+    def test_write_behind_buffer_flushes_by_size(self):
+        """Test that buffered saves are readable before and after a size flush."""
+        storage = LTMSQLiteStorage(db_path=self.db_path, write_buffer_size=3)
+        storage.save("Draft charter", {"quality": 1}, "2024-01-01", 1)
+        storage.save("Draft charter", {"quality": 2}, "2024-01-02", 2)
+
+        self.assertEqual(self._row_count(storage), 0)
+        self.assertEqual(storage.load("Draft charter", 1)[0]["datetime"], "2024-01-02")
+
+        storage.save("Draft charter", {"quality": 3}, "2024-01-03", 3)
+
+        self.assertEqual(self._row_count(storage), 3)
+        self.assertEqual(len(storage.load("Draft charter", 5)), 3)
+
+    def test_write_behind_buffer_flushes_by_time(self):
+        """Test that the flush interval writes a partially filled buffer."""
+        storage = LTMSQLiteStorage(
+            db_path=self.db_path, write_buffer_size=100, flush_interval=0.05
+        )
+        storage.save("Draft charter", {"quality": 1}, "2024-01-01", 1)
+
+        deadline = time.monotonic() + 2
+        while self._row_count(storage) == 0 and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+        self.assertEqual(self._row_count(storage), 1)
+
+    def test_load_sees_each_row_once_during_flushes(self):
+        """Test that a flush between reading the table and the buffer cannot hide rows."""
+        storage = LTMSQLiteStorage(db_path=self.db_path, write_buffer_size=10)
+        storage.save("Draft charter", {"quality": 1}, "2024-01-01", 1)
+        pending_rows = storage._pending_rows
+        flusher = threading.Thread(target=storage.flush)
+
+        def flush_before_reading_the_buffer(task_description):
+            flusher.start()
+            flusher.join(0.2)
+            return pending_rows(task_description)
+
+        storage._pending_rows = flush_before_reading_the_buffer
+
+        self.assertEqual(len(storage.load("Draft charter", 5)), 1)
+        flusher.join()
+        self.assertEqual(self._row_count(storage), 1)
+
+    def test_long_term_memory_enables_the_write_buffer(self):
+        """Test that LongTermMemory passes its buffer settings to the default storage."""
+        memory = LongTermMemory(path=self.db_path, write_buffer_size=10)
+        memory.storage.save("Draft charter", {"quality": 1}, "2024-01-01", 1)
+
+        self.assertEqual(self._row_count(memory.storage), 0)
+        memory.flush()
+        self.assertEqual(self._row_count(memory.storage), 1)
+
+
+class TestProjectMemoryStorage(unittest.TestCase):
+    def setUp(self):
+        """Set up test fixtures."""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.temp_dir.name, "project.db")
+        self.storage = ProjectMemoryStorage("Apollo", db_path=self.db_path)
+
+    def tearDown(self):
+        """Tear down test fixtures."""
+        get_connection_pool(self.db_path).close()
+        self.temp_dir.cleanup()
+
+    def _save(self, memory_type, content, timestamp):
+        self.storage.save(
+            ProjectMemoryItem(
+                project_name="Apollo",
+                memory_type=memory_type,
+                content=content,
+                timestamp=timestamp,
+            )
+        )
+
+    def test_search_ranks_full_text_matches(self):
+        """Test that search ranks by relevance and matches word stems."""
+        self._save("issue", "Supplier delays pushed the delivery date", "2024-01-01")
+        self._save("issue", "Supplier invoice approved", "2024-01-02")
+        self._save("issue", "Team offsite planned", "2024-01-03")
+        self._save("decision", "Supplier delay accepted", "2024-01-04")
+
+        results = self.storage.search("supplier delay", memory_type="issue")
+
+        self.assertEqual(
+            [item.content for item in results],
+            ["Supplier delays pushed the delivery date", "Supplier invoice approved"],
+        )
+
+    def test_search_honours_limit_and_threshold(self):
+        """Test that limit and score_threshold trim the ranked results on an absolute scale."""
+        for i, content in enumerate(
+            ["Team offsite planned", "Budget review scheduled", "Risk workshop held",
+             "Release train kicked off", "Testing environment ready", "Stakeholder update sent"]
+        ):
+            self._save("issue", content, f"2023-12-0{i + 1}")
+        self._save("lesson", "Vendor vendor vendor onboarding", "2024-01-01")
+        self._save("lesson", "Vendor onboarding took longer than planned for the vendor team", "2024-01-02")
+        self._save("lesson", "Onboarding checklist", "2024-01-03")
+        self._save(
+            "lesson",
+            "The quarterly steering review covered the budget forecast, staffing plan, scope changes, "
+            "open risks, upcoming milestones, cross team dependencies, resourcing gaps, procurement "
+            "timelines, test readiness, release criteria, training needs and a single vendor contract",
+            "2024-01-04",
+        )
+
+        self.assertEqual(len(self.storage.search("vendor", limit=1)), 1)
+        self.assertEqual(len(self.storage.search("vendor")), 3)
+        self.assertEqual(len(self.storage.search("vendor", score_threshold=0.4)), 2)
+        self.assertEqual(len(self.storage.search("vendor", score_threshold=1.0)), 0)
+        # The only match is weak, so it is rejected even though it is the best one
+        self.assertEqual(len(self.storage.search("contract")), 1)
+        self.assertEqual(len(self.storage.search("contract", score_threshold=0.5)), 0)
+        # Any of the query words is enough to match
+        self.assertEqual(len(self.storage.search("vendor contract", limit=5)), 3)
+
+    def test_save_many_streams_a_generator(self):
+        """Test that bulk saves accept a generator and are searchable."""
+        items = (
+            ProjectMemoryItem(
+                project_name="Apollo",
+                memory_type="lesson",
+                content=f"Lesson {i} about vendor onboarding",
+                timestamp=f"2024-01-{i % 28 + 1:02d}",
+            )
+            for i in range(500)
+        )
+
+        self.assertEqual(self.storage.save_many(items), 500)
+        self.assertEqual(len(self.storage.search("onboarding", limit=10)), 10)
+
+    def test_save_many_is_atomic(self):
+        """Test that a failing bulk save does not leave partial rows."""
+        def items():
+            yield ProjectMemoryItem(
+                project_name="Apollo", memory_type="issue", content="Late vendor", timestamp="2024-01-01"
+            )
+            raise ValueError("bad source row")
+
+        with self.assertRaises(ValueError):
+            self.storage.save_many(items())
+
+        self.assertEqual(self.storage.search("vendor"), [])
+
+
+class KeywordEmbedder(BaseEmbedder):
+    """Deterministic embedder mapping synonyms onto shared axes."""
+
+    AXES = {"vendor": 0, "supplier": 0, "delay": 1, "slipped": 1, "budget": 2, "cost": 2}
+
+    def __init__(self):
+        self.calls = 0
+
+    def embed_chunks(self, chunks):
+        return self.embed_texts(chunks)
+
+    def embed_texts(self, texts):
+        self.calls += len(texts)
+        vectors = []
+        for text in texts:
+            vector = np.full(4, 0.1, dtype=np.float32)
+            for word in text.lower().split():
+                if word in self.AXES:
+                    vector[self.AXES[word]] += 1.0
+            vectors.append(vector)
+        return vectors
+
+    def embed_text(self, text):
+        return self.embed_texts([text])[0]
+
+    @property
+    def dimension(self):
+        return 4
+
+
+class TestProjectMemoryVectorIndex(unittest.TestCase):
+    def setUp(self):
+        """Set up test fixtures."""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.temp_dir.name, "project.db")
+        self.embedder = KeywordEmbedder()
+        self.storage = ProjectMemoryStorage(
+            "Apollo",
+            db_path=self.db_path,
+            vector_index=ProjectMemoryVectorIndex(self.embedder),
+        )
+
+    def tearDown(self):
+        """Tear down test fixtures."""
+        get_connection_pool(self.db_path).close()
+        self.temp_dir.cleanup()
+
+    def _save(self, memory_type, content):
+        self.storage.save(
+            ProjectMemoryItem(
+                project_name="Apollo", memory_type=memory_type, content=content, timestamp="2024-01-01"
+            )
+        )
+
+    def test_semantic_search_finds_synonyms(self):
+        """Test that semantic search matches memories sharing no words with the query."""
+        self._save("issue", "Supplier slipped the delivery")
+        self._save("issue", "Cost overrun on hardware")
+
+        results = self.storage.search("vendor delay", memory_type="issue", limit=1, mode="semantic")
+
+        self.assertEqual([item.content for item in results], ["Supplier slipped the delivery"])
+        self.assertEqual(self.storage.search("vendor delay", mode="lexical"), [])
+
+    def test_embedding_is_incremental(self):
+        """Test that only new memories are embedded on later searches."""
+        self._save("issue", "Supplier slipped the delivery")
+        self.storage.search("vendor", mode="semantic")
+        calls = self.embedder.calls
+
+        self._save("lesson", "Budget reviews need a cost baseline")
+        self.storage.search("budget", mode="hybrid")
+
+        # One new memory plus the query itself
+        self.assertEqual(self.embedder.calls - calls, 2)
+
+    def test_updated_memories_are_re_embedded(self):
+        """Test that changing a memory's content replaces its vector, in memory and on disk."""
+        self._save("issue", "Supplier slipped the delivery")
+        self._save("issue", "Vendor escalation")
+        self.storage.search("vendor", mode="semantic")
+
+        with get_connection_pool(self.db_path).transaction() as conn:
+            conn.execute(
+                "UPDATE project_memories SET content = 'Budget cut' WHERE content LIKE 'Supplier%'"
+            )
+        calls = self.embedder.calls
+        results = self.storage.search("budget", score_threshold=0.9, mode="semantic")
+
+        # The updated memory plus the query itself
+        self.assertEqual(self.embedder.calls - calls, 2)
+        self.assertEqual([item.content for item in results], ["Budget cut"])
+
+        reopened = ProjectMemoryStorage(
+            "Apollo", db_path=self.db_path, vector_index=ProjectMemoryVectorIndex(self.embedder)
+        )
+        calls = self.embedder.calls
+        results = reopened.search("budget", score_threshold=0.9, mode="semantic")
+
+        self.assertEqual(self.embedder.calls - calls, 1)
+        self.assertEqual([item.content for item in results], ["Budget cut"])
+
+
+if __name__ == "__main__":
+    unittest.main()
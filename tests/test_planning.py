@@ -0,0 +1,268 @@
+import unittest
+
+from pmoai.planning.resource_leveling import IntervalTree, ResourceLeveler, find_overallocations
+from pmoai.planning.resource_planner import (
+    Resource,
+    ResourceAllocation,
+    ResourcePlan,
+    ResourcePlanner,
+    ResourceRequirement,
+)
+from pmoai.utilities.resource_utilization import UtilizationEngine
+from pmoai.planning.risk_planner import Risk
+from pmoai.planning.schedule_engine import ScheduleEngine
+from pmoai.planning.schedule_planner import Milestone, Schedule, SchedulePlanner, ScheduleTask
+from pmoai.planning.schedule_simulation import MonteCarloScheduleSimulator
+
+
+def make_schedule():
+    """Build a small schedule with one slack branch and a closing milestone."""
+    return Schedule(
+        project_name="LIMS Upgrade",
+        start_date="2026-03-02",
+        tasks=[
+            ScheduleTask(id="A", name="Requirements", description="", duration=3),
+            ScheduleTask(id="B", name="Training", description="", duration=2, dependencies=["A"]),
+            ScheduleTask(id="C", name="Build", description="", duration=4, dependencies=["A"]),
+            ScheduleTask(id="D", name="Go-live", description="", duration=1, dependencies=["B", "C"]),
+        ],
+        milestones=[
+            Milestone(id="M1", name="Handover", description="", dependencies=["D"]),
+        ],
+    )
+
+
+class TestScheduleEngine(unittest.TestCase):
+    def test_critical_path_and_float(self):
+        """Test that the passes produce the textbook early and late times."""
+        engine = ScheduleEngine.from_schedule(make_schedule())
+
+        self.assertEqual(engine.project_duration, 8)
+        self.assertEqual(engine.critical_path, ["A", "C", "D", "M1"])
+        self.assertEqual(
+            engine.task_times("B"),
+            {
+                "early_start": 3,
+                "early_finish": 5,
+                "late_start": 5,
+                "late_finish": 7,
+                "total_float": 2,
+                "free_float": 2,
+            },
+        )
+
+    def test_apply_to_writes_dates(self):
+        """Test that the computed schedule is written back to the models."""
+        schedule = make_schedule()
+
+        ScheduleEngine.from_schedule(schedule).apply_to(schedule)
+
+        task_c = schedule.tasks[2]
+        self.assertEqual((task_c.start_date, task_c.end_date), ("2026-03-05", "2026-03-08"))
+        self.assertTrue(task_c.is_critical)
+        self.assertFalse(schedule.tasks[1].is_critical)
+        self.assertEqual(schedule.milestones[0].date, "2026-03-09")
+        self.assertEqual(schedule.end_date, "2026-03-09")
+        self.assertEqual(schedule.critical_path, ["A", "C", "D", "M1"])
+
+    def test_task_order_does_not_matter(self):
+        """Test that tasks listed before their dependencies are sorted first."""
+        engine = ScheduleEngine(
+            ["D", "C", "B", "A"], [1, 4, 2, 3], [["B", "C"], ["A"], ["A"], []]
+        )
+
+        self.assertEqual(engine.critical_path, ["A", "C", "D"])
+        self.assertEqual(engine.task_times("D")["early_start"], 7)
+
+    def test_invalid_dependencies_are_rejected(self):
+        """Test that cycles and unknown dependencies raise ValueError."""
+        with self.assertRaises(ValueError):
+            ScheduleEngine(["A", "B"], [1, 1], [["B"], ["A"]])
+        with self.assertRaises(ValueError):
+            ScheduleEngine(["A"], [1], [["Z"]])
+
+
+class TestScheduleRecalculation(unittest.TestCase):
+    def setUp(self):
+        """Set up test fixtures."""
+        self.planner = SchedulePlanner.model_construct()
+        self.schedule = self.planner.compute_schedule(make_schedule())
+
+    def test_duration_change_moves_downstream_tasks(self):
+        """Test that a slipping task shifts its successors and the critical path."""
+        change_set = self.planner.recalculate_schedule(
+            self.schedule, {"B": {"duration": 6, "progress": 20.0}}
+        )
+
+        self.assertEqual(self.schedule.critical_path, ["A", "B", "D", "M1"])
+        self.assertEqual(change_set.critical_path_added, ["B"])
+        self.assertEqual(change_set.critical_path_removed, ["C"])
+        self.assertEqual(change_set.new_end_date, "2026-03-11")
+        changed = {(c.id, c.field): c.new_value for c in change_set.changes}
+        self.assertEqual(changed[("B", "progress")], 20.0)
+        self.assertEqual(changed[("D", "start_date")], "2026-03-11")
+        self.assertEqual(changed[("C", "total_float")], 2)
+        self.assertNotIn(("A", "start_date"), changed)
+
+    def test_dependency_change_matches_full_computation(self):
+        """Test that an incremental update agrees with computing from scratch."""
+        self.planner.recalculate_schedule(self.schedule, {"C": {"dependencies": ["B"]}})
+
+        expected = ScheduleEngine.from_schedule(self.schedule)
+        self.assertEqual(self.schedule.critical_path, expected.critical_path)
+        for task in self.schedule.tasks:
+            self.assertEqual(task.early_start, expected.task_times(task.id)["early_start"])
+            self.assertEqual(task.total_float, expected.task_times(task.id)["total_float"])
+
+    def test_invalid_update_leaves_schedule_unchanged(self):
+        """Test that a cyclic dependency is rejected before anything changes."""
+        with self.assertRaises(ValueError):
+            self.planner.recalculate_schedule(self.schedule, {"A": {"dependencies": ["D"]}})
+
+        self.assertEqual(self.schedule.tasks[0].dependencies, [])
+        self.assertEqual(self.schedule.critical_path, ["A", "C", "D", "M1"])
+
+
+class TestScheduleSimulation(unittest.TestCase):
+    def test_fixed_durations_match_the_plan(self):
+        """Test that a schedule without uncertainty always finishes on plan."""
+        result = MonteCarloScheduleSimulator.from_schedule(make_schedule()).run(
+            iterations=1000, seed=1
+        )
+
+        self.assertEqual(result.percentile_durations, {"P50": 8.0, "P80": 8.0, "P95": 8.0})
+        self.assertEqual(result.completion_dates["P95"], "2026-03-09")
+        self.assertEqual(result.criticality["C"], 1.0)
+        self.assertEqual(result.criticality["B"], 0.0)
+
+    def test_estimates_and_risks_shift_completion(self):
+        """Test that three-point estimates and risks widen the outcome reproducibly."""
+        schedule = make_schedule()
+        schedule.tasks[1].optimistic_duration = 1
+        schedule.tasks[1].pessimistic_duration = 12
+        certain_delay = Risk(
+            id="R1",
+            description="Vendor delivers late",
+            category="schedule",
+            probability="100%",
+            impact="High",
+            severity="High",
+            mitigation_strategy="",
+            contingency_plan="",
+            owner="PMO",
+            status="Open",
+            affected_tasks=["A"],
+            schedule_impact_days=2,
+        )
+        simulator = MonteCarloScheduleSimulator.from_schedule(schedule, risks=[certain_delay])
+
+        result = simulator.run(iterations=20000, seed=7, chunk_size=3000)
+
+        self.assertEqual(result, simulator.run(iterations=20000, seed=7, chunk_size=3000))
+        self.assertGreaterEqual(result.percentile_durations["P50"], 10.0)
+        self.assertGreater(result.percentile_durations["P95"], result.percentile_durations["P50"])
+        self.assertTrue(0 < result.criticality["B"] < 1)
+        self.assertAlmostEqual(result.criticality["B"] + result.criticality["C"], 1.0, delta=0.05)
+
+
+class TestResourceLeveling(unittest.TestCase):
+    def setUp(self):
+        """Set up test fixtures."""
+        self.resources = [
+            Resource(id="R1", name="Ana", type="human", skills=["LIMS"], availability=100, cost_rate=90),
+            Resource(id="R2", name="Ben", type="human", skills=["LIMS", "SQL"], availability=100, cost_rate=60),
+            Resource(id="R3", name="Cy", type="human", skills=["SQL"], availability=50, cost_rate=40),
+        ]
+        self.overlapping = [
+            ResourceAllocation(resource_id="R1", task_id="T1", allocation_percentage=60, start_date="2026-03-02", end_date="2026-03-06"),
+            ResourceAllocation(resource_id="R1", task_id="T2", allocation_percentage=60, start_date="2026-03-05", end_date="2026-03-10"),
+        ]
+
+    def test_interval_tree_finds_overlaps(self):
+        """Test that the interval tree returns exactly the overlapping intervals."""
+        tree = IntervalTree([(0, 4, "a"), (3, 9, "b"), (10, 12, "c"), (6, 6, "d")])
+
+        self.assertEqual(sorted(tree.overlapping(4, 6)), ["a", "b", "d"])
+        self.assertEqual(tree.overlapping(13, 20), [])
+
+    def test_overallocation_is_reported_with_its_tasks(self):
+        """Test that overlapping allocations beyond availability are detected."""
+        found = find_overallocations(self.resources, self.overlapping)
+
+        self.assertEqual(len(found), 1)
+        self.assertEqual((found[0].start_date, found[0].end_date), ("2026-03-05", "2026-03-06"))
+        self.assertEqual(found[0].allocated_percentage, 120)
+        self.assertEqual(found[0].task_ids, ["T1", "T2"])
+
+    def test_solver_respects_skills_priority_and_capacity(self):
+        """Test that requirements go to skilled resources with capacity, by priority."""
+        requirements = [
+            ResourceRequirement(task_id="T1", start_date="2026-03-02", end_date="2026-03-06", required_skills=["SQL"]),
+            ResourceRequirement(task_id="T2", start_date="2026-03-02", end_date="2026-03-04", required_skills=["sql"], allocation_percentage=50, priority=5),
+            ResourceRequirement(task_id="T3", start_date="2026-03-02", end_date="2026-03-03", required_skills=["LIMS"], allocation_percentage=100),
+        ]
+
+        result = ResourceLeveler(self.resources).solve(requirements, max_delay_days=3)
+
+        assigned = {a.task_id: (a.resource_id, a.start_date) for a in result.allocations}
+        self.assertEqual(assigned["T2"], ("R3", "2026-03-02"))
+        self.assertEqual(assigned["T1"], ("R2", "2026-03-02"))
+        self.assertEqual(assigned["T3"], ("R1", "2026-03-02"))
+        self.assertEqual(result.overallocations, [])
+        self.assertEqual(result.unassigned, [])
+
+    def test_optimize_moves_or_delays_conflicting_work(self):
+        """Test that optimizing a plan removes its overallocation without the agent."""
+        plan = ResourcePlan(project_name="LIMS Upgrade", resources=self.resources[:1], allocations=self.overlapping)
+
+        optimized = ResourcePlanner.model_construct().optimize_resource_allocations(plan, max_delay_days=5)
+
+        self.assertEqual(find_overallocations(plan.resources, optimized.allocations), [])
+        moved = next(a for a in optimized.allocations if a.task_id == "T2")
+        self.assertEqual((moved.start_date, moved.end_date), ("2026-03-07", "2026-03-12"))
+
+
+class TestResourceUtilization(unittest.TestCase):
+    def setUp(self):
+        """Set up test fixtures."""
+        self.plan = ResourcePlan(
+            project_name="LIMS Upgrade",
+            resources=[
+                Resource(id="R1", name="Ana", type="human", availability=100),
+                Resource(id="R2", name="Ben", type="human", availability=50, start_date="2026-03-04"),
+                Resource(id="E1", name="Analyzer", type="equipment", availability=100),
+            ],
+            allocations=[
+                ResourceAllocation(resource_id="R1", task_id="T1", allocation_percentage=60, start_date="2026-03-02", end_date="2026-03-06"),
+                ResourceAllocation(resource_id="R1", task_id="T2", allocation_percentage=60, start_date="2026-03-05", end_date="2026-03-10"),
+                ResourceAllocation(resource_id="R2", task_id="T3", allocation_percentage=50, start_date="2026-03-02", end_date="2026-03-03"),
+            ],
+        )
+
+    def test_matrix_follows_allocation_dates_and_availability(self):
+        """Test that daily load and capacity follow the allocation and availability dates."""
+        engine = UtilizationEngine(self.plan.resources, self.plan.allocations)
+
+        self.assertEqual(engine.load[0].tolist(), [60, 60, 60, 120, 120, 60, 60, 60, 60])
+        self.assertEqual(engine.capacity[1].tolist(), [0, 0] + [50] * 7)
+
+    def test_analysis_reports_resources_types_and_periods(self):
+        """Test that the planner summarizes utilization without the agent."""
+        analysis = ResourcePlanner.model_construct().analyze_resource_utilization(
+            self.plan, include_narrative=False
+        )
+
+        ana = analysis["resources"][0]
+        self.assertEqual((ana["allocated_days"], ana["available_days"]), (6.6, 9.0))
+        self.assertEqual((ana["peak_allocation_percentage"], ana["overallocated_days"]), (120.0, 2))
+        self.assertEqual(analysis["overallocated"], ["R1", "R2"])
+        self.assertEqual(analysis["underallocated"], ["R2", "E1"])
+        self.assertEqual(analysis["by_type"]["equipment"], 0.0)
+        self.assertEqual(
+            [(p["start_date"], p["end_date"]) for p in analysis["by_period"]],
+            [("2026-03-02", "2026-03-08"), ("2026-03-09", "2026-03-10")],
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,6 +1,22 @@
+import asyncio
+import io
+import os
+import shutil
+import tempfile
+import threading
+import time
 import unittest
 from datetime import datetime
+from typing import List
 
+import numpy as np
+
+from pmoai.tools.base_tool import BaseTool
+from pmoai.tools.cache_tools import CacheTools
+from pmoai.tools.cache_tools.cache_index import CacheIndex
+from pmoai.tools.cache_tools.fingerprint import fingerprint
+from pmoai.tools.cache_tools.single_flight import SingleFlight
+from pmoai.tools.cache_tools.tiered_cache import TieredCache
 from pmoai.tools.pm_specific import (
     GanttChartTool,
     ProjectCharterTool,
@@ -12,6 +28,8 @@ from pmoai.tools.pm_specific.risk_register_tool import Risk
 from pmoai.tools.pm_specific.resource_allocation_tool import Resource, Task as ResourceTask, ResourceAllocation
 from pmoai.tools.pm_specific.gantt_chart_tool import GanttTask, GanttMilestone
 from pmoai.tools.pm_specific.stakeholder_communication_tool import Stakeholder, CommunicationPlan
+from pmoai.tools.tool_usage import ToolUsage
+from pmoai.utilities.sqlite_pool import get_connection_pool
 
 
 class TestPMTools(unittest.TestCase):
@@ -152,6 +170,55 @@ class TestPMTools(unittest.TestCase):
         self.assertIn("T-001: Test Task [Test Assignee] (2023-01-01 to 2023-01-05, 5 days, 50.0% complete)", gantt_chart)
         self.assertIn("M-001: Test Milestone (2023-01-05) - A test milestone", gantt_chart)
     
+    def test_gantt_chart_tool_streams_filtered_compressed_chart(self):
+        """Test that the GanttChartTool filters tasks, compresses the scale and writes to a file."""
+        tool = GanttChartTool()
+        
+        tasks = [
+            GanttTask(id="T-001", name="Build", start_date="2023-01-02", end_date="2023-01-29", progress=0.0, is_critical=True, wbs_code="1"),
+            GanttTask(id="T-002", name="Unit tests", start_date="2023-01-09", end_date="2023-01-13", progress=0.0, is_critical=True, wbs_code="1.1"),
+            GanttTask(id="T-003", name="Training", start_date="2023-01-02", end_date="2023-01-06", progress=0.0, wbs_code="2"),
+        ]
+        output = io.StringIO()
+        
+        result = tool._run(
+            project_name="Test Project",
+            tasks=tasks,
+            start_date="2023-01-02",
+            end_date="2023-02-26",
+            scale="week",
+            critical_only=True,
+            max_wbs_level=1,
+            output=output,
+        )
+        
+        gantt_chart = output.getvalue()
+        self.assertIn("written", result)
+        self.assertIn("1 column = 1 week", gantt_chart)
+        self.assertIn("T-001: Build", gantt_chart)
+        self.assertIn("\n   [==]\n", gantt_chart)
+        self.assertNotIn("T-002", gantt_chart)
+        self.assertNotIn("T-003", gantt_chart)
+    
+    def test_gantt_chart_tool_keeps_long_schedules_within_max_width(self):
+        """Test that multi-year schedules fit in max_width by default and at every scale."""
+        tool = GanttChartTool()
+        tasks = [
+            GanttTask(id="T-001", name="Programme", start_date="2020-01-01", end_date="2024-12-31", progress=0.0),
+        ]
+        milestones = [GanttMilestone(id="M-001", name="Go live", date="2024-12-31")]
+        
+        default_chart = tool._run(project_name="Test Project", tasks=tasks, milestones=milestones)
+        day_chart = tool._run(project_name="Test Project", tasks=tasks, milestones=milestones, scale="day")
+        
+        self.assertIn("1 column = 1 month", default_chart)
+        self.assertIn("Timeline clipped to the first 120 days", day_chart)
+        for chart in (default_chart, day_chart):
+            self.assertLessEqual(
+                max(len(line) for line in chart.splitlines() if not line.startswith("T-")),
+                tool.max_width + 3,
+            )
+        
     def test_stakeholder_communication_tool(self):
         """Test that the StakeholderCommunicationTool generates a communication plan."""
         tool = StakeholderCommunicationTool()
@@ -195,5 +262,284 @@ class TestPMTools(unittest.TestCase):
         self.assertIn("| Test Stakeholder | Status Report | Weekly | Email | Project Manager | Project status and issues | Keep stakeholder informed |", communication_plan)
 
 
+class CountingTool(BaseTool):
+    name: str = "Counting Tool"
+    description: str = "Returns its argument and counts its calls."
+    calls: int = 0
+    
+    def _run(self, query: str) -> str:
+        self.calls += 1
+        return query * 100
+
+
+class SlowTool(BaseTool):
+    name: str = "Slow Tool"
+    description: str = "Returns its argument after a delay and counts its calls."
+    calls: int = 0
+    
+    def _run(self, query: str) -> str:
+        self.calls += 1
+        time.sleep(0.2)
+        return query.upper()
+
+
+class AsyncSlowTool(BaseTool):
+    name: str = "Async Slow Tool"
+    description: str = "Returns its argument after an asynchronous delay and counts its calls."
+    calls: int = 0
+    
+    async def _run(self, query: str) -> str:
+        self.calls += 1
+        await asyncio.sleep(0.2)
+        return query.upper()
+
+
+class LookupTool(BaseTool):
+    name: str = "Lookup Tool"
+    description: str = "Looks up a record of a project and counts its calls."
+    cache_tags: List[str] = ["lims"]
+    calls: int = 0
+    
+    def _run(self, project: str, record: str) -> str:
+        self.calls += 1
+        return f"{project}/{record}"
+
+
+class TestCacheTools(unittest.TestCase):
+    def setUp(self):
+        """Set up test fixtures."""
+        self.temp_dir = tempfile.mkdtemp()
+        
+    def tearDown(self):
+        """Tear down test fixtures."""
+        shutil.rmtree(self.temp_dir)
+        
+    def test_repeated_calls_are_served_from_memory(self):
+        """Test that a repeated call is answered by the memory tier."""
+        cache = CacheTools(cache_dir=self.temp_dir)
+        tool = cache.wrap_tools([CountingTool()])[0]
+        
+        self.assertEqual(tool._run(query="a"), tool._run(query="a"))
+        
+        self.assertEqual(tool.calls, 1)
+        stats = cache.stats()
+        self.assertEqual((stats["misses"], stats["memory_hits"], stats["writes"]), (1, 1, 1))
+        
+    def test_hits_are_copies_and_rewrites_are_counted_once(self):
+        """Test that mutating a hit leaves the cache intact and rewrites do not inflate its size."""
+        store = TieredCache(os.path.join(self.temp_dir, "cache.db"))
+        
+        for _ in range(3):
+            store.set("k", {"a": [1]})
+        store.get("k")["a"].append(2)
+        
+        self.assertEqual(store.get("k"), {"a": [1]})
+        self.assertEqual(store.stats()["disk_bytes"], store.stats()["memory_bytes"])
+        store.delete("k")
+        self.assertEqual(store.stats()["disk_bytes"], 0)
+        
+    def test_values_too_large_to_keep_replace_the_old_value(self):
+        """Test that an oversized rewrite drops the old value from both tiers."""
+        store = TieredCache(
+            os.path.join(self.temp_dir, "cache.db"), max_memory_bytes=200, max_disk_bytes=500
+        )
+        
+        store.set("k", "small")
+        store.set("k", "x" * 300)
+        self.assertEqual(store.get("k"), "x" * 300)
+        store.set("k", "x" * 1000)
+        
+        self.assertIsNone(store.get("k", None))
+        stats = store.stats()
+        self.assertEqual((stats["memory_bytes"], stats["disk_bytes"]), (0, 0))
+        
+    def test_entries_evicted_from_memory_are_read_from_disk(self):
+        """Test that the byte budget evicts from memory but not from disk."""
+        cache = CacheTools(cache_dir=self.temp_dir, max_memory_bytes=150)
+        tool = cache.wrap_tools([CountingTool()])[0]
+        
+        tool._run(query="a")
+        tool._run(query="b")
+        tool._run(query="a")
+        
+        self.assertEqual(tool.calls, 2)
+        stats = cache.stats()
+        self.assertEqual((stats["memory_evictions"], stats["disk_hits"]), (2, 1))
+        self.assertEqual(stats["memory_entries"], 1)
+        
+    def test_expired_entries_and_cleared_tools_are_recomputed(self):
+        """Test that TTL expiry and per-tool clearing both force a new call."""
+        cache = CacheTools(cache_dir=self.temp_dir, ttl=0.05)
+        tool = cache.wrap_tools([CountingTool()])[0]
+        
+        tool._run(query="a")
+        time.sleep(0.1)
+        tool._run(query="a")
+        self.assertEqual(cache.clear_cache("Other Tool"), 0)
+        self.assertEqual(cache.clear_cache("Counting Tool"), 1)
+        tool._run(query="a")
+        
+        self.assertEqual(tool.calls, 3)
+        self.assertEqual(cache.stats()["expirations"], 1)
+        
+    def test_concurrent_identical_calls_run_once_across_threads(self):
+        """Test that threads calling a tool with the same arguments share one execution."""
+        cache = CacheTools(cache_dir=self.temp_dir)
+        tool = cache.wrap_tools([SlowTool()])[0]
+        results = []
+        
+        threads = [
+            threading.Thread(target=lambda: results.append(tool._run(query="lims")))
+            for _ in range(5)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        
+        self.assertEqual(results, ["LIMS"] * 5)
+        self.assertEqual(tool.calls, 1)
+        self.assertEqual(cache.stats()["coalesced"], 4)
+        
+    def test_coalesced_callers_get_their_own_copy(self):
+        """Test that callers waiting on a shared call never share its result object."""
+        flight = SingleFlight()
+        release = threading.Event()
+        results = []
+        
+        def lookup():
+            release.wait(5)
+            return {"systems": ["LIMS"]}
+        
+        threads = [
+            threading.Thread(target=lambda: results.append(flight.do("lims", lookup)))
+            for _ in range(3)
+        ]
+        for thread in threads:
+            thread.start()
+        while flight.coalesced < 2:
+            time.sleep(0.01)
+        release.set()
+        for thread in threads:
+            thread.join()
+        
+        self.assertEqual(results, [{"systems": ["LIMS"]}] * 3)
+        self.assertEqual(len({id(result) for result in results}), 3)
+        self.assertEqual(len({id(result["systems"]) for result in results}), 3)
+        
+    def test_concurrent_identical_calls_run_once_across_tasks(self):
+        """Test that asyncio tasks awaiting an async tool with the same arguments share one execution."""
+        cache = CacheTools(cache_dir=self.temp_dir)
+        tool = cache.wrap_tools([AsyncSlowTool()])[0]
+        
+        async def gather():
+            return await asyncio.gather(
+                *(tool._run(query="lims") for _ in range(5)), tool._run(query="pmo")
+            )
+        
+        self.assertEqual(asyncio.run(gather()), ["LIMS"] * 5 + ["PMO"])
+        self.assertEqual(tool.calls, 2)
+        
+    def test_invalidation_by_argument_prefix_tag_and_version(self):
+        """Test that invalidation only recomputes the calls in the invalidated group."""
+        cache = CacheTools(cache_dir=self.temp_dir)
+        tool = cache.wrap_tools([LookupTool()])[0]
+        calls = [("P1", "a"), ("P1", "b"), ("P2", "a")]
+        
+        def run_all():
+            before = tool.calls
+            for project, record in calls:
+                tool._run(project=project, record=record)
+            return tool.calls - before
+        
+        self.assertEqual(run_all(), 3)
+        cache.invalidate("Lookup Tool", arguments={"project": "P1"})
+        self.assertEqual(run_all(), 2)
+        cache.invalidate(tag="lims")
+        self.assertEqual(run_all(), 3)
+        cache.invalidate("Lookup Tool")
+        self.assertEqual(run_all(), 3)
+        tool.cache_version = "2"
+        self.assertEqual(run_all(), 3)
+        self.assertEqual(run_all(), 0)
+        with self.assertRaises(ValueError):
+            cache.invalidate("Lookup Tool", arguments={"record": "a"})
+        
+    def test_invalidations_reach_other_indexes_and_stay_bounded(self):
+        """Test that invalidations are seen by other processes' indexes and prefixes are pruned."""
+        db_path = os.path.join(self.temp_dir, "index.db")
+        writer = CacheIndex(db_path, refresh_interval=0, max_prefixes=2)
+        reader = CacheIndex(db_path, refresh_interval=0)
+        fingerprints = [[bytes([i])] for i in range(3)]
+        before = [reader.key("Lookup Tool", f) for f in fingerprints]
+        
+        writer.invalidate_prefix("Lookup Tool", fingerprints[0])
+        self.assertNotEqual(reader.key("Lookup Tool", fingerprints[0]), before[0])
+        self.assertEqual(reader.key("Lookup Tool", fingerprints[1]), before[1])
+        
+        writer.invalidate_prefix("Lookup Tool", fingerprints[1])
+        writer.invalidate_prefix("Lookup Tool", fingerprints[2])
+        with get_connection_pool(db_path).connection() as conn:
+            rows = conn.execute("SELECT COUNT(*) FROM tool_cache_generations").fetchone()[0]
+        self.assertEqual(rows, 1)
+        after = [reader.key("Lookup Tool", f) for f in fingerprints]
+        self.assertEqual(after, [writer.key("Lookup Tool", f) for f in fingerprints])
+        self.assertTrue(set(after).isdisjoint(before))
+        get_connection_pool(db_path).close()
+        
+    def test_fingerprints_are_canonical(self):
+        """Test that equal arguments fingerprint alike regardless of order or container type."""
+        task = GanttTask(id="T-001", name="Build", start_date="2023-01-02", end_date="2023-01-29", progress=0.0)
+        
+        self.assertEqual(fingerprint({"a": 1, "b": {2, 3}}), fingerprint({"b": {3, 2}, "a": 1}))
+        self.assertEqual(fingerprint([task]), fingerprint([task.model_copy()]))
+        self.assertNotEqual(fingerprint([task]), fingerprint([task.model_copy(update={"progress": 1.0})]))
+        self.assertEqual(len({fingerprint(1), fingerprint(True), fingerprint(1.0), fingerprint("1")}), 4)
+        self.assertEqual(fingerprint(np.arange(10)[::2]), fingerprint(np.array([0, 2, 4, 6, 8])))
+        self.assertNotEqual(fingerprint(np.arange(6).reshape(2, 3)), fingerprint(np.arange(6).reshape(3, 2)))
+
+
+class TestAsyncToolExecution(unittest.TestCase):
+    def test_run_works_inside_a_running_event_loop(self):
+        """Test that an async tool can be run synchronously from a coroutine."""
+        tool = AsyncSlowTool()
+        
+        async def call():
+            return tool.run(query="pmo")
+        
+        self.assertEqual(asyncio.run(call()), "PMO")
+    
+    def test_arun_offloads_sync_tools_and_awaits_async_tools(self):
+        """Test that sync and async tools overlap when awaited together."""
+        tools = [SlowTool(), AsyncSlowTool()]
+        
+        async def gather():
+            return await asyncio.gather(
+                *(tool.arun(query="pmo") for tool in tools),
+                tools[0].to_structured_tool().ainvoke({"query": "lims"}),
+            )
+        
+        start = time.perf_counter()
+        self.assertEqual(asyncio.run(gather()), ["PMO", "PMO", "LIMS"])
+        self.assertLess(time.perf_counter() - start, 0.5)
+    
+    def test_aexecute_tool_calls_runs_calls_concurrently_in_order(self):
+        """Test that tool calls are awaited concurrently and reported in call order."""
+        tools = [SlowTool(), AsyncSlowTool()]
+        calls = [
+            {"tool_name": "Slow Tool", "arguments": {"query": "a"}},
+            {"tool_name": "Async Slow Tool", "arguments": {"query": "b"}},
+            {"tool_name": "Missing Tool", "arguments": {}},
+            {"tool_name": "Slow Tool", "arguments": {}},
+        ]
+        
+        start = time.perf_counter()
+        results = asyncio.run(ToolUsage.aexecute_tool_calls(calls, tools))
+        self.assertLess(time.perf_counter() - start, 0.5)
+        self.assertEqual([r.result for r in results[:2]], ["A", "B"])
+        self.assertIn("not found", results[2].result)
+        self.assertIn("Error executing tool 'Slow Tool'", results[3].result)
+
+
 if __name__ == "__main__":
     unittest.main()